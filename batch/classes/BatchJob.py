@@ -0,0 +1,28 @@
+class BatchJob:
+    """One independent scaling (and optionally planning) run for the batch runner"""
+    def __init__(self, *, job_id, recipe, scaling_factor, run_planning=False,
+                 scaling_conflict_resolution='priority', planning_conflict_resolution='priority',
+                 short_circuit_matching=False, memory_report=False, memory_tracemalloc=False,
+                 hard_budget=None, soft_budget=None, provenance=False,
+                 num_ovens=4, num_bowls=1, num_baking_sheets=5):
+        self.job_id = job_id
+        self.recipe = recipe
+        self.scaling_factor = scaling_factor
+        self.run_planning = run_planning
+        self.scaling_conflict_resolution = scaling_conflict_resolution
+        self.planning_conflict_resolution = planning_conflict_resolution
+        self.short_circuit_matching = short_circuit_matching
+        # Attach a MemoryTracker (optionally with tracemalloc snapshots) and add its summary to the result
+        self.memory_report = memory_report
+        self.memory_tracemalloc = memory_tracemalloc
+        # MatchBudget limits ({limit: number}); crossing a hard one fails the job
+        self.hard_budget = hard_budget
+        self.soft_budget = soft_budget
+        # Add the run's ProvenanceGraph (nodes and edges) to the result
+        self.provenance = provenance
+        self.num_ovens = num_ovens
+        self.num_bowls = num_bowls
+        self.num_baking_sheets = num_baking_sheets
+
+    def __repr__(self):
+        return f"BatchJob({self.job_id!r}, '{self.recipe.name}', {self.scaling_factor}x, planning={self.run_planning})"
@@ -0,0 +1,133 @@
+import sys
+import json
+import time
+import argparse
+
+# modules
+from batch.runner import run_batch
+from batch.pipeline import run_pipeline
+
+# classes
+from batch.classes.BatchJob import BatchJob
+from classes.Agenda import STRATEGIES
+from classes.MatchBudget import LIMITS, parse_limits
+from recipes.registry import RECIPES
+
+
+def _iter_jobs(*, args):
+    recipe = RECIPES[args.recipe]
+    job_id = 0
+    for _ in range(args.repeat):
+        for scaling_factor in args.scaling_factors:
+            job_id += 1
+            yield BatchJob(
+                job_id=job_id,
+                recipe=recipe,
+                scaling_factor=scaling_factor,
+                run_planning=args.run_planning_engine,
+                scaling_conflict_resolution=args.scaling_conflict_resolution,
+                planning_conflict_resolution=args.planning_conflict_resolution,
+                short_circuit_matching=args.short_circuit_matching,
+                memory_report=args.memory_report,
+                memory_tracemalloc=args.memory_tracemalloc,
+                hard_budget=args.hard_budget,
+                soft_budget=args.soft_budget,
+                provenance=args.provenance,
+                num_ovens=args.num_ovens,
+                num_bowls=args.num_bowls,
+                num_baking_sheets=args.num_baking_sheets,
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Runs independent recipe scaling/planning jobs across a process pool.",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+
+    parser.add_argument("--recipe", type=str, default="chocolate_chip_cookies", choices=sorted(RECIPES),
+                        help="Recipe to scale")
+    parser.add_argument("--input", type=str, default=None,
+                        help="Stream recipe records from this JSONL file ('-' for stdin) instead of --recipe")
+    parser.add_argument("--scaling_factors", type=float, nargs="+", default=[2],
+                        help="One job per scaling factor (per record without its own scaling_factor)")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Repeat the list of scaling factors this many times")
+    parser.add_argument("--scaling_conflict_resolution", type=str, default="priority",
+                        choices=STRATEGIES, help="Conflict resolution strategy (scaling)")
+    parser.add_argument("--planning_conflict_resolution", type=str, default="priority",
+                        choices=STRATEGIES, help="Conflict resolution strategy (planning)")
+    parser.add_argument("--short_circuit_matching", action="store_true", default=False,
+                        help="Fire the first unfired activation in salience order instead of matching every rule")
+    parser.add_argument("--run_planning_engine", action="store_true", default=False,
+                        help="Run planning engine for every job")
+    parser.add_argument("--memory_report", action="store_true", default=False,
+                        help="Add working-memory accounting (per fact_title and per cycle) to every result")
+    parser.add_argument("--memory_tracemalloc", action="store_true", default=False,
+                        help="With --memory_report, also take tracemalloc snapshots around each engine run")
+    parser.add_argument("--budget", type=str, nargs="+", default=[], metavar="LIMIT=N",
+                        help=f"Hard limits that fail a job when crossed. LIMIT is one of: {', '.join(LIMITS)}")
+    parser.add_argument("--soft_budget", type=str, nargs="+", default=[], metavar="LIMIT=N",
+                        help="Soft limits, reported in each result's budget_warnings (same LIMITs as --budget)")
+    parser.add_argument("--provenance", action="store_true", default=False,
+                        help="Add each run's provenance DAG (facts as nodes, rule firings as edges) to its result")
+    parser.add_argument("--num_ovens", type=int, default=4, help="Number of ovens")
+    parser.add_argument("--num_bowls", type=int, default=1, help="Number of bowls")
+    parser.add_argument("--num_baking_sheets", type=int, default=5, help="Number of baking sheets")
+    parser.add_argument("--num_workers", type=int, default=None,
+                        help="Worker processes (default: CPU count, 0: run in-process)")
+    parser.add_argument("--max_in_flight", type=int, default=None,
+                        help="Maximum submitted-but-unfinished jobs (default: 2x workers)")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Write JSONL results here instead of stdout")
+
+    args = parser.parse_args()
+    try:
+        args.hard_budget = parse_limits(specs=args.budget)
+        args.soft_budget = parse_limits(specs=args.soft_budget)
+    except ValueError as e:
+        parser.error(str(e))
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    source = None
+    if args.input is not None:
+        source = sys.stdin if args.input == "-" else open(args.input)
+        results = run_pipeline(
+            lines=source,
+            scaling_factors=args.scaling_factors,
+            max_workers=args.num_workers,
+            max_in_flight=args.max_in_flight,
+            run_planning=args.run_planning_engine,
+            scaling_conflict_resolution=args.scaling_conflict_resolution,
+            planning_conflict_resolution=args.planning_conflict_resolution,
+            short_circuit_matching=args.short_circuit_matching,
+            memory_report=args.memory_report,
+            memory_tracemalloc=args.memory_tracemalloc,
+            hard_budget=args.hard_budget,
+            soft_budget=args.soft_budget,
+            provenance=args.provenance,
+            num_ovens=args.num_ovens,
+            num_bowls=args.num_bowls,
+            num_baking_sheets=args.num_baking_sheets,
+        )
+    else:
+        results = run_batch(jobs=_iter_jobs(args=args), max_workers=args.num_workers,
+                            max_in_flight=args.max_in_flight)
+
+    start = time.perf_counter()
+    num_jobs = 0
+    num_failed = 0
+    try:
+        for result in results:
+            num_jobs += 1
+            if not result['success']:
+                num_failed += 1
+            out.write(json.dumps(result) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if source not in (None, sys.stdin):
+            source.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"{num_jobs} job(s), {num_failed} failed, {elapsed:.2f}s", file=sys.stderr)
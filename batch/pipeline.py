@@ -0,0 +1,70 @@
+import json
+
+# modules
+from batch.runner import run_batch
+from recipes.loader import recipe_from_dict
+
+# classes
+from batch.classes.BatchJob import BatchJob
+
+# One JSON object per input line:
+#   {"recipe": {...recipes.loader dict...}, "scaling_factor": 2, "num_ovens": 2}
+# scaling_factor may be omitted, in which case the record runs once per default
+# scaling factor. Kitchen fields (num_ovens, num_bowls, num_baking_sheets) and
+# the conflict resolution strategies override the defaults for that record only.
+RECORD_FIELDS = (
+    'scaling_conflict_resolution', 'planning_conflict_resolution',
+    'num_ovens', 'num_bowls', 'num_baking_sheets',
+)
+
+
+def iter_record_jobs(*, lines, scaling_factors, **defaults):
+    """Lazily turn JSONL records into BatchJobs, one line at a time.
+    job_id is 'line' or 'line:n' when a record expands to several scaling factors.
+    A record that can't be decoded yields its failed result dict in place of jobs."""
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+
+        record = None
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict) or 'recipe' not in record:
+                raise ValueError("record must be an object with a 'recipe'")
+            recipe = recipe_from_dict(data=record['recipe'])
+        except ValueError as e:
+            # json.JSONDecodeError is a ValueError too
+            yield _record_error(job_id=str(line_number), record=record, error=str(e))
+            continue
+
+        factors = [record['scaling_factor']] if 'scaling_factor' in record else scaling_factors
+        options = {**defaults, **{field: record[field] for field in RECORD_FIELDS if field in record}}
+        for idx, scaling_factor in enumerate(factors, start=1):
+            yield BatchJob(
+                job_id=str(line_number) if len(factors) == 1 else f"{line_number}:{idx}",
+                recipe=recipe,
+                scaling_factor=scaling_factor,
+                **options,
+            )
+
+
+def run_pipeline(*, lines, scaling_factors, max_workers=None, max_in_flight=None, **defaults):
+    """Stream JSONL recipe records through run_batch and yield result dicts.
+    lines is consumed lazily, so only about max_in_flight records are held in memory
+    however long the input is; records that can't be decoded are yielded as they are read."""
+    jobs = iter_record_jobs(lines=lines, scaling_factors=scaling_factors, **defaults)
+    yield from run_batch(jobs=jobs, max_workers=max_workers, max_in_flight=max_in_flight)
+
+
+def _record_error(*, job_id, record, error):
+    recipe = record.get('recipe') if isinstance(record, dict) else None
+    return {
+        'job_id': job_id,
+        'recipe': recipe.get('name') if isinstance(recipe, dict) else None,
+        'scaling_factor': record.get('scaling_factor') if isinstance(record, dict) else None,
+        'success': False,
+        'error': f"invalid record: {error}",
+        'scaled_ingredients': [],
+        'plan': None,
+        'num_facts': 0,
+    }
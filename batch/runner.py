@@ -0,0 +1,189 @@
+import os
+import warnings
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+# modules
+import scaling.main
+import planning.main
+
+# classes
+from classes.KnowledgeBase import KnowledgeBase
+from classes.WorkingMemory import WorkingMemory
+from classes.Fact import Fact
+from classes.MemoryTracker import MemoryTracker
+from classes.MatchBudget import MatchBudget, BudgetExceeded, BudgetWarning
+from classes.ProvenanceGraph import ProvenanceGraph
+
+# utils
+from utils.serialize_results import serialize_optimal_ingredients, serialize_plan
+
+# Knowledge base shared by every job run in this process. run_batch builds it in
+# the parent before the pool starts, so forked workers inherit it copy-on-write.
+# Workers started any other way (spawn/forkserver) rebuild it once in the pool
+# initializer (warm_knowledge_base):
+# the rule modules hold lambdas, so the KB itself cannot be pickled across.
+_KNOWLEDGE_BASE = None
+
+
+def build_knowledge_base():
+    """Combined scaling + planning knowledge base, configured the same way main.py does."""
+    kb = KnowledgeBase()
+    scaling.main.configure_knowledge_base(kb=kb)
+    planning.main.configure_knowledge_base(kb=kb)
+    return kb
+
+
+def warm_knowledge_base():
+    """Build this process's shared knowledge base once and return it."""
+    global _KNOWLEDGE_BASE
+    if _KNOWLEDGE_BASE is None:
+        _KNOWLEDGE_BASE = build_knowledge_base()
+    return _KNOWLEDGE_BASE
+
+
+def create_process_pool(*, max_workers):
+    """Process pool whose workers share this process's warm knowledge base."""
+    warm_knowledge_base()
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=_mp_context(), initializer=warm_knowledge_base)
+
+
+def run_job(*, job, kb):
+    """Run one BatchJob in a fresh WorkingMemory against a shared knowledge base.
+    The knowledge base is only read, so the same instance can serve every job."""
+    wm = WorkingMemory(verbose=False)
+    wm.add_fact(
+        fact=Fact(
+            fact_title='target_recipe_scale_factor',
+            target_recipe_scale_factor=job.scaling_factor
+        ),
+        silent=True
+    )
+
+    memory_tracker = MemoryTracker(tracemalloc_snapshots=job.memory_tracemalloc) if job.memory_report else None
+    budget = None
+    if job.hard_budget or job.soft_budget:
+        budget = MatchBudget(hard=job.hard_budget, soft=job.soft_budget)
+
+    result = {
+        'job_id': job.job_id,
+        'recipe': job.recipe.name,
+        'scaling_factor': job.scaling_factor,
+        'success': True,
+        'error': None,
+        'scaled_ingredients': [],
+        'plan': None,
+    }
+
+    # Soft budget warnings are reported in the result rather than on every worker's stderr
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', BudgetWarning)
+        try:
+            _run_engines(job=job, kb=kb, wm=wm, result=result, memory_tracker=memory_tracker, budget=budget)
+        except BudgetExceeded as e:
+            result['success'] = False
+            result['error'] = str(e)
+
+    result['num_facts'] = len(wm.facts)
+    if memory_tracker is not None:
+        result['memory'] = memory_tracker.summary()
+    if budget is not None:
+        result['budget_warnings'] = budget.warnings
+    if job.provenance:
+        result['provenance'] = ProvenanceGraph(wm=wm, kb=kb).to_dict()
+    return result
+
+
+def _run_engines(*, job, kb, wm, result, memory_tracker, budget):
+    scaling.main.configure_working_memory(wm=wm, recipe=job.recipe)
+    scaling.main.run_engine(
+        wm=wm,
+        kb=kb,
+        conflict_resolution_strategy=job.scaling_conflict_resolution,
+        verbose=False,
+        short_circuit=job.short_circuit_matching,
+        memory_tracker=memory_tracker,
+        budget=budget,
+    )
+    result['scaled_ingredients'] = serialize_optimal_ingredients(wm=wm)
+
+    if job.run_planning:
+        planning.main.configure_equipment(
+            wm=wm,
+            num_ovens=job.num_ovens,
+            num_bowls=job.num_bowls,
+            num_baking_sheets=job.num_baking_sheets,
+        )
+        success, plan = planning.main.run_engine(
+            wm=wm,
+            kb=kb,
+            recipe=job.recipe,
+            conflict_resolution_strategy=job.planning_conflict_resolution,
+            verbose=False,
+            short_circuit=job.short_circuit_matching,
+            memory_tracker=memory_tracker,
+            budget=budget,
+        )
+        if success:
+            result['plan'] = serialize_plan(plan=plan)
+        else:
+            result['success'] = False
+            result['error'] = plan
+
+
+def run_batch(*, jobs, max_workers=None, max_in_flight=None):
+    """Fan jobs out across a process pool and yield result dicts in completion order.
+    At most max_in_flight jobs are submitted at once (default 2x max_workers), so jobs
+    may be a lazy iterator of any length. max_workers=0 runs every job in-process.
+    Result dicts among the jobs (e.g. records that failed to decode) are yielded as they
+    are reached."""
+    warm_knowledge_base()
+
+    if max_workers == 0:
+        for job in jobs:
+            yield job if isinstance(job, dict) else run_job_in_worker(job)
+        return
+
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = max(max_in_flight or 2 * max_workers, 1)
+
+    with create_process_pool(max_workers=max_workers) as pool:
+        in_flight = set()
+        for job in jobs:
+            if isinstance(job, dict):
+                yield job
+                continue
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            in_flight.add(pool.submit(run_job_in_worker, job))
+
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def _mp_context():
+    """Prefer fork so workers inherit the parent's knowledge base without rebuilding it."""
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def run_job_in_worker(job):
+    """Pool entry point: one failing job becomes an error result instead of ending the batch."""
+    try:
+        return run_job(job=job, kb=warm_knowledge_base())
+    except Exception as e:
+        return {
+            'job_id': job.job_id,
+            'recipe': job.recipe.name,
+            'scaling_factor': job.scaling_factor,
+            'success': False,
+            'error': f"{type(e).__name__}: {e}",
+            'scaled_ingredients': [],
+            'plan': None,
+            'num_facts': 0,
+        }
@@ -0,0 +1,61 @@
+# Metrics whose value should only move with a deliberate behaviour change
+EXACT_METRICS = ('success', 'rule_firings', 'wm_facts')
+
+
+def _status(*, ratio, tolerance):
+    if ratio > 1 + tolerance:
+        return 'REGRESSION'
+    if ratio < 1 - tolerance:
+        return 'improved'
+    return 'ok'
+
+
+def compare_results(*, results, baseline, tolerance=0.25):
+    """Compare a results document against a baseline one, scenario by scenario.
+    Wall time (best of the repeats) and peak memory regress when they grow by more than
+    tolerance; success, rule firings and WM size must match exactly. Returns
+    (rows, failed) where each row is a dict and failed says whether anything regressed
+    or changed. Scenarios missing from the baseline are reported as new."""
+    rows = []
+    for name, current in results['scenarios'].items():
+        previous = baseline['scenarios'].get(name)
+        if previous is None:
+            rows.append({'scenario': name, 'metric': '-', 'baseline': None, 'current': None, 'status': 'new'})
+            continue
+
+        for metric, baseline_value, current_value in (
+            ('wall_time_s', previous['wall_time_s']['min'], current['wall_time_s']['min']),
+            ('peak_memory_kb', previous['peak_memory_kb'], current['peak_memory_kb']),
+        ):
+            ratio = current_value / baseline_value if baseline_value else 1.0
+            rows.append({
+                'scenario': name,
+                'metric': metric,
+                'baseline': baseline_value,
+                'current': current_value,
+                'ratio': round(ratio, 3),
+                'status': _status(ratio=ratio, tolerance=tolerance),
+            })
+
+        for metric in EXACT_METRICS:
+            rows.append({
+                'scenario': name,
+                'metric': metric,
+                'baseline': previous[metric],
+                'current': current[metric],
+                'status': 'ok' if previous[metric] == current[metric] else 'CHANGED',
+            })
+
+    failed = any(row['status'] in ('REGRESSION', 'CHANGED') for row in rows)
+    return rows, failed
+
+
+def format_comparison(*, rows):
+    lines = [f"{'scenario':<20} {'metric':<16} {'baseline':>14} {'current':>14} {'ratio':>7}  status"]
+    for row in rows:
+        ratio = row.get('ratio')
+        lines.append(
+            f"{row['scenario']:<20} {row['metric']:<16} {str(row['baseline']):>14} {str(row['current']):>14} "
+            f"{'' if ratio is None else ratio:>7}  {row['status']}"
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,58 @@
+import sys
+import json
+import argparse
+
+# modules
+from batch.runner import build_knowledge_base
+from benchmarks.runner import run_suite
+from benchmarks.compare import compare_results, format_comparison
+from benchmarks.scenarios import build_scenarios
+
+
+def _progress(name, measurement):
+    status = "ok" if measurement['success'] else f"failed: {measurement['error']}"
+    print(
+        f"{name:<20} {measurement['wall_time_s']['min'] * 1000:>10.2f} ms  "
+        f"{measurement['rule_firings']:>7} firings  {measurement['peak_memory_kb']:>10.1f} KB peak  "
+        f"{measurement['wm_facts']:>6} facts  {status}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    scenarios = build_scenarios()
+
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the scaling and planning engines and compares against a saved baseline.",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument("--scenarios", type=str, nargs="+", default=sorted(scenarios), choices=sorted(scenarios),
+                        metavar="SCENARIO", help=f"Scenarios to run (default: all)\n{', '.join(scenarios)}")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Timed runs per scenario; wall time is reported as min/median/max")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Write the JSON results here instead of stdout")
+    parser.add_argument("--baseline", type=str, default=None,
+                        help="Compare against this saved results file; exit 1 on any regression")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative growth in wall time and peak memory before a regression")
+
+    args = parser.parse_args()
+
+    kb = build_knowledge_base()
+    selected = {name: job for name, job in scenarios.items() if name in args.scenarios}
+    results = run_suite(scenarios=selected, kb=kb, repeat=args.repeat, progress=_progress)
+
+    if args.output:
+        with open(args.output, "w") as out:
+            json.dump(results, out, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as source:
+            baseline = json.load(source)
+        rows, failed = compare_results(results=results, baseline=baseline, tolerance=args.tolerance)
+        print(format_comparison(rows=rows), file=sys.stderr)
+        if failed:
+            sys.exit(1)
@@ -0,0 +1,109 @@
+import sys
+import time
+import platform
+import statistics
+import tracemalloc
+
+# modules
+import scaling.main
+import planning.main
+
+# classes
+from classes.Fact import Fact
+from classes.WorkingMemory import WorkingMemory
+from classes.RuleProfiler import RuleProfiler
+
+
+def run_scenario(*, job, kb, profiler=None):
+    """Run one scenario (a BatchJob) end to end in a fresh WorkingMemory.
+    Returns (success, error, wm)."""
+    wm = WorkingMemory(verbose=False)
+    wm.add_fact(
+        fact=Fact(
+            fact_title='target_recipe_scale_factor',
+            target_recipe_scale_factor=job.scaling_factor
+        ),
+        silent=True
+    )
+
+    scaling.main.configure_working_memory(wm=wm, recipe=job.recipe)
+    scaling.main.run_engine(
+        wm=wm,
+        kb=kb,
+        conflict_resolution_strategy=job.scaling_conflict_resolution,
+        verbose=False,
+        short_circuit=job.short_circuit_matching,
+        profiler=profiler,
+    )
+    if not job.run_planning:
+        return True, None, wm
+
+    planning.main.configure_equipment(
+        wm=wm,
+        num_ovens=job.num_ovens,
+        num_bowls=job.num_bowls,
+        num_baking_sheets=job.num_baking_sheets,
+    )
+    success, plan = planning.main.run_engine(
+        wm=wm,
+        kb=kb,
+        recipe=job.recipe,
+        conflict_resolution_strategy=job.planning_conflict_resolution,
+        verbose=False,
+        short_circuit=job.short_circuit_matching,
+        profiler=profiler,
+    )
+    return success, (None if success else plan), wm
+
+
+def measure_scenario(*, job, kb, repeat):
+    """Measure one scenario. Rule firings come from a profiled run and peak memory from a
+    tracemalloc run, so neither instrumentation skews the repeat plain timed runs."""
+    profiler = RuleProfiler()
+    success, error, wm = run_scenario(job=job, kb=kb, profiler=profiler)
+
+    tracemalloc.start()
+    try:
+        run_scenario(job=job, kb=kb)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    wall_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_scenario(job=job, kb=kb)
+        wall_times.append(time.perf_counter() - start)
+
+    return {
+        'success': success,
+        'error': error,
+        'wall_time_s': {
+            'min': round(min(wall_times), 6),
+            'median': round(statistics.median(wall_times), 6),
+            'max': round(max(wall_times), 6),
+        },
+        'rule_firings': sum(row['firings'] for row in profiler.rows()),
+        'peak_memory_kb': round(peak / 1024, 1),
+        'wm_facts': len(wm.facts),
+    }
+
+
+def run_suite(*, scenarios, kb, repeat, progress=None):
+    """Measure every scenario and return the results document.
+    progress, if given, is called with (name, measurement) after each scenario."""
+    results = {
+        'meta': {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'repeat': repeat,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        },
+        'scenarios': {},
+    }
+    for name, job in scenarios.items():
+        measurement = measure_scenario(job=job, kb=kb, repeat=repeat)
+        results['scenarios'][name] = measurement
+        if progress is not None:
+            progress(name, measurement)
+    return results
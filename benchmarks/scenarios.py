@@ -0,0 +1,53 @@
+# modules
+from recipes.generator import generate_recipe, generate_kitchen
+
+# classes
+from batch.classes.BatchJob import BatchJob
+from recipes.chocolate_chip_cookies import chocolate_chip_cookies_recipe
+
+# Seed of the generated ingredients_* recipes; changing it changes the workloads and so the baselines
+SEED = 0
+
+
+def _scenario(*, name, recipe, scaling_factor=1, run_planning=True, num_ovens=4, num_bowls=1, num_baking_sheets=5):
+    return BatchJob(
+        job_id=name,
+        recipe=recipe,
+        scaling_factor=scaling_factor,
+        run_planning=run_planning,
+        num_ovens=num_ovens,
+        num_bowls=num_bowls,
+        num_baking_sheets=num_baking_sheets,
+    )
+
+
+def build_scenarios():
+    """Benchmark scenarios by name, each a scaling + planning BatchJob.
+    cookies_*: the cookie pipeline at 1x/10x/100x in the default kitchen.
+    ingredients_*: generated recipes with 10/100/1000 ingredients in kitchens sized for them. Planning
+        grows much faster than linearly in the number of ingredients (minutes at 1000), so
+        ingredients_1000 only runs scaling.
+    kitchen_*: the cookies at 10x in kitchens with 1/10/100 ovens and 5/50/500 baking sheets."""
+    scenarios = [
+        _scenario(name=f"cookies_{scaling_factor}x", recipe=chocolate_chip_cookies_recipe, scaling_factor=scaling_factor)
+        for scaling_factor in (1, 10, 100)
+    ]
+    for num_ingredients in (10, 100, 1000):
+        recipe = generate_recipe(seed=SEED, num_ingredients=num_ingredients)
+        scenarios.append(_scenario(
+            name=f"ingredients_{num_ingredients}",
+            recipe=recipe,
+            run_planning=num_ingredients < 1000,
+            **generate_kitchen(recipe=recipe),
+        ))
+    scenarios += [
+        _scenario(
+            name=f"kitchen_{num_ovens}_ovens",
+            recipe=chocolate_chip_cookies_recipe,
+            scaling_factor=10,
+            num_ovens=num_ovens,
+            num_baking_sheets=num_baking_sheets,
+        )
+        for num_ovens, num_baking_sheets in ((1, 5), (10, 50), (100, 500))
+    ]
+    return {scenario.job_id: scenario for scenario in scenarios}
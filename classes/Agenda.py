@@ -0,0 +1,83 @@
+import heapq
+from itertools import count
+
+
+def _priority(rule):
+    return rule.priority
+
+
+def _specificity(rule):
+    return len(rule.antecedents)
+
+
+def _time_tags(bindings):
+    """fact_ids of the facts an activation matched, oldest first. Reference facts have no
+    fact_id and count as older than anything in working memory."""
+    return [fact.fact_id or 0 for fact in bindings.get('_matched_facts', ())]
+
+
+def _lex_key(rule, bindings):
+    # OPS5 LEX: compare time tags newest first; when one list is a prefix of the other the
+    # longer list wins, then the more specific rule. The trailing 1 sorts after any negated
+    # tag, so a list that runs out first loses the comparison.
+    tags = sorted(_time_tags(bindings), reverse=True)
+    return (*(-tag for tag in tags), 1, -len(rule.antecedents))
+
+
+def _mea_key(rule, bindings):
+    # OPS5 MEA: the recency of the fact matching the first condition decides first, then LEX
+    tags = _time_tags(bindings)
+    return (-(tags[0] if tags else 0), *_lex_key(rule, bindings))
+
+
+# Heap sort key of an activation under each strategy (smallest pops first)
+_SORT_KEYS = {
+    'priority': lambda rule, bindings: -rule.priority,
+    'specificity': lambda rule, bindings: -len(rule.antecedents),
+    'recency': lambda rule, bindings: -max(_time_tags(bindings), default=0),
+    'lex': _lex_key,
+    'mea': _mea_key,
+}
+
+STRATEGIES = tuple(_SORT_KEYS)
+
+# Strategies that rank a rule's activations by the rule alone, mapped to that salience
+# (higher wins). Only these can be resolved by scanning rules in salience order.
+RULE_SALIENCE = {
+    'priority': _priority,
+    'specificity': _specificity,
+}
+
+
+class Agenda:
+    """Conflict set of (rule, bindings, fire_key) activations ordered by a conflict resolution
+    strategy. Each activation's sort key is computed once on insertion and kept on a heap,
+    so push and pop are O(log n). Activations that tie pop in insertion order."""
+    def __init__(self, *, strategy='priority'):
+        if strategy not in _SORT_KEYS:
+            raise ValueError(f"unknown conflict resolution strategy: {strategy}")
+        self.strategy = strategy
+        self._sort_key = _SORT_KEYS[strategy]
+        self._heap = []
+        self._sequence = count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, *, rule, bindings, fire_key=None):
+        heapq.heappush(self._heap, (self._sort_key(rule, bindings), next(self._sequence), (rule, bindings, fire_key)))
+
+    def extend(self, *, activations):
+        """Add (rule, bindings, fire_key) activations, re-heapifying once."""
+        sort_key = self._sort_key
+        self._heap.extend(
+            (sort_key(rule, bindings), next(self._sequence), (rule, bindings, fire_key))
+            for rule, bindings, fire_key in activations
+        )
+        heapq.heapify(self._heap)
+
+    def pop(self):
+        """Remove and return the winning (rule, bindings, fire_key), or None when empty."""
+        if not self._heap:
+            return None
+        return heapq.heappop(self._heap)[2]
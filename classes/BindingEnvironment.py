@@ -0,0 +1,97 @@
+# Sentinel for "variable not bound" (None is a legitimate bound value)
+_UNBOUND = object()
+
+
+class BindingEnvironment:
+    """Variable bindings for one depth-first match path, extended and undone in place.
+    Every variable bound and every fact matched is recorded on a trail; undo() rolls back
+    to an earlier mark() when the search backtracks. snapshot() copies the path out as the
+    plain bindings dict rule actions expect, and is only needed when an activation is emitted."""
+
+    def __init__(self, *, bindings):
+        self.values = {k: v for k, v in bindings.items() if k != '_matched_facts'}
+        self.matched_facts = list(bindings.get('_matched_facts', []))
+        self.trail = []
+        self._had_matched_facts = '_matched_facts' in bindings
+
+    def mark(self):
+        return (len(self.trail), len(self.matched_facts))
+
+    def undo(self, *, mark):
+        trail_length, matched_length = mark
+        self._unbind(trail_length=trail_length)
+        if len(self.matched_facts) > matched_length:
+            del self.matched_facts[matched_length:]
+
+    def unify(self, *, pattern, fact):
+        """Bind pattern's variables against fact in place. Returns True on success;
+        on failure anything bound by this call is undone."""
+        if pattern.fact_title != fact.fact_title:
+            return False
+
+        trail_length = len(self.trail)
+        for key, pattern_value in pattern.attributes.items():
+            if key not in fact.attributes:
+                self._unbind(trail_length=trail_length)
+                return False
+
+            fact_value = fact.attributes[key]
+
+            if isinstance(pattern_value, str) and pattern_value.startswith('?'):
+                # Variable — check consistency or bind
+                if pattern_value in self.values:
+                    if self.values[pattern_value] != fact_value:
+                        self._unbind(trail_length=trail_length)
+                        return False
+                else:
+                    self.values[pattern_value] = fact_value
+                    self.trail.append(pattern_value)
+            else:
+                # Literal — must match exactly
+                if pattern_value != fact_value:
+                    self._unbind(trail_length=trail_length)
+                    return False
+
+        return True
+
+    def match_fact(self, *, pattern, fact):
+        """unify(), and on success record fact as matched on this path."""
+        if not self.unify(pattern=pattern, fact=fact):
+            return False
+        self.matched_facts.append(fact)
+        return True
+
+    def can_unify(self, *, pattern, fact):
+        """Whether pattern would unify with fact under the current bindings, binding nothing."""
+        if pattern.fact_title != fact.fact_title:
+            return False
+
+        local = {}
+        for key, pattern_value in pattern.attributes.items():
+            if key not in fact.attributes:
+                return False
+
+            fact_value = fact.attributes[key]
+
+            if isinstance(pattern_value, str) and pattern_value.startswith('?'):
+                bound = self.values.get(pattern_value, local.get(pattern_value, _UNBOUND))
+                if bound is _UNBOUND:
+                    local[pattern_value] = fact_value
+                elif bound != fact_value:
+                    return False
+            elif pattern_value != fact_value:
+                return False
+
+        return True
+
+    def snapshot(self):
+        """The current bindings as a dict, with '_matched_facts' when any fact has been matched."""
+        bindings = dict(self.values)
+        if self._had_matched_facts or self.matched_facts:
+            bindings['_matched_facts'] = list(self.matched_facts)
+        return bindings
+
+    def _unbind(self, *, trail_length):
+        trail = self.trail
+        while len(trail) > trail_length:
+            del self.values[trail.pop()]
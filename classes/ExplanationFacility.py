@@ -4,6 +4,10 @@ class ExplanationFacility:
         self.kb = kb
         self.label = label
 
+        self._facts_by_id = {}
+        self._facts_by_id_revision = None
+        self._reference_keys_count = None
+
     def run_repl(self):
         print("")
         print("=" * 70)
@@ -41,33 +45,81 @@ class ExplanationFacility:
             print("")
 
     def _find_fact(self, *, fact_id):
-        for fact in self.wm.facts:
-            if fact.fact_id == fact_id:
-                return fact
-        return None
+        # Index rebuilt only when WM has changed since the last lookup
+        if self._facts_by_id_revision != self.wm.revision:
+            self._facts_by_id = {fact.fact_id: fact for fact in self.wm.facts}
+            self._facts_by_id_revision = self.wm.revision
+        fact = self._facts_by_id.get(fact_id)
+        if fact is not None:
+            return fact
+        # Transient facts consumed by a rule are no longer in WM but still explainable
+        return self.wm.consumed_facts.get(fact_id)
 
     def _print_derivation(self, *, fact, indent=0):
-        prefix = "\t" * indent
-        connector = "+-- " if indent > 0 else ""
+        """Print fact's derivation tree. A derived fact that has already been printed in this
+        tree (e.g. target_recipe_scale_factor's multiplier under every scaled ingredient) is
+        printed once and referred back to afterwards, so the output grows with the number of
+        distinct facts, not the number of paths to them."""
+        rendered = set()
+        # Explicit stack, so derivation depth is not bounded by the interpreter recursion limit
+        stack = [(fact, indent)]
+        while stack:
+            fact, indent = stack.pop()
+            prefix = "\t" * indent
+            connector = "+-- " if indent > 0 else ""
 
-        if fact.derivation is None:
-            leaf_label = self._classify_leaf(fact=fact)
-            print(f"{prefix}{connector}{fact}  [{leaf_label}]")
-            return
+            if fact.derivation is None:
+                leaf_label = self._classify_leaf(fact=fact)
+                print(f"{prefix}{connector}{fact}  [{leaf_label}]")
+                continue
+
+            rule_name = fact.derivation['rule_name']
+            antecedent_facts = fact.derivation['antecedent_facts']
 
-        rule_name = fact.derivation['rule_name']
-        antecedent_facts = fact.derivation['antecedent_facts']
+            if id(fact) in rendered:
+                print(f"{prefix}{connector}{fact}  [derived by rule: '{rule_name}', see above]")
+                continue
+            rendered.add(id(fact))
 
-        print(f"{prefix}{connector}{fact}")
-        print(f"{prefix}    derived by rule: '{rule_name}'")
+            print(f"{prefix}{connector}{fact}")
+            print(f"{prefix}    derived by rule: '{rule_name}'")
 
-        if antecedent_facts:
-            print(f"{prefix}    antecedents:")
-            for ant_fact in antecedent_facts:
-                self._print_derivation(fact=ant_fact, indent=indent + 1)
+            if antecedent_facts:
+                print(f"{prefix}    antecedents:")
+                stack.extend((ant_fact, indent + 1) for ant_fact in reversed(antecedent_facts))
 
     def _classify_leaf(self, *, fact):
-        for ref in self.kb.reference_facts:
-            if ref.fact_title == fact.fact_title and ref.attributes == fact.attributes:
+        if self._reference_keys_count != len(self.kb.reference_facts):
+            self._index_reference_facts()
+        if id(fact) in self._reference_ids:
+            return "REFERENCE"
+        key = _fact_key(fact=fact)
+        if key is not None:
+            return "REFERENCE" if key in self._reference_keys else "INPUT"
+        # Unhashable attribute values: compare against the reference facts with this title
+        for ref in self._reference_facts_by_title.get(fact.fact_title, ()):
+            if ref.attributes == fact.attributes:
                 return "REFERENCE"
         return "INPUT"
+
+    def _index_reference_facts(self):
+        """Identity and (title, attributes) sets over the KB's reference facts. The KB only ever
+        adds reference facts, so the index is rebuilt when their count changes."""
+        self._reference_ids = set()
+        self._reference_keys = set()
+        self._reference_facts_by_title = {}
+        for ref in self.kb.reference_facts:
+            self._reference_ids.add(id(ref))
+            self._reference_facts_by_title.setdefault(ref.fact_title, []).append(ref)
+            key = _fact_key(fact=ref)
+            if key is not None:
+                self._reference_keys.add(key)
+        self._reference_keys_count = len(self.kb.reference_facts)
+
+
+def _fact_key(*, fact):
+    """Hashable (title, attributes) identity of a fact, or None when a value is unhashable."""
+    try:
+        return (fact.fact_title, frozenset(fact.attributes.items()))
+    except TypeError:
+        return None
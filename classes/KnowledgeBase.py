@@ -1,13 +1,132 @@
+import threading
+
+from classes.NegatedFact import NegatedFact
+from classes.RuleGraph import RuleGraph
+
+# Rules and reference facts added without a module belong to MAIN, which is always in focus
+MAIN_MODULE = 'MAIN'
+
+
 class KnowledgeBase:
-    """Stores permanent rules and reference facts"""
+    """Stores permanent rules and reference facts, registered under named modules.
+    MAIN is always visible; any other module is only visible to the engines while it is
+    on the focus stack (CLIPS-style), so each phase matches only its own rules and
+    reference facts. The focus stack is per thread, so one configured knowledge base
+    can still serve concurrent jobs."""
     def __init__(self):
         self.rules = []
         self.reference_facts = []  # Static facts like conversion rates
-    
-    def add_rules(self, *, rules):
-        """Add a rule to the knowledge base"""
+        self.modules = [MAIN_MODULE]
+
+        # fact_title -> [(rule, anchor antecedent index, module)] in KB order. The engines anchor a
+        # rule on its first positive antecedent, so only triggers with that title can match it.
+        self._rules_by_anchor_title = {}
+        self._rule_modules = []  # module of each entry in rules
+        self._reference_fact_modules = []  # module of each entry in reference_facts
+
+        # Visible rules (plain or salience-sorted), their RuleGraph and reference facts, cached per focus stack
+        self._visible_rules = {}
+        self._rule_graphs = {}
+        self._visible_reference_facts = {}
+        self._focus = threading.local()
+
+    def add_rules(self, *, rules, module=MAIN_MODULE):
+        """Add rules to the knowledge base under a module"""
+        self._add_module(module=module)
         self.rules.extend(rules)
+        self._rule_modules.extend([module] * len(rules))
+        for rule in rules:
+            for ant_idx, antecedent in enumerate(rule.antecedents):
+                if not isinstance(antecedent, NegatedFact):
+                    self._rules_by_anchor_title.setdefault(antecedent.fact_title, []).append((rule, ant_idx, module))
+                    break
+        # Only focus stacks that can see module see new rules; the rest keep their caches
+        # (e.g. the SCALING graph and strata survive the planning rules being added)
+        for key in [key for key in self._visible_rules if self._sees(stack=key[0], module=module)]:
+            del self._visible_rules[key]
+        for key in [key for key in self._rule_graphs if self._sees(stack=key, module=module)]:
+            del self._rule_graphs[key]
+
+    def add_reference_facts(self, *, facts, module=MAIN_MODULE):
+        """Add permanent domain knowledge under a module"""
+        self._add_module(module=module)
+        self.reference_facts.extend(facts)
+        self._reference_fact_modules.extend([module] * len(facts))
+        self._visible_reference_facts.clear()
+
+    @property
+    def focus_stack(self):
+        stack = getattr(self._focus, 'stack', None)
+        if stack is None:
+            stack = self._focus.stack = []
+        return stack
+
+    def focus(self, *, module):
+        """Push module onto this thread's focus stack, making its rules and facts visible"""
+        self.focus_stack.append(module)
+
+    def pop_focus(self):
+        """Pop and return the module on top of this thread's focus stack"""
+        return self.focus_stack.pop()
+
+    def visible_modules(self):
+        return {MAIN_MODULE, *self.focus_stack}
+
+    def rules_for_trigger(self, *, fact_title):
+        """(rule, anchor antecedent index) pairs for the visible rules a fact with this title
+        can trigger, in KB order."""
+        key = (tuple(self.focus_stack), fact_title)
+        visible = self._visible_rules.get(key)
+        if visible is None:
+            modules = self.visible_modules()
+            visible = self._visible_rules[key] = [
+                (rule, ant_idx)
+                for rule, ant_idx, module in self._rules_by_anchor_title.get(fact_title, ())
+                if module in modules
+            ]
+        return visible
+
+    def rules_by_salience(self, *, fact_title, salience):
+        """rules_for_trigger sorted by descending salience(rule), ties kept in KB order,
+        so the first rule in the list that activates is the one max() would pick."""
+        key = (tuple(self.focus_stack), fact_title, salience)
+        ordered = self._visible_rules.get(key)
+        if ordered is None:
+            ordered = self._visible_rules[key] = sorted(
+                self.rules_for_trigger(fact_title=fact_title),
+                key=lambda entry: -salience(entry[0]),
+            )
+        return ordered
+
+    def rule_graph(self):
+        """RuleGraph of the visible rules, built once per focus stack (so its strata are
+        computed once per focus stack too)."""
+        key = tuple(self.focus_stack)
+        graph = self._rule_graphs.get(key)
+        if graph is None:
+            modules = self.visible_modules()
+            graph = self._rule_graphs[key] = RuleGraph(
+                rules=[rule for rule, module in zip(self.rules, self._rule_modules) if module in modules],
+            )
+        return graph
+
+    def visible_reference_facts(self):
+        """Reference facts of the modules in focus, in the order they were added."""
+        key = tuple(self.focus_stack)
+        visible = self._visible_reference_facts.get(key)
+        if visible is None:
+            modules = self.visible_modules()
+            visible = self._visible_reference_facts[key] = [
+                fact
+                for fact, module in zip(self.reference_facts, self._reference_fact_modules)
+                if module in modules
+            ]
+        return visible
+
+    @staticmethod
+    def _sees(*, stack, module):
+        return module == MAIN_MODULE or module in stack
 
-    def add_reference_facts(self, *, facts):
-        """Add permanent domain knowledge"""
-        self.reference_facts.extend(facts)
\ No newline at end of file
+    def _add_module(self, *, module):
+        if module not in self.modules:
+            self.modules.append(module)
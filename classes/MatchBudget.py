@@ -0,0 +1,209 @@
+import time
+import warnings
+
+# Limits a MatchBudget can set, soft or hard:
+#   partial_matches_per_rule   antecedents bound while matching one rule against one trigger
+#   activations_per_rule       complete binding sets from matching one rule against one trigger
+#   partial_matches_per_cycle  partial matches in one _forward_chain cycle, nested cycles included
+#   activations_per_cycle      activations in one _forward_chain cycle, nested cycles included
+#   firings                    rule firings in one engine run
+#   wall_time                  seconds in one engine run
+LIMITS = (
+    'partial_matches_per_rule', 'activations_per_rule',
+    'partial_matches_per_cycle', 'activations_per_cycle',
+    'firings', 'wall_time',
+)
+
+# Partial matches between wall-time checks while a rule is being matched
+_WALL_TIME_CHECK_EVERY = 1000
+
+
+class BudgetExceeded(RuntimeError):
+    """A hard MatchBudget limit was crossed. PlanningEngine.run reports it as a failed plan."""
+
+
+class BudgetWarning(RuntimeWarning):
+    """A soft MatchBudget limit was crossed."""
+
+
+def parse_limits(*, specs):
+    """{limit: number} from 'limit=number' strings (e.g. from the command line).
+    Raises ValueError on an unknown limit or a malformed spec."""
+    limits = {}
+    for spec in specs or ():
+        name, sep, value = spec.partition('=')
+        name = name.strip()
+        if not sep:
+            raise ValueError(f"budget must look like limit=number: {spec}")
+        if name not in LIMITS:
+            raise ValueError(f"unknown budget limit: {name}")
+        try:
+            limits[name] = float(value) if name == 'wall_time' else int(value)
+        except ValueError:
+            raise ValueError(f"budget must look like limit=number: {spec}") from None
+    return limits
+
+
+class MatchBudget:
+    """Cost limits for the inference engines, guarding against match explosions (e.g. a rule
+    whose antecedents share no variables matching the cartesian product of WM) and runaway
+    runs. Crossing a hard limit raises BudgetExceeded, which aborts the run; crossing a soft
+    limit warns (BudgetWarning) once per limit and rule per run, and is kept in warnings.
+    Like RuleProfiler, attach() swaps wrappers onto one engine instance, so engines built
+    without a budget run the unguarded code. One budget can guard several engines; counters
+    restart with every engine run."""
+    def __init__(self, *, hard=None, soft=None):
+        for limits in (hard or {}, soft or {}):
+            for name in limits:
+                if name not in LIMITS:
+                    raise ValueError(f"unknown budget limit: {name}")
+        self.hard = dict(hard or {})
+        self.soft = dict(soft or {})
+        self.warnings = []
+        self._warned = set()
+        self._cycles = []  # [partial_matches, activations] per open _forward_chain cycle
+        self._matching = []  # counters of the rules being matched, innermost last
+        self._firings = 0
+        self._run_start = None
+
+    def attach(self, *, engine):
+        """Guard one engine instance."""
+        budget = self
+
+        run = engine.run
+        def budgeted_run(**kwargs):
+            budget._firings = 0
+            budget._run_start = time.perf_counter()
+            budget._warned = set()
+            return run(**kwargs)
+        engine.run = budgeted_run
+
+        forward_chain = engine._forward_chain
+        def budgeted_forward_chain(*, trigger_fact):
+            budget._check_wall_time(context=f"cycle on Fact #{trigger_fact.fact_id} ('{trigger_fact.fact_title}')")
+            budget._cycles.append([0, 0])
+            try:
+                return forward_chain(trigger_fact=trigger_fact)
+            finally:
+                partial_matches, activations = budget._cycles.pop()
+                if budget._cycles:
+                    # A nested cycle (a dispatch rule re-entering the engine) counts toward its parent
+                    budget._cycles[-1][0] += partial_matches
+                    budget._cycles[-1][1] += activations
+        engine._forward_chain = budgeted_forward_chain
+
+        class BudgetedBindingEnvironment(engine._binding_environment):
+            def match_fact(self, *, pattern, fact):
+                if not super().match_fact(pattern=pattern, fact=fact):
+                    return False
+                budget._partial_match(pattern=pattern)
+                return True
+        engine._binding_environment = BudgetedBindingEnvironment
+
+        iter_rule_activations = engine._iter_rule_activations
+        def budgeted_iter_rule_activations(*, rule, anchor_idx, trigger_fact):
+            return budget._counted_activations(
+                matching={'rule': rule, 'trigger_fact': trigger_fact, 'partial_matches': 0, 'activations': 0,
+                          'by_antecedent': {}},
+                activations=iter_rule_activations(rule=rule, anchor_idx=anchor_idx, trigger_fact=trigger_fact),
+            )
+        engine._iter_rule_activations = budgeted_iter_rule_activations
+
+        fire_rule = engine._fire_rule
+        def budgeted_fire_rule(*, rule, bindings, **kwargs):
+            budget._firings += 1
+            budget._check(limit='firings', value=budget._firings, key=None,
+                          message=lambda limit: f"{budget._firings} rule firings (limit {limit}), "
+                                                f"the last one '{rule.rule_name}'")
+            budget._check_wall_time(context=f"firing '{rule.rule_name}'")
+            return fire_rule(rule=rule, bindings=bindings, **kwargs)
+        engine._fire_rule = budgeted_fire_rule
+
+        return engine
+
+    def _counted_activations(self, *, matching, activations):
+        """Re-yield a matcher's activations, counting them against the rule and the cycle.
+        The rule is current only while its matcher runs, so the partial matches made inside
+        are counted against it."""
+        rule = matching['rule']
+        while True:
+            self._matching.append(matching)
+            try:
+                bindings = next(activations)
+            except StopIteration:
+                return
+            finally:
+                self._matching.pop()
+
+            matching['activations'] += 1
+            self._check(
+                limit='activations_per_rule', value=matching['activations'], key=rule.rule_name,
+                message=lambda limit: f"rule '{rule.rule_name}' produced {matching['activations']} activations "
+                                      f"(limit {limit}) for {_describe(matching['trigger_fact'])}",
+            )
+            if self._cycles:
+                self._cycles[-1][1] += 1
+                self._check(
+                    limit='activations_per_cycle', value=self._cycles[-1][1], key=rule.rule_name,
+                    message=lambda limit: f"{self._cycles[-1][1]} activations in one cycle (limit {limit}), "
+                                          f"the last from rule '{rule.rule_name}'",
+                )
+            yield bindings
+
+    def _partial_match(self, *, pattern):
+        if not self._matching:
+            return
+        matching = self._matching[-1]
+        matching['partial_matches'] += 1
+        by_antecedent = matching['by_antecedent']
+        by_antecedent[id(pattern)] = by_antecedent.get(id(pattern), 0) + 1
+        if self._cycles:
+            self._cycles[-1][0] += 1
+
+        rule = matching['rule']
+        self._check(
+            limit='partial_matches_per_rule', value=matching['partial_matches'], key=rule.rule_name,
+            message=lambda limit: f"rule '{rule.rule_name}' bound {matching['partial_matches']} partial matches "
+                                  f"(limit {limit}) for {_describe(matching['trigger_fact'])}; "
+                                  f"{_worst_antecedent(matching=matching)}",
+        )
+        if self._cycles:
+            self._check(
+                limit='partial_matches_per_cycle', value=self._cycles[-1][0], key=rule.rule_name,
+                message=lambda limit: f"{self._cycles[-1][0]} partial matches in one cycle (limit {limit}), "
+                                      f"while matching rule '{rule.rule_name}'; {_worst_antecedent(matching=matching)}",
+            )
+        if matching['partial_matches'] % _WALL_TIME_CHECK_EVERY == 0:
+            self._check_wall_time(context=f"matching '{rule.rule_name}'")
+
+    def _check_wall_time(self, *, context):
+        if self._run_start is None or not ('wall_time' in self.hard or 'wall_time' in self.soft):
+            return
+        elapsed = time.perf_counter() - self._run_start
+        self._check(limit='wall_time', value=elapsed, key=None,
+                    message=lambda limit: f"run took {elapsed:.3f}s (limit {limit}s), {context}")
+
+    def _check(self, *, limit, value, key, message):
+        """Raise BudgetExceeded past the hard limit; warn once per (limit, key) past the soft one.
+        message(limit) builds the diagnostic, only when one is needed."""
+        hard = self.hard.get(limit)
+        if hard is not None and value > hard:
+            raise BudgetExceeded(f"budget exceeded: {message(hard)}")
+        soft = self.soft.get(limit)
+        if soft is not None and value > soft and (limit, key) not in self._warned:
+            self._warned.add((limit, key))
+            text = f"budget warning: {message(soft)}"
+            self.warnings.append(text)
+            warnings.warn(text, BudgetWarning, stacklevel=2)
+
+
+def _describe(fact):
+    return f"trigger Fact #{fact.fact_id} ('{fact.fact_title}')"
+
+
+def _worst_antecedent(*, matching):
+    """The rule's antecedent with the most partial matches, i.e. where the search fanned out."""
+    rule = matching['rule']
+    counts = matching['by_antecedent']
+    idx, antecedent = max(enumerate(rule.antecedents), key=lambda item: counts.get(id(item[1]), 0))
+    return f"antecedent {idx} {antecedent} matched {counts.get(id(antecedent), 0)} times"
@@ -0,0 +1,146 @@
+import tracemalloc
+
+
+class MemoryTracker:
+    """Working-memory growth across the inference engines. Like RuleProfiler, attach()
+    swaps wrappers onto one engine instance; attach it to the scaling and planning engines
+    of one run to follow the same WorkingMemory through both.
+
+    Recorded:
+      cycles   WM fact counts per fact_title at the start of every _forward_chain cycle
+               (including those the dispatch rules start from their action_fn), and once
+               more when each engine run ends
+      phases   WorkingMemory.memory_report() when each engine run starts and ends and, with
+               tracemalloc_snapshots, traced memory and the top allocation sites that grew
+               over the run (tracemalloc is started for the run if it isn't already tracing)"""
+    def __init__(self, *, tracemalloc_snapshots=False, top_allocations=10):
+        self.tracemalloc_snapshots = tracemalloc_snapshots
+        self.top_allocations = top_allocations
+        self.cycles = []
+        self.phases = []
+
+    def attach(self, *, engine):
+        """Instrument one engine instance."""
+        tracker = self
+        engine_name = type(engine).__name__
+        wm = engine.working_memory
+
+        run = engine.run
+        def tracked_run(**kwargs):
+            tracker._phase(phase=f"{engine_name} start", wm=wm)
+            started_tracing = tracker.tracemalloc_snapshots and not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            before = tracemalloc.take_snapshot() if tracker.tracemalloc_snapshots else None
+            try:
+                return run(**kwargs)
+            finally:
+                # Snapshot before this bookkeeping allocates anything
+                traced = tracker._trace(before=before) if before is not None else {}
+                if started_tracing:
+                    tracemalloc.stop()
+                tracker._cycle(engine_name=engine_name, cycle='end', wm=wm)
+                tracker._phase(phase=f"{engine_name} end", wm=wm).update(traced)
+        engine.run = tracked_run
+
+        forward_chain = engine._forward_chain
+        def tracked_forward_chain(*, trigger_fact):
+            tracker._cycle(engine_name=engine_name, cycle=engine.cycle + 1, wm=wm)
+            return forward_chain(trigger_fact=trigger_fact)
+        engine._forward_chain = tracked_forward_chain
+
+        return engine
+
+    def growth(self):
+        """One dict per recorded cycle: fact totals and the per-title count changes since
+        the previous record (titles that didn't change are left out)."""
+        rows = []
+        previous = {}
+        for record in self.cycles:
+            by_title = record['by_title']
+            changes = {
+                title: by_title.get(title, 0) - previous.get(title, 0)
+                for title in by_title.keys() | previous.keys()
+                if by_title.get(title, 0) != previous.get(title, 0)
+            }
+            rows.append({
+                'engine': record['engine'],
+                'cycle': record['cycle'],
+                'facts': record['facts'],
+                'consumed': record['consumed'],
+                'growth': dict(sorted(changes.items())),
+            })
+            previous = by_title
+        return rows
+
+    def summary(self):
+        """JSON-ready summary: the final per-title report, per-cycle growth and the phases."""
+        return {
+            'by_title': self.phases[-1]['by_title'] if self.phases else {},
+            'cycles': self.growth(),
+            'phases': [{key: value for key, value in phase.items() if key != 'by_title'} for phase in self.phases],
+        }
+
+    def report(self):
+        """The final per-title report, the phases and the cycles where WM grew, as text."""
+        by_title = self.phases[-1]['by_title'] if self.phases else {}
+        title_width = max([len('fact_title'), *(len(title) for title in by_title)])
+        header = f"{'fact_title':<{title_width}} {'count':>8} {'consumed':>8} {'bytes':>10}"
+        lines = [header, '-' * len(header)]
+        for title, entry in by_title.items():
+            lines.append(f"{title:<{title_width}} {entry['count']:>8} {entry['consumed']:>8} {entry['bytes']:>10}")
+
+        lines.append('')
+        for phase in self.phases:
+            line = f"{phase['phase']}: {phase['facts']} facts, {phase['consumed']} consumed, {phase['bytes']} bytes"
+            if 'traced_kb' in phase:
+                line += f", traced {phase['traced_kb']:.1f} KB (peak {phase['peak_kb']:.1f} KB)"
+            lines.append(line)
+            for allocation in phase.get('top_allocations', ()):
+                lines.append(f"    {allocation['size_diff_kb']:+.1f} KB  {allocation['location']}")
+
+        lines.append('')
+        for row in self.growth():
+            if row['growth']:
+                changes = ', '.join(f"{title} {change:+d}" for title, change in row['growth'].items())
+                lines.append(f"{row['engine']} cycle {row['cycle']}: {row['facts']} facts ({changes})")
+        return '\n'.join(lines)
+
+    def _cycle(self, *, engine_name, cycle, wm):
+        by_title = {}
+        for fact in wm.facts:
+            by_title[fact.fact_title] = by_title.get(fact.fact_title, 0) + 1
+        self.cycles.append({
+            'engine': engine_name,
+            'cycle': cycle,
+            'facts': len(wm.facts),
+            'consumed': len(wm.consumed_facts),
+            'by_title': by_title,
+        })
+
+    def _phase(self, *, phase, wm):
+        by_title = wm.memory_report()
+        record = {
+            'phase': phase,
+            'facts': len(wm.facts),
+            'consumed': len(wm.consumed_facts),
+            'bytes': sum(entry['bytes'] for entry in by_title.values()),
+            'by_title': by_title,
+        }
+        self.phases.append(record)
+        return record
+
+    def _trace(self, *, before):
+        """Traced memory now, and the allocation sites that grew since before (leaving out
+        tracemalloc and this tracker's own per-cycle records)."""
+        traced, peak = tracemalloc.get_traced_memory()
+        ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+        stats = tracemalloc.take_snapshot().filter_traces(ignore).compare_to(before.filter_traces(ignore), 'lineno')
+        return {
+            'traced_kb': traced / 1024,
+            'peak_kb': peak / 1024,
+            'top_allocations': [
+                {'location': str(stat.traceback[0]), 'size_diff_kb': stat.size_diff / 1024, 'count_diff': stat.count_diff}
+                for stat in stats[:self.top_allocations]
+            ],
+        }
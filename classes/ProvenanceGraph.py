@@ -0,0 +1,235 @@
+import json
+import struct
+
+from classes.ExplanationFacility import ExplanationFacility
+
+FORMATS = ('json', 'dot', 'binary')
+
+# Node kinds (as ExplanationFacility labels leaves) and where the fact is at export time:
+# live in WM, consumed (retracted but kept for explanation), retracted by an action_fn,
+# or a KB reference fact
+KINDS = ('INPUT', 'REFERENCE', 'DERIVED')
+STATUSES = ('live', 'consumed', 'retracted', 'reference')
+
+# Binary layout, little-endian: header, string table (u32 length + UTF-8 each), nodes, edges.
+# Strings (titles, rule names, attribute JSON) are interned, so repeated ones cost 4 bytes.
+_MAGIC = b'PROVDAG1'
+_HEADER = struct.Struct('<8sIII')  # magic, strings, nodes, edges
+_LENGTH = struct.Struct('<I')
+_NODE = struct.Struct('<iIBBII')  # id, title, kind, status, attributes, derived_by rule
+_EDGE = struct.Struct('<iiII')  # source, target, rule, firing
+_NO_STRING = 0xFFFFFFFF
+
+
+class ProvenanceGraph:
+    """The whole provenance DAG of a run, for auditing without the explanation REPL: facts
+    as nodes, rule firings as edges from each antecedent fact to each fact the firing
+    derived (its consequent and anything its action_fn asserted). Built in one pass over
+    working memory that visits every fact and derivation once, so export is linear in the
+    size of the DAG. Facts without a fact_id (KB reference facts) get negative ids."""
+    def __init__(self, *, wm, kb):
+        self.nodes = []
+        self.edges = []
+
+        explanation = ExplanationFacility(wm=wm, kb=kb, label="Provenance")
+        live = {id(fact) for fact in wm.facts}
+        node_ids = {}  # id(fact) -> node id
+        firings = {}  # id(derivation) -> firing index
+        unnumbered = 0
+
+        def node_id(fact):
+            nonlocal unnumbered
+            key = id(fact)
+            if key not in node_ids:
+                if fact.fact_id is None:
+                    unnumbered += 1
+                node_ids[key] = fact.fact_id if fact.fact_id is not None else -unnumbered
+                pending.append(fact)
+            return node_ids[key]
+
+        pending = []
+        for fact in sorted([*wm.facts, *wm.consumed_facts.values()], key=lambda fact: fact.fact_id):
+            node_id(fact)
+
+        # Antecedents reached only through derivations (reference facts, retracted facts) are
+        # appended to pending as they are first seen
+        idx = 0
+        while idx < len(pending):
+            fact = pending[idx]
+            idx += 1
+
+            derivation = fact.derivation
+            if derivation is None:
+                kind = explanation._classify_leaf(fact=fact)
+            else:
+                kind = 'DERIVED'
+            if id(fact) in live:
+                status = 'live'
+            elif wm.is_consumed(fact=fact):
+                status = 'consumed'
+            elif fact.fact_id is None:
+                status = 'reference'
+            else:
+                status = 'retracted'
+
+            self.nodes.append({
+                'id': node_ids[id(fact)],
+                'title': fact.fact_title,
+                'kind': kind,
+                'status': status,
+                'attributes': _jsonable(fact.attributes),
+                'derived_by': derivation['rule_name'] if derivation is not None else None,
+            })
+
+            if derivation is not None:
+                firing = firings.setdefault(id(derivation), len(firings))
+                target = node_ids[id(fact)]
+                for antecedent in derivation['antecedent_facts']:
+                    self.edges.append({
+                        'source': node_id(antecedent),
+                        'target': target,
+                        'rule': derivation['rule_name'],
+                        'firing': firing,
+                    })
+
+    def to_dict(self):
+        """JSON-ready {'nodes', 'edges'}."""
+        return {'nodes': self.nodes, 'edges': self.edges}
+
+    def to_dot(self):
+        """Graphviz DOT source, edges pointing from antecedent to derived fact."""
+        lines = [
+            'digraph provenance {',
+            '    rankdir=LR;',
+            '    node [fontsize=10];',
+            '    edge [fontsize=9];',
+        ]
+        shapes = {'INPUT': 'ellipse', 'REFERENCE': 'note', 'DERIVED': 'box'}
+        for node in self.nodes:
+            label = '\n'.join([
+                f"#{node['id']} {node['title']}" if node['id'] > 0 else node['title'],
+                *(f"{key}={json.dumps(value)}" for key, value in node['attributes'].items()),
+            ])
+            style = ', style=dashed' if node['status'] in ('consumed', 'retracted') else ''
+            lines.append(f"    {_dot_id(node['id'])} [label={_dot_string(label)}, shape={shapes[node['kind']]}{style}];")
+        for edge in self.edges:
+            lines.append(f"    {_dot_id(edge['source'])} -> {_dot_id(edge['target'])} [label={_dot_string(edge['rule'])}];")
+        lines.append('}')
+        return '\n'.join(lines) + '\n'
+
+    def to_binary(self):
+        """Compact binary form (see _MAGIC and the structs above); read back with read_binary."""
+        strings = {}
+
+        def intern(text):
+            if text is None:
+                return _NO_STRING
+            return strings.setdefault(text, len(strings))
+
+        nodes = b''.join(
+            _NODE.pack(
+                node['id'],
+                intern(node['title']),
+                KINDS.index(node['kind']),
+                STATUSES.index(node['status']),
+                intern(json.dumps(node['attributes'], separators=(',', ':'))),
+                intern(node['derived_by']),
+            )
+            for node in self.nodes
+        )
+        edges = b''.join(
+            _EDGE.pack(edge['source'], edge['target'], intern(edge['rule']), edge['firing'])
+            for edge in self.edges
+        )
+        table = []
+        for text in strings:
+            encoded = text.encode('utf-8')
+            table.append(_LENGTH.pack(len(encoded)))
+            table.append(encoded)
+        return _HEADER.pack(_MAGIC, len(strings), len(self.nodes), len(self.edges)) + b''.join(table) + nodes + edges
+
+    def write(self, *, path, format=None):
+        """Write in one of FORMATS, by default chosen from path's extension: .json, .dot/.gv,
+        anything else binary."""
+        if format is None:
+            format = _format_for(path=path)
+        if format not in FORMATS:
+            raise ValueError(f"unknown provenance format: {format}")
+        if format == 'binary':
+            with open(path, 'wb') as f:
+                f.write(self.to_binary())
+            return
+        with open(path, 'w') as f:
+            if format == 'json':
+                json.dump(self.to_dict(), f)
+            else:
+                f.write(self.to_dot())
+
+
+def read_binary(*, path):
+    """{'nodes', 'edges'} from a file ProvenanceGraph wrote in binary, as to_dict() gave them.
+    Raises ValueError when the file isn't one."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise ValueError(f"not a provenance file: {path}")
+    magic, num_strings, num_nodes, num_edges = _HEADER.unpack_from(data, 0)
+    if magic != _MAGIC:
+        raise ValueError(f"not a provenance file: {path}")
+
+    offset = _HEADER.size
+    strings = []
+    for _ in range(num_strings):
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        strings.append(data[offset:offset + length].decode('utf-8'))
+        offset += length
+
+    def string(index):
+        return None if index == _NO_STRING else strings[index]
+
+    nodes = []
+    for node_id, title, kind, status, attributes, derived_by in _NODE.iter_unpack(data[offset:offset + num_nodes * _NODE.size]):
+        nodes.append({
+            'id': node_id,
+            'title': strings[title],
+            'kind': KINDS[kind],
+            'status': STATUSES[status],
+            'attributes': json.loads(strings[attributes]),
+            'derived_by': string(derived_by),
+        })
+    offset += num_nodes * _NODE.size
+
+    edges = [
+        {'source': source, 'target': target, 'rule': strings[rule], 'firing': firing}
+        for source, target, rule, firing in _EDGE.iter_unpack(data[offset:offset + num_edges * _EDGE.size])
+    ]
+    return {'nodes': nodes, 'edges': edges}
+
+
+def _format_for(*, path):
+    if path.endswith('.json'):
+        return 'json'
+    if path.endswith(('.dot', '.gv')):
+        return 'dot'
+    return 'binary'
+
+
+def _jsonable(value):
+    """value with containers as JSON lists/objects and anything JSON can't hold as its str()."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_jsonable(item) for item in value]
+    return str(value)
+
+
+def _dot_id(node_id):
+    return f"f{node_id}" if node_id > 0 else f"r{-node_id}"
+
+
+def _dot_string(text):
+    escaped = text.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return f'"{escaped}"'
@@ -1,10 +1,12 @@
 class Rule:
-    def __init__(self, *, antecedents, consequent, priority=0, rule_name=None, action_fn=None):
+    def __init__(self, *, antecedents, consequent, priority=0, rule_name=None, action_fn=None, consumes=None):
         self.antecedents = antecedents
         self.consequent = consequent
         self.priority = priority
         self.rule_name = rule_name
         self.action_fn = action_fn
+        # Titles of matched antecedent facts that are transient: retracted once this rule has fired
+        self.consumes = consumes or []
     
     def __repr__(self):
         return f"Rule('{self.rule_name}', priority={self.priority}, antecedents={len(self.antecedents)})"
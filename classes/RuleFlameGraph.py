@@ -0,0 +1,103 @@
+import time
+
+
+class RuleFlameGraph:
+    """Rule-level flamegraph of the inference engines in Brendan Gregg's folded-stack format
+    (one 'frame;frame;frame count' line per stack), for flamegraph.pl, speedscope, inferno etc.
+    Like RuleProfiler, attach() swaps wrappers onto one engine instance.
+
+    The engines keep no call stack of rules (DFS chaining runs over an explicit frame stack),
+    so this keeps a logical one: the engine's class name at the root, then a frame per
+    firing rule. A rule fired by chaining from a derived fact stacks on the rule that derived
+    it; a rule fired from inside an action_fn (the dispatch rules re-entering the engine)
+    stacks on that action's rule. Matching a rule pushes a 'match:<rule>' frame onto the
+    stack of whatever caused the match.
+    Time is measured, not sampled: every switch of the current stack charges the time since
+    the last switch to the stack being left, so counts are exclusive microseconds."""
+    def __init__(self):
+        self.stacks = {}  # tuple of frames -> exclusive seconds
+        self._stack = ()
+        self._last = time.perf_counter()
+        self._derived_stacks = []  # per open fire_rule_dfs: id(derived fact) -> stack of the rule that derived it
+
+    def attach(self, *, engine):
+        """Instrument one engine instance."""
+        flamegraph = self
+        root = (type(engine).__name__,)
+
+        def within(*, stack, call):
+            previous = flamegraph._switch(stack=stack)
+            try:
+                return call()
+            finally:
+                flamegraph._switch(stack=previous)
+
+        run = engine.run
+        def flamegraph_run(**kwargs):
+            return within(stack=root, call=lambda: run(**kwargs))
+        engine.run = flamegraph_run
+
+        fire_rule_dfs = engine._fire_rule_dfs
+        def flamegraph_fire_rule_dfs(*, rule, bindings, **kwargs):
+            flamegraph._derived_stacks.append({})
+            try:
+                return fire_rule_dfs(rule=rule, bindings=bindings, **kwargs)
+            finally:
+                flamegraph._derived_stacks.pop()
+        engine._fire_rule_dfs = flamegraph_fire_rule_dfs
+
+        fire_rule = engine._fire_rule
+        def flamegraph_fire_rule(*, rule, bindings, **kwargs):
+            matched_facts = bindings.get('_matched_facts') or [None]
+            stack = flamegraph._cause(trigger_fact=matched_facts[0]) + (rule.rule_name,)
+            derived = within(stack=stack, call=lambda: fire_rule(rule=rule, bindings=bindings, **kwargs))
+            if derived is not None and flamegraph._derived_stacks:
+                flamegraph._derived_stacks[-1][id(derived)] = stack
+            return derived
+        engine._fire_rule = flamegraph_fire_rule
+
+        iter_rule_activations = engine._iter_rule_activations
+        def flamegraph_iter_rule_activations(*, rule, anchor_idx, trigger_fact):
+            stack = flamegraph._cause(trigger_fact=trigger_fact) + (f"match:{rule.rule_name}",)
+            activations = iter_rule_activations(rule=rule, anchor_idx=anchor_idx, trigger_fact=trigger_fact)
+            while True:
+                try:
+                    bindings = within(stack=stack, call=lambda: next(activations))
+                except StopIteration:
+                    return
+                yield bindings
+        engine._iter_rule_activations = flamegraph_iter_rule_activations
+
+        return engine
+
+    def folded(self):
+        """Folded-stack lines, 'frame;frame;frame microseconds', sorted by stack."""
+        lines = []
+        for stack, seconds in sorted(self.stacks.items()):
+            micros = round(seconds * 1_000_000)
+            if micros > 0:
+                lines.append(f"{';'.join(stack)} {micros}")
+        return lines
+
+    def write(self, *, path):
+        with open(path, 'w') as f:
+            f.writelines(line + '\n' for line in self.folded())
+
+    def _cause(self, *, trigger_fact):
+        """Stack of the rule whose derived fact is trigger_fact in the DFS chain being chased,
+        else the current stack."""
+        if self._derived_stacks:
+            stack = self._derived_stacks[-1].get(id(trigger_fact))
+            if stack is not None:
+                return stack
+        return self._stack
+
+    def _switch(self, *, stack):
+        """Charge the time since the last switch to the current stack, make stack current and
+        return the one it replaced. Time outside any engine run (the empty stack) is dropped."""
+        now = time.perf_counter()
+        if self._stack:
+            self.stacks[self._stack] = self.stacks.get(self._stack, 0.0) + now - self._last
+        self._last = now
+        previous, self._stack = self._stack, stack
+        return previous
@@ -0,0 +1,88 @@
+from classes.NegatedFact import NegatedFact
+
+
+def _title(antecedent):
+    if isinstance(antecedent, NegatedFact):
+        return antecedent.fact.fact_title
+    return antecedent.fact_title
+
+
+class RuleGraph:
+    """Static producer -> consumer graph of fact titles over a list of rules.
+    A rule produces its consequent's title and consumes the titles of its antecedents.
+    Only consequents are visible here; facts an action_fn asserts directly are not, and
+    they never start a chain either, since the engines only chain from consequents."""
+    def __init__(self, *, rules):
+        self.rules = list(rules)
+        self.producers = {}  # fact_title -> rules whose consequent has that title
+        self.consumers = {}  # fact_title -> rules with an antecedent (plain or negated) on it
+        self.triggered = {}  # fact_title -> rules anchored on it (first positive antecedent)
+        self._strata = None  # list of strata, or the ValueError for cyclic rules
+
+        for rule in self.rules:
+            if rule.consequent is not None:
+                self.producers.setdefault(rule.consequent.fact_title, []).append(rule)
+            anchored = False
+            for antecedent in rule.antecedents:
+                consumers = self.consumers.setdefault(_title(antecedent), [])
+                if not consumers or consumers[-1] is not rule:
+                    consumers.append(rule)
+                if not anchored and not isinstance(antecedent, NegatedFact):
+                    self.triggered.setdefault(antecedent.fact_title, []).append(rule)
+                    anchored = True
+
+    def can_trigger(self, *, fact_title):
+        """Whether a fact with this title can activate any rule, i.e. is worth chaining from."""
+        return fact_title in self.triggered
+
+    def edges(self):
+        """(producer rule, consumer rule, fact_title) for every rule that can feed another."""
+        return [
+            (producer, consumer, fact_title)
+            for fact_title, producers in self.producers.items()
+            for producer in producers
+            for consumer in self.consumers.get(fact_title, ())
+        ]
+
+    def strata(self):
+        """Rules layered by dependency, lowest first: each rule sits one stratum above the
+        highest rule producing any title it matches or negates, so a stratum only reads facts
+        that lower strata derive. A negated antecedent on the rule's own consequent title is
+        a derive-once guard, not a dependency. Computed once per graph. Raises ValueError
+        (every time) when the rules are cyclic."""
+        if isinstance(self._strata, ValueError):
+            raise self._strata
+        if self._strata is not None:
+            return self._strata
+
+        depends_on = {}
+        for rule in self.rules:
+            own_title = rule.consequent.fact_title if rule.consequent is not None else None
+            producers = []
+            for antecedent in rule.antecedents:
+                title = _title(antecedent)
+                if isinstance(antecedent, NegatedFact) and title == own_title:
+                    continue
+                producers.extend(self.producers.get(title, ()))
+            depends_on[id(rule)] = producers
+
+        # Longest-path relaxation; on a cycle strata keep rising past any acyclic bound
+        stratum = {id(rule): 0 for rule in self.rules}
+        for _ in range(len(self.rules) + 1):
+            raised = []
+            for rule in self.rules:
+                level = max((stratum[id(producer)] + 1 for producer in depends_on[id(rule)]), default=0)
+                if level > stratum[id(rule)]:
+                    stratum[id(rule)] = level
+                    raised.append(rule.rule_name)
+            if not raised:
+                break
+        else:
+            self._strata = ValueError(f"rules are cyclic: {', '.join(sorted(set(raised)))}")
+            raise self._strata
+
+        strata = [[] for _ in range(max(stratum.values(), default=-1) + 1)]
+        for rule in self.rules:
+            strata[stratum[id(rule)]].append(rule)
+        self._strata = strata
+        return strata
@@ -0,0 +1,140 @@
+from classes.NegatedFact import NegatedFact
+from classes.BindingEnvironment import BindingEnvironment
+
+# Checks a RuleLinter runs:
+#   cross_join        a positive antecedent sharing no variable with those matched before it, so
+#                     every fact of its title is joined with every partial match so far
+#   unbound_negation  a negated antecedent with variables no earlier positive antecedent binds;
+#                     they match anything, so the negation tests for any fact of its title
+#   general_anchor    a first positive antecedent matching at least general_anchor_share of a
+#                     sample of trigger facts, so the rule is matched against most triggers
+#   undeduplicable    a consequent with variables no positive antecedent binds, on a rule with
+#                     no derive-once guard that doesn't consume its trigger: the match can't tell
+#                     a re-derivation from a new fact, so every re-firing pays the WM duplicate
+#                     scan and asserts a new fact unless the action_fn reproduces the same values
+CHECKS = ('cross_join', 'unbound_negation', 'general_anchor', 'undeduplicable')
+
+
+def _is_variable(value):
+    return isinstance(value, str) and value.startswith('?')
+
+
+def _variables(pattern):
+    return {value for value in pattern.attributes.values() if _is_variable(value)}
+
+
+class RuleLinter:
+    """Static performance lint of rule definitions, for hazards that only show up as slow
+    matching once the rules meet a large working memory. Antecedents are read in the order
+    the engines match them: the anchor (first positive antecedent) first, then the rest as
+    written. general_anchor needs facts, a representative sample of trigger facts (e.g. the
+    working memory after a run); without one it is skipped."""
+    def __init__(self, *, rules, facts=None, general_anchor_share=0.5):
+        self.rules = list(rules)
+        self.facts = list(facts) if facts is not None else None
+        self.general_anchor_share = general_anchor_share
+
+    def findings(self, *, checks=CHECKS):
+        """{'rule', 'check', 'message'} per hazard, rule by rule in order."""
+        for check in checks:
+            if check not in CHECKS:
+                raise ValueError(f"unknown lint check: {check}")
+        findings = []
+        for rule in self.rules:
+            for check in CHECKS:
+                if check in checks:
+                    for message in getattr(self, f"_{check}")(rule=rule):
+                        findings.append({'rule': rule.rule_name, 'check': check, 'message': message})
+        return findings
+
+    def report(self, *, checks=CHECKS):
+        """The findings as text, one line each."""
+        lines = [f"{finding['rule']}: [{finding['check']}] {finding['message']}" for finding in self.findings(checks=checks)]
+        return '\n'.join(lines) if lines else 'No rule performance hazards found'
+
+    def _cross_join(self, *, rule):
+        anchor_idx, order = _match_order(rule=rule)
+        if anchor_idx is None:
+            return []
+        messages = []
+        bound = _variables(rule.antecedents[anchor_idx])
+        for idx in order[1:]:
+            antecedent = rule.antecedents[idx]
+            if isinstance(antecedent, NegatedFact):
+                continue
+            if not _variables(antecedent) & bound:
+                messages.append(f"antecedent {idx} ('{antecedent.fact_title}') shares no variable with the antecedents "
+                                f"before it: every '{antecedent.fact_title}' fact joins every partial match")
+            bound |= _variables(antecedent)
+        return messages
+
+    def _unbound_negation(self, *, rule):
+        _, order = _match_order(rule=rule)
+        messages = []
+        bound = set()
+        for position, idx in enumerate(order):
+            antecedent = rule.antecedents[idx]
+            if not isinstance(antecedent, NegatedFact):
+                bound |= _variables(antecedent)
+                continue
+            unbound = sorted(_variables(antecedent.fact) - bound)
+            if unbound:
+                later = set().union(*(
+                    _variables(rule.antecedents[later_idx]) for later_idx in order[position + 1:]
+                    if not isinstance(rule.antecedents[later_idx], NegatedFact)
+                ))
+                bound_later = [variable for variable in unbound if variable in later]
+                message = (f"antecedent {idx} (NOT '{antecedent.fact.fact_title}') leaves {', '.join(unbound)} unbound: "
+                           f"they match any value")
+                if bound_later:
+                    message += f" ({', '.join(bound_later)} only bound by a later antecedent)"
+                messages.append(message)
+        return messages
+
+    def _general_anchor(self, *, rule):
+        anchor_idx, _ = _match_order(rule=rule)
+        if anchor_idx is None or not self.facts:
+            return []
+        anchor = rule.antecedents[anchor_idx]
+        env = BindingEnvironment(bindings={})
+        matches = sum(1 for fact in self.facts if env.can_unify(pattern=anchor, fact=fact))
+        share = matches / len(self.facts)
+        if share < self.general_anchor_share:
+            return []
+        return [f"anchor ('{anchor.fact_title}') matches {matches} of {len(self.facts)} sample facts ({share:.0%})"]
+
+    def _undeduplicable(self, *, rule):
+        consequent = rule.consequent
+        if consequent is None:
+            return []
+        anchor_idx, _ = _match_order(rule=rule)
+        bound = set().union(*(
+            _variables(antecedent) for antecedent in rule.antecedents if not isinstance(antecedent, NegatedFact)
+        ))
+        unbound = sorted(_variables(consequent) - bound)
+        if not unbound:
+            return []
+        if not rule.action_fn:
+            return [f"consequent ('{consequent.fact_title}') asserts {', '.join(unbound)} literally: "
+                    f"no antecedent binds them and there is no action_fn"]
+        guarded = any(
+            isinstance(antecedent, NegatedFact) and antecedent.fact.fact_title == consequent.fact_title
+            for antecedent in rule.antecedents
+        )
+        consumes_trigger = anchor_idx is not None and rule.antecedents[anchor_idx].fact_title in rule.consumes
+        if guarded or consumes_trigger:
+            return []
+        return [f"consequent ('{consequent.fact_title}') takes {', '.join(unbound)} from the action_fn, with no "
+                f"derive-once guard and no consumed trigger: matching can't deduplicate re-firings"]
+
+
+def _match_order(*, rule):
+    """(anchor index, antecedent indexes in the order the engines match them). The anchor
+    is None for a rule with no positive antecedent, which no trigger can activate."""
+    anchor_idx = next(
+        (idx for idx, antecedent in enumerate(rule.antecedents) if not isinstance(antecedent, NegatedFact)),
+        None,
+    )
+    if anchor_idx is None:
+        return None, list(range(len(rule.antecedents)))
+    return anchor_idx, [anchor_idx] + [idx for idx in range(len(rule.antecedents)) if idx != anchor_idx]
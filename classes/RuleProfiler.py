@@ -0,0 +1,133 @@
+import time
+
+# Per-rule counters, in report column order
+COUNTERS = ('match_attempts', 'unify_calls', 'partial_bindings', 'activations', 'firings')
+TIMERS = ('match_time', 'action_time')
+
+
+class RuleProfiler:
+    """Per-rule performance counters for the inference engines.
+    attach() swaps profiled wrappers onto one engine instance, so an engine built
+    without a profiler runs exactly the unprofiled code. One profiler can be attached
+    to several engines (e.g. scaling then planning) and reports their rules together.
+
+    Counted per rule:
+      match_attempts    times the rule was tried against a trigger
+      unify_calls       pattern/fact unifications while matching it (or inside its action_fn)
+      partial_bindings  antecedents successfully bound on the way to a full match
+      activations       complete binding sets produced
+      firings           times the rule fired
+      match_time        seconds spent producing its activations
+      action_time       seconds in its action_fn, including any rules the action fires itself"""
+    def __init__(self):
+        self.stats = {}  # rule_name -> counters and timers
+        self._current = []  # stats of the rules being matched or fired, innermost last
+
+    def attach(self, *, engine):
+        """Instrument one engine instance."""
+        profiler = self
+
+        iter_rule_activations = engine._iter_rule_activations
+        def profiled_iter_rule_activations(*, rule, anchor_idx, trigger_fact):
+            stats = profiler._stats_for(rule=rule)
+            stats['match_attempts'] += 1
+            return profiler._timed_activations(
+                stats=stats,
+                activations=iter_rule_activations(rule=rule, anchor_idx=anchor_idx, trigger_fact=trigger_fact),
+            )
+        engine._iter_rule_activations = profiled_iter_rule_activations
+
+        unify = engine._unify
+        def profiled_unify(*, pattern, fact, bindings):
+            profiler._count(counter='unify_calls')
+            return unify(pattern=pattern, fact=fact, bindings=bindings)
+        engine._unify = profiled_unify
+
+        class ProfiledBindingEnvironment(engine._binding_environment):
+            def unify(self, *, pattern, fact):
+                profiler._count(counter='unify_calls')
+                return super().unify(pattern=pattern, fact=fact)
+
+            def match_fact(self, *, pattern, fact):
+                if not super().match_fact(pattern=pattern, fact=fact):
+                    return False
+                profiler._count(counter='partial_bindings')
+                return True
+
+            def can_unify(self, *, pattern, fact):
+                profiler._count(counter='unify_calls')
+                return super().can_unify(pattern=pattern, fact=fact)
+        engine._binding_environment = ProfiledBindingEnvironment
+
+        fire_rule = engine._fire_rule
+        def profiled_fire_rule(*, rule, bindings, **kwargs):
+            stats = profiler._stats_for(rule=rule)
+            stats['firings'] += 1
+            profiler._current.append(stats)
+            try:
+                return fire_rule(rule=rule, bindings=bindings, **kwargs)
+            finally:
+                profiler._current.pop()
+        engine._fire_rule = profiled_fire_rule
+
+        run_action = engine._run_action
+        def profiled_run_action(*, rule, bindings, **kwargs):
+            stats = profiler._stats_for(rule=rule)
+            start = time.perf_counter()
+            try:
+                return run_action(rule=rule, bindings=bindings, **kwargs)
+            finally:
+                stats['action_time'] += time.perf_counter() - start
+        engine._run_action = profiled_run_action
+
+        return engine
+
+    def rows(self):
+        """One dict per rule, most expensive (match_time + action_time) first."""
+        rows = [{'rule_name': rule_name, **stats} for rule_name, stats in self.stats.items()]
+        rows.sort(key=lambda row: row['match_time'] + row['action_time'], reverse=True)
+        return rows
+
+    def report(self):
+        """The rows as a fixed-width table, times in milliseconds."""
+        rows = self.rows()
+        name_width = max([len('rule'), *(len(row['rule_name']) for row in rows)])
+        header = f"{'rule':<{name_width}}" + ''.join(f" {column:>16}" for column in COUNTERS) + \
+            ''.join(f" {column + '_ms':>16}" for column in TIMERS)
+        lines = [header, '-' * len(header)]
+        for row in rows:
+            lines.append(
+                f"{row['rule_name']:<{name_width}}"
+                + ''.join(f" {row[column]:>16}" for column in COUNTERS)
+                + ''.join(f" {row[column] * 1000:>16.3f}" for column in TIMERS)
+            )
+        return '\n'.join(lines)
+
+    def _stats_for(self, *, rule):
+        stats = self.stats.get(rule.rule_name)
+        if stats is None:
+            stats = self.stats[rule.rule_name] = {
+                **{counter: 0 for counter in COUNTERS},
+                **{timer: 0.0 for timer in TIMERS},
+            }
+        return stats
+
+    def _count(self, *, counter):
+        if self._current:
+            self._current[-1][counter] += 1
+
+    def _timed_activations(self, *, stats, activations):
+        """Re-yield activations, timing each step of the underlying generator against stats.
+        The rule is current while it runs, so unify calls inside are counted against it."""
+        while True:
+            self._current.append(stats)
+            start = time.perf_counter()
+            try:
+                bindings = next(activations)
+            except StopIteration:
+                return
+            finally:
+                stats['match_time'] += time.perf_counter() - start
+                self._current.pop()
+            stats['activations'] += 1
+            yield bindings
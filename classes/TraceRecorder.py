@@ -0,0 +1,127 @@
+import json
+import time
+
+
+class TraceRecorder:
+    """Chrome trace-event timeline of the inference engines, viewable in chrome://tracing
+    or Perfetto. Like RuleProfiler, attach() swaps wrappers onto one engine instance, so
+    untraced engines run the plain code. Each attached engine gets its own track.
+
+    Spans (complete 'X' events), nested in time as the engine calls them:
+      forward_chain     one _forward_chain cycle: the trigger fact and the cycle number
+      fire_rule_dfs     one _fire_rule_dfs invocation, with depth = how many are open
+                        around it (dispatch rules re-enter the engine from their action_fn)
+      fire:<rule>       one firing, with chain_depth = how far down the DFS chain it is
+      action:<rule>     the rule's action_fn
+      find_matches      one full match pass over the rules indexed under a trigger
+      match:<rule>      one step of a rule's matcher (producing an activation or finishing)
+    Every span carries the rule name and/or the trigger fact id where it has them."""
+    def __init__(self):
+        self.events = []
+        self._start = time.perf_counter()
+        self._chain_depths = []  # per open fire_rule_dfs: id(derived fact) -> chain depth of facts it triggers
+        self._dfs_depth = 0
+        self._next_tid = 1
+
+    def attach(self, *, engine):
+        """Instrument one engine instance."""
+        recorder = self
+        tid = self._next_tid
+        self._next_tid += 1
+        self.events.append({
+            'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid,
+            'args': {'name': type(engine).__name__},
+        })
+
+        def span(*, name, cat, args, call):
+            start = recorder._now()
+            try:
+                return call()
+            finally:
+                recorder.events.append({
+                    'name': name, 'cat': cat, 'ph': 'X', 'pid': 1, 'tid': tid,
+                    'ts': start, 'dur': recorder._now() - start, 'args': args,
+                })
+
+        forward_chain = engine._forward_chain
+        def traced_forward_chain(*, trigger_fact):
+            args = {'trigger_fact_id': trigger_fact.fact_id, 'trigger': trigger_fact.fact_title, 'cycle': engine.cycle + 1}
+            return span(name='forward_chain', cat='cycle', args=args,
+                        call=lambda: forward_chain(trigger_fact=trigger_fact))
+        engine._forward_chain = traced_forward_chain
+
+        fire_rule_dfs = engine._fire_rule_dfs
+        def traced_fire_rule_dfs(*, rule, bindings, **kwargs):
+            args = {'rule': rule.rule_name, 'trigger_fact_id': _trigger_fact_id(bindings), 'depth': recorder._dfs_depth}
+            recorder._dfs_depth += 1
+            recorder._chain_depths.append({})
+            try:
+                return span(name='fire_rule_dfs', cat='dfs', args=args,
+                            call=lambda: fire_rule_dfs(rule=rule, bindings=bindings, **kwargs))
+            finally:
+                recorder._chain_depths.pop()
+                recorder._dfs_depth -= 1
+        engine._fire_rule_dfs = traced_fire_rule_dfs
+
+        fire_rule = engine._fire_rule
+        def traced_fire_rule(*, rule, bindings, **kwargs):
+            matched_facts = bindings.get('_matched_facts') or [None]
+            chain_depths = recorder._chain_depths[-1] if recorder._chain_depths else {}
+            chain_depth = chain_depths.get(id(matched_facts[0]), 0)
+            args = {'rule': rule.rule_name, 'trigger_fact_id': _trigger_fact_id(bindings), 'chain_depth': chain_depth}
+            derived = span(name=f"fire:{rule.rule_name}", cat='fire', args=args,
+                           call=lambda: fire_rule(rule=rule, bindings=bindings, **kwargs))
+            if derived is not None:
+                chain_depths[id(derived)] = chain_depth + 1
+            return derived
+        engine._fire_rule = traced_fire_rule
+
+        run_action = engine._run_action
+        def traced_run_action(*, rule, bindings, **kwargs):
+            args = {'rule': rule.rule_name, 'trigger_fact_id': _trigger_fact_id(bindings)}
+            return span(name=f"action:{rule.rule_name}", cat='action', args=args,
+                        call=lambda: run_action(rule=rule, bindings=bindings, **kwargs))
+        engine._run_action = traced_run_action
+
+        find_matching_rules = engine._find_matching_rules
+        def traced_find_matching_rules(*, trigger_fact):
+            args = {'trigger_fact_id': trigger_fact.fact_id, 'trigger': trigger_fact.fact_title}
+            matches = span(name='find_matches', cat='match', args=args,
+                           call=lambda: find_matching_rules(trigger_fact=trigger_fact))
+            args['matches'] = len(matches)
+            return matches
+        engine._find_matching_rules = traced_find_matching_rules
+
+        iter_rule_activations = engine._iter_rule_activations
+        def traced_iter_rule_activations(*, rule, anchor_idx, trigger_fact):
+            args = {'rule': rule.rule_name, 'trigger_fact_id': trigger_fact.fact_id}
+            activations = iter_rule_activations(rule=rule, anchor_idx=anchor_idx, trigger_fact=trigger_fact)
+            # The matcher is a generator; each step of it is its own span
+            while True:
+                try:
+                    bindings = span(name=f"match:{rule.rule_name}", cat='match', args=args,
+                                    call=lambda: next(activations))
+                except StopIteration:
+                    return
+                yield bindings
+        engine._iter_rule_activations = traced_iter_rule_activations
+
+        return engine
+
+    def trace(self):
+        """The recorded events as a Chrome trace-event JSON object."""
+        return {'traceEvents': self.events, 'displayTimeUnit': 'ms'}
+
+    def write(self, *, path):
+        with open(path, 'w') as f:
+            json.dump(self.trace(), f)
+
+    def _now(self):
+        """Microseconds since the recorder was created (trace-event timestamps)."""
+        return (time.perf_counter() - self._start) * 1_000_000
+
+
+def _trigger_fact_id(bindings):
+    """fact_id of the fact an activation was anchored on (the first matched fact), if any."""
+    matched_facts = bindings.get('_matched_facts')
+    return matched_facts[0].fact_id if matched_facts else None
@@ -1,24 +1,266 @@
+import sys
+import math
+import heapq
+
+
 class WorkingMemory:
-    def __init__(self):
+    def __init__(self, *, verbose=True):
         self.facts = []
         self.next_fact_id = 1
+        self.verbose = verbose
         self._current_derivation = None
 
+        # Bumped on every assert/retract/modify, so engines can tell WM states apart even when size repeats
+        self.revision = 0
+
+        # Transient facts retracted by consume_fact, by fact_id — kept out of matching but
+        # still reachable for explanation (derivations also keep referencing them)
+        self.consumed_facts = {}
+
+        # Occupancy index over equipment_contents facts, maintained by add_fact/remove_fact:
+        # (equipment_name, equipment_id) -> contents facts in WM order, and
+        # (equipment_name, equipment_id) -> {slot_number: contents fact} for slotted contents
+        self._contents = {}
+        self._slots = {}
+
+        # Aggregate views registered with register_aggregate, by name. Each holds its
+        # definition, per-group state, and each counted fact's (group, value) contribution.
+        self._aggregates = {}
+        self._aggregates_by_title = {}
+
     def add_fact(self, *, fact, indent="", silent=False):
         fact.set_fact_id(fact_id=self.next_fact_id)
         if fact.derivation is None and self._current_derivation is not None:
             fact.derivation = self._current_derivation
         self.facts.append(fact)
         self.next_fact_id += 1
-        if not silent:
+        self.revision += 1
+        if fact.fact_title == 'equipment_contents':
+            self._index_contents(fact=fact)
+        for aggregate in self._aggregates_by_title.get(fact.fact_title, ()):
+            self._aggregate_add(aggregate=aggregate, fact=fact)
+        if not silent and self.verbose:
             print(f"{indent}[Asserted] {fact}")
 
     def remove_fact(self, *, fact, indent="", silent=False):
         if fact in self.facts:
             self.facts.remove(fact)
-            if not silent:
+            self.revision += 1
+            if fact.fact_title == 'equipment_contents':
+                self._unindex_contents(fact=fact)
+            for aggregate in self._aggregates_by_title.get(fact.fact_title, ()):
+                self._aggregate_remove(aggregate=aggregate, fact=fact)
+            if not silent and self.verbose:
                 print(f"{indent}[Retracted] {fact}")
 
+    def modify_fact(self, *, fact, indent="", silent=False, **attributes):
+        """Update attributes of a fact in place, keeping indexes and aggregates current.
+        Like remove_fact, a fact not in WM (retracted, consumed or never asserted) is left alone."""
+        if fact not in self.facts:
+            return
+        is_contents = fact.fact_title == 'equipment_contents'
+        aggregates = self._aggregates_by_title.get(fact.fact_title, ())
+        if is_contents:
+            self._unindex_contents(fact=fact)
+        for aggregate in aggregates:
+            self._aggregate_remove(aggregate=aggregate, fact=fact)
+
+        fact.attributes.update(attributes)
+        self.revision += 1
+
+        if is_contents:
+            self._index_contents(fact=fact)
+        for aggregate in aggregates:
+            self._aggregate_add(aggregate=aggregate, fact=fact)
+        if not silent and self.verbose:
+            print(f"{indent}[Modified] {fact}")
+
+    def consume_fact(self, *, fact, indent="", silent=False):
+        """Retract a transient fact that a rule has consumed, keeping it for explanation."""
+        if fact in self.facts:
+            self.remove_fact(fact=fact, silent=True)
+            self.consumed_facts[fact.fact_id] = fact
+            if not silent and self.verbose:
+                print(f"{indent}[Consumed] {fact}")
+
+    def is_consumed(self, *, fact):
+        return self.consumed_facts.get(fact.fact_id) is fact
+
+    def register_aggregate(self, *, name, fact_title, group_by, function, attribute=None):
+        """Declare an aggregate view over facts titled fact_title, grouped by the group_by
+        attributes. function is 'sum', 'count', 'min' or 'max' (all but count read attribute;
+        facts without it are skipped). The view is built from the facts already in WM, then
+        kept current on every assert, retract and modify. Re-registering the same definition
+        is a no-op, so action functions can register at their point of use."""
+        definition = (fact_title, tuple(group_by), function, attribute)
+        existing = self._aggregates.get(name)
+        if existing is not None:
+            if existing['definition'] != definition:
+                raise ValueError(f"aggregate '{name}' is already registered with a different definition")
+            return
+
+        if function not in ('sum', 'count', 'min', 'max'):
+            raise ValueError(f"unknown aggregate function: {function}")
+        if function != 'count' and attribute is None:
+            raise ValueError(f"aggregate function '{function}' needs an attribute")
+
+        aggregate = {
+            'name': name,
+            'definition': definition,
+            'group_by': tuple(group_by),
+            'function': function,
+            'attribute': attribute,
+            'groups': {},
+            'contributions': {},
+        }
+        self._aggregates[name] = aggregate
+        self._aggregates_by_title.setdefault(fact_title, []).append(aggregate)
+        for fact in self.facts:
+            if fact.fact_title == fact_title:
+                self._aggregate_add(aggregate=aggregate, fact=fact)
+
+    def aggregate(self, *, name, **group):
+        """Current value of a registered aggregate for one group (keyword per group_by attribute).
+        Empty groups are 0 for sum and count, None for min and max."""
+        aggregate = self._aggregates[name]
+        key = tuple(group.get(attr) for attr in aggregate['group_by'])
+        state = aggregate['groups'].get(key)
+        function = aggregate['function']
+
+        if state is None:
+            return 0 if function in ('sum', 'count') else None
+        if function == 'count':
+            return state['count']
+        if function == 'sum':
+            return state['total']
+
+        # min/max: drop heap entries whose facts have since been retracted or modified
+        heap = state['heap']
+        contributions = aggregate['contributions']
+        while heap and contributions.get(heap[0][1]) != (key, heap[0][2]):
+            heapq.heappop(heap)
+        if not heap:
+            return None
+        return heap[0][2]
+
+    def _aggregate_add(self, *, aggregate, fact):
+        attribute = aggregate['attribute']
+        if attribute is not None and attribute not in fact.attributes:
+            return
+        key = tuple(fact.attributes.get(attr) for attr in aggregate['group_by'])
+        value = fact.attributes[attribute] if attribute is not None else None
+        aggregate['contributions'][fact.fact_id] = (key, value)
+
+        state = aggregate['groups'].get(key)
+        if state is None:
+            state = aggregate['groups'][key] = {'count': 0, 'partials': [], 'total': 0, 'heap': []}
+        state['count'] += 1
+        function = aggregate['function']
+        if function == 'sum':
+            _running_sum_add(state=state, value=value)
+        elif function == 'min':
+            heapq.heappush(state['heap'], (value, fact.fact_id, value))
+        elif function == 'max':
+            heapq.heappush(state['heap'], (-value, fact.fact_id, value))
+
+    def _aggregate_remove(self, *, aggregate, fact):
+        contribution = aggregate['contributions'].pop(fact.fact_id, None)
+        if contribution is None:
+            return
+        key, value = contribution
+        state = aggregate['groups'][key]
+        state['count'] -= 1
+        if state['count'] == 0:
+            del aggregate['groups'][key]
+        elif aggregate['function'] == 'sum':
+            _running_sum_add(state=state, value=-value)
+        # min/max heap entries are dropped lazily in aggregate()
+
+    def query_contents(self, *, equipment_name, equipment_id, first=False, **attributes):
+        """equipment_contents facts on one piece of equipment, in WM order.
+        Same result as query_facts(fact_title='equipment_contents', ...) without scanning WM."""
+        results = []
+
+        for fact in self._contents.get((equipment_name, equipment_id), ()):
+            if all(fact.attributes.get(key) == value for key, value in attributes.items()):
+                if first:
+                    return fact
+                else:
+                    results.append(fact)
+
+        if first:
+            return None
+        else:
+            return results
+
+    def count_contents(self, *, equipment_name, equipment_id):
+        """Number of equipment_contents facts on one piece of equipment."""
+        return len(self._contents.get((equipment_name, equipment_id), ()))
+
+    def query_slot(self, *, equipment_name, equipment_id, slot_number):
+        """The equipment_contents fact occupying a slot (e.g. an oven rack), or None."""
+        return self._slots.get((equipment_name, equipment_id), {}).get(slot_number)
+
+    def occupied_slots(self, *, equipment_name, equipment_id):
+        """Occupied slot numbers on one piece of equipment, ascending."""
+        return sorted(self._slots.get((equipment_name, equipment_id), {}))
+
+    def next_free_slot(self, *, equipment_name, equipment_id, num_slots):
+        """Lowest slot number in 1..num_slots with no contents, or None when all are occupied."""
+        occupied = self._slots.get((equipment_name, equipment_id), {})
+        if len(occupied) >= num_slots:
+            return None
+        for slot_number in range(1, num_slots + 1):
+            if slot_number not in occupied:
+                return slot_number
+        return None
+
+    def _index_contents(self, *, fact):
+        key = (fact.attributes.get('equipment_name'), fact.attributes.get('equipment_id'))
+        self._contents.setdefault(key, []).append(fact)
+        slot_number = fact.attributes.get('slot_number')
+        if slot_number is not None:
+            self._slots.setdefault(key, {}).setdefault(slot_number, fact)
+
+    def _unindex_contents(self, *, fact):
+        key = (fact.attributes.get('equipment_name'), fact.attributes.get('equipment_id'))
+        contents = self._contents.get(key)
+        if contents is None:
+            return
+        contents.remove(fact)
+        if not contents:
+            del self._contents[key]
+
+        slots = self._slots.get(key)
+        slot_number = fact.attributes.get('slot_number')
+        if slots is not None and slots.get(slot_number) is fact:
+            # Fall back to the next fact in the same slot, if any
+            del slots[slot_number]
+            for other in contents or ():
+                if other.attributes.get('slot_number') == slot_number:
+                    slots[slot_number] = other
+                    break
+            if not slots:
+                del self._slots[key]
+
+    def memory_report(self):
+        """Approximate memory held by facts, per fact_title, largest first:
+        {fact_title: {'count', 'consumed', 'bytes'}}. count is facts in WM, consumed is
+        retracted transients still kept for explanation. bytes covers each fact object, its
+        attribute dict and values, and its derivation record; an object shared between facts
+        (e.g. one derivation for everything a firing asserted) counts once, against the
+        first fact that holds it."""
+        report = {}
+        seen = set()
+        for facts, counter in ((self.facts, 'count'), (self.consumed_facts.values(), 'consumed')):
+            for fact in facts:
+                entry = report.get(fact.fact_title)
+                if entry is None:
+                    entry = report[fact.fact_title] = {'count': 0, 'consumed': 0, 'bytes': 0}
+                entry[counter] += 1
+                entry['bytes'] += _fact_size(fact=fact, seen=seen)
+        return dict(sorted(report.items(), key=lambda item: item[1]['bytes'], reverse=True))
+
     def query_equipment(self, *, equipment_name, first=False, **attributes):
         results = []
         
@@ -65,3 +307,58 @@ class WorkingMemory:
             ):
                 return fact.attributes.get('state')
         return None
+
+
+def _fact_size(*, fact, seen):
+    # The fact object and its __dict__ (attribute names are shared strings, not counted)
+    size = sys.getsizeof(fact) + sys.getsizeof(vars(fact)) + sum(
+        _object_size(obj=value, seen=seen) for key, value in vars(fact).items() if key != 'derivation'
+    )
+    if fact.derivation is not None and id(fact.derivation) not in seen:
+        derivation = fact.derivation
+        seen.add(id(derivation))
+        # The antecedent facts are sized as facts of their own; only the list holding them counts here
+        size += sys.getsizeof(derivation) + sum(
+            _object_size(obj=value, seen=seen)
+            for key, value in derivation.items() if key != 'antecedent_facts'
+        )
+        antecedent_facts = derivation.get('antecedent_facts')
+        if antecedent_facts is not None and id(antecedent_facts) not in seen:
+            seen.add(id(antecedent_facts))
+            size += sys.getsizeof(antecedent_facts)
+    return size
+
+
+def _object_size(*, obj, seen):
+    """sys.getsizeof of obj and the containers and values it holds, skipping Facts and
+    anything already in seen."""
+    if id(obj) in seen or hasattr(obj, 'fact_title'):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_object_size(obj=key, seen=seen) + _object_size(obj=value, seen=seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_object_size(obj=item, seen=seen) for item in obj)
+    return size
+
+
+def _running_sum_add(*, state, value):
+    """Add value to a group's exact running sum. The sum is kept as Shewchuk's
+    non-overlapping partials (what math.fsum accumulates), so adding and subtracting
+    values in any order gives the correctly rounded total, and the number of partials
+    stays bounded by the float exponent range rather than the number of facts."""
+    partials = state['partials']
+    x = float(value)
+    i = 0
+    for y in partials:
+        if abs(x) < abs(y):
+            x, y = y, x
+        hi = x + y
+        lo = y - (hi - x)
+        if lo:
+            partials[i] = lo
+            i += 1
+        x = hi
+    partials[i:] = [x]
+    state['total'] = math.fsum(partials)
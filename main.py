@@ -1,3 +1,4 @@
+import sys
 import argparse
 
 # modules
@@ -5,11 +6,18 @@ import scaling.main
 import planning.main
 
 # classes
-from recipes.chocolate_chip_cookies import chocolate_chip_cookies_recipe
+from recipes.registry import RECIPES
 from classes.KnowledgeBase import KnowledgeBase
 from classes.WorkingMemory import WorkingMemory
 from classes.Fact import Fact
 from classes.ExplanationFacility import ExplanationFacility
+from classes.Agenda import STRATEGIES
+from classes.RuleProfiler import RuleProfiler
+from classes.TraceRecorder import TraceRecorder
+from classes.RuleFlameGraph import RuleFlameGraph
+from classes.MemoryTracker import MemoryTracker
+from classes.ProvenanceGraph import ProvenanceGraph
+from classes.MatchBudget import MatchBudget, BudgetExceeded, LIMITS, parse_limits
 
 # utils
 from utils.print_plan import print_plan
@@ -26,7 +34,7 @@ if __name__ == "__main__":
         type=str,
         help="Recipe to scale",
         default="chocolate_chip_cookies",
-        choices=["chocolate_chip_cookies"],
+        choices=sorted(RECIPES),
     )
 
     parser.add_argument(
@@ -40,17 +48,24 @@ if __name__ == "__main__":
         "--scaling_conflict_resolution",
         type=str,
         default="priority",
-        choices=["priority", "specificity"],
+        choices=STRATEGIES,
         help="Conflict resolution strategy",
     )
 
-    # parser.add_argument(
-    #     "--planning_conflict_resolution",
-    #     type=str,
-    #     default="priority",
-    #     choices=["priority"],
-    #     help="Conflict resolution strategy",
-    # )
+    parser.add_argument(
+        "--planning_conflict_resolution",
+        type=str,
+        default="priority",
+        choices=STRATEGIES,
+        help="Conflict resolution strategy",
+    )
+
+    parser.add_argument(
+        "--short_circuit_matching",
+        action="store_true",
+        default=False,
+        help="Match rules in salience order and fire the first unfired activation\ninstead of matching every rule each cycle",
+    )
 
     parser.add_argument(
         "--num_ovens",
@@ -80,6 +95,66 @@ if __name__ == "__main__":
         help="Run planning engine",
     )
 
+    parser.add_argument(
+        "--profile_rules",
+        action="store_true",
+        default=False,
+        help="Count per-rule match/fire work and print a report at the end",
+    )
+
+    parser.add_argument(
+        "--trace_output",
+        type=str,
+        default=None,
+        help="Write a Chrome trace-event JSON timeline of the engines here (open in chrome://tracing or Perfetto)",
+    )
+
+    parser.add_argument(
+        "--flamegraph_output",
+        type=str,
+        default=None,
+        help="Write rule-level folded stacks here (for flamegraph.pl, speedscope, ...)",
+    )
+
+    parser.add_argument(
+        "--provenance_output",
+        type=str,
+        default=None,
+        help="Write the provenance DAG here: .json, .dot/.gv (Graphviz) or anything else (compact binary)",
+    )
+
+    parser.add_argument(
+        "--memory_report",
+        action="store_true",
+        default=False,
+        help="Account working-memory size per fact_title and growth per cycle, and print a report at the end",
+    )
+
+    parser.add_argument(
+        "--memory_tracemalloc",
+        action="store_true",
+        default=False,
+        help="With --memory_report, also take tracemalloc snapshots around each engine run",
+    )
+
+    parser.add_argument(
+        "--budget",
+        type=str,
+        nargs="+",
+        default=[],
+        metavar="LIMIT=N",
+        help=f"Hard limits that abort the run when crossed. LIMIT is one of: {', '.join(LIMITS)}",
+    )
+
+    parser.add_argument(
+        "--soft_budget",
+        type=str,
+        nargs="+",
+        default=[],
+        metavar="LIMIT=N",
+        help="Soft limits that only warn when crossed (same LIMITs as --budget)",
+    )
+
     parser.add_argument(
         "--explain",
         action="store_true",
@@ -90,11 +165,7 @@ if __name__ == "__main__":
     args = parser.parse_args()
     print("")
 
-    if args.recipe == "chocolate_chip_cookies":
-        recipe = chocolate_chip_cookies_recipe
-    else:
-        print("Invalid recipe selected. Please choose from the following:")
-        exit(1)
+    recipe = RECIPES[args.recipe]
     print("")
 
     print("*"*70)
@@ -102,12 +173,22 @@ if __name__ == "__main__":
     print(f"Chosen Recipe: {args.recipe}")
     print(f"Scaling Factor: {args.scaling_factor}x")
     print(f"Conflict Resolution (Scaling): {args.scaling_conflict_resolution}")
-    # print(f"Conflict Resolution (Planning): {args.planning_conflict_resolution}")
+    print(f"Conflict Resolution (Planning): {args.planning_conflict_resolution}")
     print("*"*70)
     print("")
 
     kb = KnowledgeBase()
     wm = WorkingMemory()
+    profiler = RuleProfiler() if args.profile_rules else None
+    tracer = TraceRecorder() if args.trace_output else None
+    flamegraph = RuleFlameGraph() if args.flamegraph_output else None
+    memory_tracker = MemoryTracker(tracemalloc_snapshots=args.memory_tracemalloc) if args.memory_report else None
+    budget = None
+    if args.budget or args.soft_budget:
+        try:
+            budget = MatchBudget(hard=parse_limits(specs=args.budget), soft=parse_limits(specs=args.soft_budget))
+        except ValueError as e:
+            parser.error(str(e))
 
     wm.add_fact(
         fact=Fact(
@@ -118,7 +199,21 @@ if __name__ == "__main__":
     )
 
     # SCALING #################################################################
-    scaling.main.main(wm=wm, kb=kb, recipe=recipe, args=args)
+    try:
+        scaling.main.main(
+            wm=wm,
+            kb=kb,
+            recipe=recipe,
+            args=args,
+            profiler=profiler,
+            tracer=tracer,
+            flamegraph=flamegraph,
+            memory_tracker=memory_tracker,
+            budget=budget,
+        )
+    except BudgetExceeded as e:
+        print(f"\n❌ Scaling aborted: {e}")
+        sys.exit(1)
 
     # SCALING > results #######################################################
     print("")
@@ -190,7 +285,17 @@ if __name__ == "__main__":
 
     if args.run_planning_engine:
         # PLANNING ############################################################
-        success, plan = planning.main.main(wm=wm, kb=kb, recipe=recipe, args=args)
+        success, plan = planning.main.main(
+            wm=wm,
+            kb=kb,
+            recipe=recipe,
+            args=args,
+            profiler=profiler,
+            tracer=tracer,
+            flamegraph=flamegraph,
+            memory_tracker=memory_tracker,
+            budget=budget,
+        )
 
         # PLANNING > results ##################################################
         if not success:
@@ -198,6 +303,39 @@ if __name__ == "__main__":
         else:
             print(f"\n✅ Planning complete — {len(plan)} action(s) in plan")
             print_plan(plan=plan)
+    # PROFILE #################################################################
+    if profiler is not None:
+        print("")
+        print("*" * 70)
+        print("RULE PROFILE")
+        print("*" * 70)
+        print(profiler.report())
+        print("")
+
+    # TRACE ###################################################################
+    if tracer is not None:
+        tracer.write(path=args.trace_output)
+        print(f"Trace written to {args.trace_output}")
+
+    # FLAMEGRAPH ##############################################################
+    if flamegraph is not None:
+        flamegraph.write(path=args.flamegraph_output)
+        print(f"Folded stacks written to {args.flamegraph_output}")
+
+    # PROVENANCE ##############################################################
+    if args.provenance_output:
+        ProvenanceGraph(wm=wm, kb=kb).write(path=args.provenance_output)
+        print(f"Provenance written to {args.provenance_output}")
+
+    # MEMORY ##################################################################
+    if memory_tracker is not None:
+        print("")
+        print("*" * 70)
+        print("WORKING MEMORY MEMORY REPORT")
+        print("*" * 70)
+        print(memory_tracker.report())
+        print("")
+
     # EXPLANATION #############################################################
     if args.explain:
         explanation = ExplanationFacility(wm=wm, kb=kb, label="Combined")
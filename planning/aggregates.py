@@ -0,0 +1,30 @@
+"""Aggregate views over planning working memory, read by the action functions.
+Each helper registers its view on first use (registration is idempotent) and then
+reads the incrementally maintained value instead of rescanning WM."""
+
+
+def contents_volume(*, wm, equipment_name, equipment_id):
+    """Total volume_in_equipment_unit of the equipment_contents on one piece of equipment."""
+    wm.register_aggregate(
+        name='contents_volume',
+        fact_title='equipment_contents',
+        group_by=['equipment_name', 'equipment_id'],
+        function='sum',
+        attribute='volume_in_equipment_unit',
+    )
+    return wm.aggregate(name='contents_volume', equipment_name=equipment_name, equipment_id=equipment_id)
+
+
+def transfers_completed(*, wm, source_equipment_name, source_equipment_id):
+    """Number of transfer_completed facts out of one source piece of equipment."""
+    wm.register_aggregate(
+        name='transfers_completed',
+        fact_title='transfer_completed',
+        group_by=['source_equipment_name', 'source_equipment_id'],
+        function='count',
+    )
+    return wm.aggregate(
+        name='transfers_completed',
+        source_equipment_name=source_equipment_name,
+        source_equipment_id=source_equipment_id,
+    )
@@ -1,15 +1,49 @@
 from classes.Fact import Fact
+from classes.Agenda import Agenda, RULE_SALIENCE
+from classes.MatchBudget import BudgetExceeded
+from classes.BindingEnvironment import BindingEnvironment
 from classes.NegatedFact import NegatedFact
 
 
 class PlanningEngine:
-    def __init__(self, *, wm, kb, verbose=True):
+    # Knowledge base module holding the planning rules and reference facts
+    MODULE = 'PLANNING'
+    # Environment _iter_antecedent_matches binds into (a RuleProfiler swaps in a counting one)
+    _binding_environment = BindingEnvironment
+
+    def __init__(self, *, wm, kb, conflict_resolution_strategy='priority', verbose=True, short_circuit=False,
+                 profiler=None, tracer=None, flamegraph=None, memory_tracker=None, budget=None):
         self.working_memory = wm
         self.knowledge_base = kb
+        self.conflict_resolution_strategy = conflict_resolution_strategy
         self.verbose = verbose
+        # Scan rules in salience order and stop at the first unfired activation
+        # instead of matching every rule before picking one
+        self.short_circuit = short_circuit
         self.cycle = 0
+        if profiler is not None:
+            profiler.attach(engine=self)
+        if tracer is not None:
+            tracer.attach(engine=self)
+        if flamegraph is not None:
+            flamegraph.attach(engine=self)
+        if memory_tracker is not None:
+            memory_tracker.attach(engine=self)
+        if budget is not None:
+            budget.attach(engine=self)
 
     def run(self, *, recipe):
+        self.knowledge_base.focus(module=self.MODULE)
+        try:
+            return self._run_steps(recipe=recipe)
+        except BudgetExceeded as e:
+            # A hard MatchBudget limit aborts the plan like any other planning failure
+            self.last_error = str(e)
+            return (False, self.last_error)
+        finally:
+            self.knowledge_base.pop_focus()
+
+    def _run_steps(self, *, recipe):
         self.plan = []
         self.recipe = recipe
         self.last_error = None
@@ -55,7 +89,7 @@ class PlanningEngine:
             if step_type == 'GENERIC':
                 # Transition resolved equipment from RESERVED -> IN_USE
                 for eq in resolved_equipment:
-                    eq.attributes['state'] = 'IN_USE'
+                    self.working_memory.modify_fact(fact=eq, silent=True, state='IN_USE')
                     if self.verbose:
                         print(f"  -> {eq.attributes['equipment_name']} #{eq.attributes['equipment_id']} is now IN_USE")
                 self.plan.append(step)
@@ -96,7 +130,7 @@ class PlanningEngine:
 
             # Transition resolved equipment from RESERVED -> IN_USE
             for eq in resolved_equipment:
-                eq.attributes['state'] = 'IN_USE'
+                self.working_memory.modify_fact(fact=eq, silent=True, state='IN_USE')
                 if self.verbose:
                     print(f"  -> {eq.attributes['equipment_name']} #{eq.attributes['equipment_id']} is now IN_USE")
 
@@ -126,49 +160,27 @@ class PlanningEngine:
         any_rule_fired = False
         fired = set()
 
-        print("")
-        print(f'🔁 CYCLE: {self.cycle}')
-        print(f'🧠 CURRENT WORKING MEMORY ({len(self.working_memory.facts)})\n')
-        for fact in self.working_memory.facts:
-            print(f"\t{fact}")
-        print('###############################################################################')
-
-        matches = self._find_matching_rules(trigger_fact=trigger_fact)
-        print("")
-        print(f"🧠 Matches Found {len(matches)}")
-        if not matches:
-            print(f"No rules matched trigger - nothing new added to working memory")
-        while matches:
-            if self.last_error:
-                break
-
-            wm_size = len(self.working_memory.facts)
-
-            # Filter out already-fired matches
-            fresh = []
-            for m_rule, m_bindings in matches:
-                binding_key = frozenset(
-                    (k, v) for k, v in m_bindings.items()
-                    if isinstance(k, str) and k.startswith('?')
-                )
-                has_negated = any(
-                    isinstance(a, NegatedFact) for a in m_rule.antecedents
-                )
-                if has_negated:
-                    key = (m_rule.rule_name, wm_size, binding_key)
-                else:
-                    key = (m_rule.rule_name, binding_key)
-                if key not in fired:
-                    fresh.append((m_rule, m_bindings, key))
-            if not fresh:
+        if self.verbose:
+            print("")
+            print(f'🔁 CYCLE: {self.cycle}')
+            print(f'🧠 CURRENT WORKING MEMORY ({len(self.working_memory.facts)})\n')
+            for fact in self.working_memory.facts:
+                print(f"\t{fact}")
+            print('###############################################################################')
+
+        matches = None
+        if not self.short_circuit:
+            matches = self._find_matching_rules(trigger_fact=trigger_fact)
+            if self.verbose:
+                print("")
+                print(f"🧠 Matches Found {len(matches)}")
+                if not matches:
+                    print(f"No rules matched trigger - nothing new added to working memory")
+        while True:
+            selected = self._next_activation(trigger_fact=trigger_fact, matches=matches, fired=fired)
+            if selected is None:
                 break
-
-            best_idx = max(
-                range(len(fresh)),
-                key=lambda i: fresh[i][0].priority,
-            )
-            best_rule, best_bindings, fire_key = fresh[best_idx]
-            fired.add(fire_key)
+            best_rule, best_bindings = selected
 
             self._last_bindings = best_bindings
             any_rule_fired = True
@@ -182,9 +194,11 @@ class PlanningEngine:
                 break
 
             # Re-evaluate: new facts may have changed what matches
-            matches = self._find_matching_rules(trigger_fact=trigger_fact)
-            print("")
-            print(f"🧠 Matches Found {len(matches)}")
+            if not self.short_circuit:
+                matches = self._find_matching_rules(trigger_fact=trigger_fact)
+                if self.verbose:
+                    print("")
+                    print(f"🧠 Matches Found {len(matches)}")
 
         return (any_rule_fired, last_derived)
 
@@ -202,7 +216,7 @@ class PlanningEngine:
                 state='AVAILABLE',
             )
             if available:
-                available.attributes['state'] = 'RESERVED'
+                self.working_memory.modify_fact(fact=available, silent=True, state='RESERVED')
                 resolved.append(available)
                 continue
 
@@ -213,9 +227,9 @@ class PlanningEngine:
                 state='DIRTY',
             )
             if dirty:
-                matches = self._find_matching_rules(trigger_fact=dirty)
-                if matches:
-                    best_rule, best_bindings = self._resolve_conflict(matches=matches)
+                best = self._best_match(trigger_fact=dirty)
+                if best is not None:
+                    best_rule, best_bindings = best
                     best_bindings['reserve_after_cleaning'] = True
                     derived = self._fire_rule_dfs(rule=best_rule, bindings=best_bindings)
                     if self.verbose:
@@ -231,68 +245,100 @@ class PlanningEngine:
         return resolved
 
     def _match_antecedents(self, *, antecedents, bindings):
-        """Recursively match a list of antecedents against ALL facts in WM + KB.
-        Returns all valid binding sets. Handles NegatedFact via negation-as-failure."""
-        if not antecedents:
-            return [bindings]
-
-        first = antecedents[0]
-        rest = antecedents[1:]
+        """Match a list of antecedents against ALL facts in WM.
+        Returns all valid binding sets, in the order _iter_antecedent_matches yields them."""
+        return list(self._iter_antecedent_matches(antecedents=antecedents, bindings=bindings))
+
+    def _iter_antecedent_matches(self, *, antecedents, bindings):
+        """Lazily yield the binding sets that satisfy antecedents, depth-first in the same order
+        as a recursive left-to-right search, so a caller that only needs the first result stops
+        the search there. One BindingEnvironment is bound and undone in place along the way;
+        a dict is only built per yielded binding set. Handles NegatedFact via negation-as-failure."""
         all_facts = self.working_memory.facts
+        env = self._binding_environment(bindings=bindings)
+        # Frames: (antecedent index, remaining candidate facts, environment mark on entry)
+        stack = [(0, iter(all_facts), env.mark())]
+
+        while stack:
+            ant_idx, candidates, mark = stack[-1]
+            # Backtrack whatever the previous candidate at this depth bound
+            env.undo(mark=mark)
+
+            if ant_idx == len(antecedents):
+                stack.pop()
+                yield env.snapshot()
+                continue
+
+            antecedent = antecedents[ant_idx]
+            if isinstance(antecedent, NegatedFact):
+                stack.pop()
+                pattern = antecedent.fact
+                title = pattern.fact_title
+                if not any(fact.fact_title == title and env.can_unify(pattern=pattern, fact=fact) for fact in all_facts):
+                    stack.append((ant_idx + 1, iter(all_facts), env.mark()))
+                continue
 
-        if isinstance(first, NegatedFact):
-            pattern = first.fact
-            for fact in all_facts:
-                if self._unify(pattern=pattern, fact=fact, bindings=bindings) is not None:
-                    return []
-            return self._match_antecedents(antecedents=rest, bindings=bindings)
-
-        results = []
-        for fact in all_facts:
-            new_bindings = self._unify(pattern=first, fact=fact, bindings=bindings)
-            if new_bindings is not None:
-                new_bindings['_matched_facts'] = bindings.get('_matched_facts', []) + [fact]
-                sub_results = self._match_antecedents(antecedents=rest, bindings=new_bindings)
-                results.extend(sub_results)
-        return results
+            title = antecedent.fact_title
+            for fact in candidates:
+                if fact.fact_title == title and env.match_fact(pattern=antecedent, fact=fact):
+                    stack.append((ant_idx + 1, iter(all_facts), env.mark()))
+                    break
+            else:
+                stack.pop()
 
     def _find_matching_rules(self, *, trigger_fact):
         """Return all (rule, bindings) pairs whose antecedents are satisfied.
         Uses trigger_fact as a cheap filter: only consider rules where at least one
         positive antecedent unifies with the trigger. Then do full multi-antecedent
         matching, but anchor one antecedent to the trigger fact specifically."""
-        matches = []
-        for rule in self.knowledge_base.rules:
+        return list(self._iter_matching_rules(trigger_fact=trigger_fact))
+
+    def _iter_matching_rules(self, *, trigger_fact):
+        """Lazily yield (rule, bindings) activations for trigger_fact, rule by rule in KB order.
+        Only rules the KB indexes under the trigger's title are tried. Activations are
+        deduplicated by _activation_key (a hashed set) as they are produced."""
+        # A consumed trigger has left WM and can't anchor new matches
+        if self.working_memory.is_consumed(fact=trigger_fact):
+            return
+
+        seen = set()
+        for rule, anchor_idx in self.knowledge_base.rules_for_trigger(fact_title=trigger_fact.fact_title):
+            for bindings in self._iter_rule_activations(rule=rule, anchor_idx=anchor_idx, trigger_fact=trigger_fact):
+                key = self._activation_key(rule=rule, bindings=bindings)
+                if key not in seen:
+                    seen.add(key)
+                    if self.verbose:
+                        print(f'✅ Match succeeded')
+                    yield (rule, bindings)
+
+    def _iter_rule_activations(self, *, rule, anchor_idx, trigger_fact):
+        """Lazily yield the binding sets for one rule, with antecedent anchor_idx anchored on trigger_fact."""
+        if self.verbose:
             print("")
             print(f'👀 Attempting to match: \trule "{rule.rule_name}" 👉 fact "{trigger_fact.fact_title}"')
 
-            # Find which positive antecedent(s) unify with trigger_fact
-            for ant_idx, antecedent in enumerate(rule.antecedents):
-                if isinstance(antecedent, NegatedFact):
-                    continue
-
-                initial_bindings = self._unify(pattern=antecedent, fact=trigger_fact, bindings={})
-                if initial_bindings is None:
-                    print(f'❌ Match Failed')
-                    break
-                    # continue
-
-                initial_bindings['_matched_facts'] = [trigger_fact]
-
-                # Anchor: this antecedent MUST bind to trigger_fact.
-                # Match remaining antecedents against all WM facts.
-                remaining = rule.antecedents[:ant_idx] + rule.antecedents[ant_idx + 1:]
-                bindings_list = self._match_antecedents(antecedents=remaining, bindings=initial_bindings)
-                if not bindings_list:
-                    print(f'❌ Match Failed')
-                for bindings in bindings_list:
-                    # Deduplicate: avoid adding the same bindings twice
-                    if (rule, bindings) not in matches:
-                        print(f'✅ Match succeeded')
-                        matches.append((rule, bindings))
-                break  # Only anchor to first matching antecedent per rule
-
-        return matches
+        initial_bindings = self._unify(pattern=rule.antecedents[anchor_idx], fact=trigger_fact, bindings={})
+        if initial_bindings is None:
+            if self.verbose:
+                print(f'❌ Match Failed')
+            return
+
+        initial_bindings['_matched_facts'] = [trigger_fact]
+
+        # Anchor: this antecedent MUST bind to trigger_fact.
+        # Match remaining antecedents against all WM facts.
+        remaining = rule.antecedents[:anchor_idx] + rule.antecedents[anchor_idx + 1:]
+        matched = False
+        for bindings in self._iter_antecedent_matches(antecedents=remaining, bindings=initial_bindings):
+            matched = True
+            yield bindings
+        if not matched and self.verbose:
+            print(f'❌ Match Failed')
+
+    def _activation_key(self, *, rule, bindings):
+        """Hashable identity of an activation: the rule plus the exact facts it matched.
+        The variable bindings follow from those facts, so equal keys mean equal activations."""
+        return (id(rule), tuple(id(fact) for fact in bindings['_matched_facts']))
 
     def _fact_exists(self, *, fact):
         """Check if an identical fact is already in working memory."""
@@ -344,9 +390,45 @@ class PlanningEngine:
 
     def _fire_rule_dfs(self, *, rule, bindings, plan_override=None):
         """Fire a rule: run action_fn if present, then derive consequent if present.
-        DFS: if the derived fact triggers further rules, fire them recursively.
-        After DFS chaining on a consequent, re-evaluate matches for the derived fact
-        to enable data-driven iteration (e.g., processing multiple pending_ingredient facts)."""
+        DFS: if the derived fact triggers further rules, fire them depth-first.
+        After each chained firing, re-evaluate matches for the derived fact
+        to enable data-driven iteration (e.g., processing multiple pending_ingredient facts).
+        The chain runs over an explicit stack with one frame per derived fact still being
+        chased, so chain depth is not bounded by the interpreter recursion limit."""
+        derived = self._fire_rule(rule=rule, bindings=bindings, plan_override=plan_override)
+        if derived is None:
+            return None
+
+        stack = []
+        if self._can_chain(derived=derived):
+            stack.append(self._chain_frame(derived=derived))
+        while stack:
+            frame = stack[-1]
+            if frame['resumed']:
+                # Resuming after a chained firing: new facts may enable new matches
+                if self.last_error:
+                    stack.pop()
+                    continue
+                frame['resumed'] = False
+                if not self.short_circuit:
+                    frame['matches'] = self._find_chain_matches(trigger_fact=frame['derived'])
+
+            selected = self._next_activation(trigger_fact=frame['derived'], matches=frame['matches'], fired=frame['fired'])
+            if selected is None:
+                stack.pop()
+                continue
+
+            chain_rule, chain_bindings = selected
+            frame['resumed'] = True
+            chain_derived = self._fire_rule(rule=chain_rule, bindings=chain_bindings, plan_override=plan_override)
+            if chain_derived is not None and self._can_chain(derived=chain_derived):
+                stack.append(self._chain_frame(derived=chain_derived))
+
+        return derived
+
+    def _fire_rule(self, *, rule, bindings, plan_override):
+        """Fire one rule without chaining: run action_fn, then assert the consequent.
+        Returns the derived fact to chain from, or None (no consequent, or action error)."""
         matched_facts = bindings.get('_matched_facts', [])
         derivation = {'rule_name': rule.rule_name, 'antecedent_facts': list(matched_facts)}
         prev_derivation = self.working_memory._current_derivation
@@ -355,7 +437,7 @@ class PlanningEngine:
         if rule.action_fn:
             target_plan = plan_override if plan_override is not None else self.plan
             bindings['_engine'] = self  # orchestration rules use this
-            bindings = rule.action_fn(bindings=bindings, wm=self.working_memory, kb=self.knowledge_base, plan=target_plan)
+            bindings = self._run_action(rule=rule, bindings=bindings, plan=target_plan)
 
         # Skip consequent if action_fn signaled an error
         if '?error' in bindings:
@@ -377,67 +459,144 @@ class PlanningEngine:
                     print(f"[Rule fired] {rule.rule_name} -> No new WM assertions (fact already exists)")
 
             self.working_memory._current_derivation = prev_derivation
+            self._retract_consumed(rule=rule, matched_facts=matched_facts)
+            return derived
+        elif self.verbose:
+            print(f"👀 No new WM assertions")
 
-            # DFS: check if derived fact triggers further rules.
-            # Track fired (rule_name, bindings) to prevent re-firing the same match.
-            # Rules with NegatedFact antecedents can re-fire with same bindings when
-            # WM changes (the negated guard may flip), so include wm_size in their key.
-            fired = set()
-            chain_matches = self._find_matching_rules(trigger_fact=derived)
+        self.working_memory._current_derivation = prev_derivation
+        self._retract_consumed(rule=rule, matched_facts=matched_facts)
+        return None
+
+    def _can_chain(self, *, derived):
+        """Whether any visible rule anchors on derived's title. When none does (per the static
+        RuleGraph) there is nothing to chase, so no frame is pushed and no matching is done."""
+        return self.knowledge_base.rule_graph().can_trigger(fact_title=derived.fact_title)
+
+    def _run_action(self, *, rule, bindings, plan):
+        return rule.action_fn(bindings=bindings, wm=self.working_memory, kb=self.knowledge_base, plan=plan)
+
+    def _chain_frame(self, *, derived):
+        """DFS stack frame for chasing the rules a derived fact triggers.
+        fired tracks (rule_name, bindings) already fired from this frame; matches stays
+        None in short-circuit mode, where activations are found by _next_activation."""
+        return {
+            'derived': derived,
+            'fired': set(),
+            'matches': None if self.short_circuit else self._find_chain_matches(trigger_fact=derived),
+            'resumed': False,
+        }
+
+    def _find_chain_matches(self, *, trigger_fact):
+        matches = self._find_matching_rules(trigger_fact=trigger_fact)
+        if self.verbose:
             print("")
-            print(f"🧠 Matches Found {len(chain_matches)}")
-            while chain_matches:
-                if self.last_error:
-                    break
+            print(f"🧠 Matches Found {len(matches)}")
+        return matches
 
-                wm_size = len(self.working_memory.facts)
-
-                # Filter out already-fired matches
-                fresh = []
-                for m_rule, m_bindings in chain_matches:
-                    binding_key = frozenset(
-                        (k, v) for k, v in m_bindings.items()
-                        if isinstance(k, str) and k.startswith('?')
-                    )
-                    # Rules with NegatedFact guards may validly re-fire when WM
-                    # changes (e.g., T2 iterates sheets via NOT all_sheets_transferred).
-                    # Include wm_size so new WM state = fresh firing chance.
-                    has_negated = any(
-                        isinstance(a, NegatedFact) for a in m_rule.antecedents
-                    )
-                    if has_negated:
-                        key = (m_rule.rule_name, wm_size, binding_key)
-                    else:
-                        key = (m_rule.rule_name, binding_key)
-                    if key not in fired:
-                        fresh.append((m_rule, m_bindings, key))
-                if not fresh:
-                    break
+    def _next_activation(self, *, trigger_fact, matches, fired):
+        """Next (rule, bindings) to fire for trigger_fact, recorded in fired, or None.
+        matches is the full match list, or None in short-circuit mode. Strategies that
+        rank activations by more than the rule (recency, lex, mea) can't short-circuit,
+        so they always match in full."""
+        if matches is None:
+            salience = RULE_SALIENCE.get(self.conflict_resolution_strategy)
+            if salience is not None:
+                return self._first_unfired_by_salience(trigger_fact=trigger_fact, fired=fired, salience=salience)
+            if self.last_error:
+                return None
+            matches = self._find_matching_rules(trigger_fact=trigger_fact)
+        return self._select_unfired(matches=matches, fired=fired)
 
-                best_idx = max(
-                    range(len(fresh)),
-                    key=lambda i: fresh[i][0].priority,
-                )
-                best_chain_rule, best_chain_bindings, fire_key = fresh[best_idx]
-                fired.add(fire_key)
+    def _select_unfired(self, *, matches, fired):
+        """Pop the best match not yet in fired off an Agenda and record it there.
+        Fire keys are only computed for the activations popped.
+        Returns (rule, bindings), or None when nothing fresh is left or an error is pending."""
+        if self.last_error:
+            return None
 
-                self._fire_rule_dfs(rule=best_chain_rule, bindings=best_chain_bindings, plan_override=plan_override)
+        if not matches:
+            return None
 
-                if self.last_error:
-                    break
+        wm_revision = self.working_memory.revision
 
-                # Re-evaluate: new facts may enable new matches for the derived trigger
-                chain_matches = self._find_matching_rules(trigger_fact=derived)
-                print("")
-                print(f"🧠 Matches Found {len(chain_matches)}")
+        agenda = Agenda(strategy=self.conflict_resolution_strategy)
+        agenda.extend(activations=((m_rule, m_bindings, None) for m_rule, m_bindings in matches))
+        while agenda:
+            best_rule, best_bindings, _ = agenda.pop()
+            fire_key = self._fire_key(rule=best_rule, bindings=best_bindings, wm_revision=wm_revision)
+            if fire_key not in fired:
+                fired.add(fire_key)
+                return (best_rule, best_bindings)
+        return None
 
-            return derived
-        else:
-            print(f"👀 No new WM assertions")
+    def _first_unfired_by_salience(self, *, trigger_fact, fired, salience):
+        """Short-circuit counterpart of _find_matching_rules + _select_unfired. Rules are scanned
+        in descending salience (ties in KB order), so the first unfired activation found is the
+        one _select_unfired would pick, and no rule after it is matched at all."""
+        if self.last_error or self.working_memory.is_consumed(fact=trigger_fact):
+            return None
 
-        self.working_memory._current_derivation = prev_derivation
+        wm_revision = self.working_memory.revision
+        for rule, anchor_idx in self.knowledge_base.rules_by_salience(fact_title=trigger_fact.fact_title, salience=salience):
+            for bindings in self._iter_rule_activations(rule=rule, anchor_idx=anchor_idx, trigger_fact=trigger_fact):
+                key = self._fire_key(rule=rule, bindings=bindings, wm_revision=wm_revision)
+                if key not in fired:
+                    if self.verbose:
+                        print(f'✅ Match succeeded')
+                    fired.add(key)
+                    return (rule, bindings)
         return None
 
+    def _fire_key(self, *, rule, bindings, wm_revision):
+        """Identity of a firing for the fired sets: (rule_name, bindings).
+        Rules with NegatedFact guards may validly re-fire with the same bindings when WM
+        changes (e.g., M2 iterates ingredients via NOT ingredient_processed), so their
+        fire key includes the WM revision: new WM state = fresh firing chance."""
+        binding_key = frozenset(
+            (k, v) for k, v in bindings.items()
+            if isinstance(k, str) and k.startswith('?')
+        )
+        has_negated = any(
+            isinstance(a, NegatedFact) for a in rule.antecedents
+        )
+        if has_negated:
+            return (rule.rule_name, wm_revision, binding_key)
+        return (rule.rule_name, binding_key)
+
+    def _retract_consumed(self, *, rule, matched_facts):
+        """Retract the matched facts whose titles the rule consumes (transient request facts)."""
+        for fact in matched_facts:
+            if fact.fact_title in rule.consumes:
+                self.working_memory.consume_fact(fact=fact, indent="  ", silent=not self.verbose)
+
     def _resolve_conflict(self, *, matches):
-        """Pick the best (rule, bindings) from a list. Priority-based."""
-        return max(matches, key=lambda x: x[0].priority)
+        """Pick the best (rule, bindings) from a list using an Agenda for the
+        conflict resolution strategy (priority by default; see classes/Agenda.py)."""
+        agenda = Agenda(strategy=self.conflict_resolution_strategy)
+        agenda.extend(activations=((rule, bindings, None) for rule, bindings in matches))
+        best = agenda.pop()
+        if best is None:
+            return None
+        rule, bindings, _ = best
+        return (rule, bindings)
+
+    def _best_match(self, *, trigger_fact):
+        """The (rule, bindings) _resolve_conflict would pick from _find_matching_rules, or None.
+        Under a rule-level strategy (priority, specificity) rules are tried in descending
+        salience (ties in KB order) and matching stops at the first activation, since no
+        rule after it can win."""
+        if self.working_memory.is_consumed(fact=trigger_fact):
+            return None
+
+        salience = RULE_SALIENCE.get(self.conflict_resolution_strategy)
+        if salience is None:
+            return self._resolve_conflict(matches=self._find_matching_rules(trigger_fact=trigger_fact))
+
+        for rule, anchor_idx in self.knowledge_base.rules_by_salience(fact_title=trigger_fact.fact_title, salience=salience):
+            bindings = next(self._iter_rule_activations(rule=rule, anchor_idx=anchor_idx, trigger_fact=trigger_fact), None)
+            if bindings is not None:
+                if self.verbose:
+                    print(f'✅ Match succeeded')
+                return (rule, bindings)
+        return None
@@ -22,64 +22,58 @@ from planning.rules.cook_dispatch_rules import get_cook_dispatch_rules
 from scaling.facts.measurement_unit_conversions import get_measurement_unit_conversion_facts
 from planning.facts.transfer_reference_facts import get_transfer_reference_facts
 
-def main(*, wm, kb, recipe, args):
-    print("*"*70)
-    print("⚙️⚙️ CONFIGURE KNOWLEDGE BASE ⚙️⚙️")
-    print("*"*70)
-    print("")
 
+def configure_knowledge_base(*, kb):
+    """Load the planning rules and reference facts into the knowledge base's PLANNING module"""
     equipment_status_rules = get_equipment_status_rules()
-    kb.add_rules(rules=equipment_status_rules)
+    kb.add_rules(rules=equipment_status_rules, module=PlanningEngine.MODULE)
 
     ingredient_rules = get_ingredient_rules()
-    kb.add_rules(rules=ingredient_rules)
+    kb.add_rules(rules=ingredient_rules, module=PlanningEngine.MODULE)
 
     transfer_rules = get_transfer_rules()
-    kb.add_rules(rules=transfer_rules)
+    kb.add_rules(rules=transfer_rules, module=PlanningEngine.MODULE)
 
     equipment_transfer_rules = get_equipment_transfer_rules()
-    kb.add_rules(rules=equipment_transfer_rules)
+    kb.add_rules(rules=equipment_transfer_rules, module=PlanningEngine.MODULE)
 
     cooking_rules = get_cooking_rules()
-    kb.add_rules(rules=cooking_rules)
+    kb.add_rules(rules=cooking_rules, module=PlanningEngine.MODULE)
 
     removal_rules = get_removal_rules()
-    kb.add_rules(rules=removal_rules)
+    kb.add_rules(rules=removal_rules, module=PlanningEngine.MODULE)
 
     step_dispatch_rules = get_step_dispatch_rules()
-    kb.add_rules(rules=step_dispatch_rules)
+    kb.add_rules(rules=step_dispatch_rules, module=PlanningEngine.MODULE)
 
     mixing_dispatch_rules = get_mixing_dispatch_rules()
-    kb.add_rules(rules=mixing_dispatch_rules)
+    kb.add_rules(rules=mixing_dispatch_rules, module=PlanningEngine.MODULE)
 
     transfer_dispatch_rules = get_transfer_dispatch_rules()
-    kb.add_rules(rules=transfer_dispatch_rules)
+    kb.add_rules(rules=transfer_dispatch_rules, module=PlanningEngine.MODULE)
 
     removal_dispatch_rules = get_removal_dispatch_rules()
-    kb.add_rules(rules=removal_dispatch_rules)
+    kb.add_rules(rules=removal_dispatch_rules, module=PlanningEngine.MODULE)
 
     surface_transfer_dispatch_rules = get_surface_transfer_dispatch_rules()
-    kb.add_rules(rules=surface_transfer_dispatch_rules)
+    kb.add_rules(rules=surface_transfer_dispatch_rules, module=PlanningEngine.MODULE)
 
     equipment_transfer_dispatch_rules = get_equipment_transfer_dispatch_rules()
-    kb.add_rules(rules=equipment_transfer_dispatch_rules)
+    kb.add_rules(rules=equipment_transfer_dispatch_rules, module=PlanningEngine.MODULE)
 
     cook_dispatch_rules = get_cook_dispatch_rules()
-    kb.add_rules(rules=cook_dispatch_rules)
+    kb.add_rules(rules=cook_dispatch_rules, module=PlanningEngine.MODULE)
 
     unit_conversion_facts = get_measurement_unit_conversion_facts()
-    kb.add_reference_facts(facts=unit_conversion_facts)
+    kb.add_reference_facts(facts=unit_conversion_facts, module=PlanningEngine.MODULE)
 
     transfer_reference_facts = get_transfer_reference_facts()
-    kb.add_reference_facts(facts=transfer_reference_facts)
+    kb.add_reference_facts(facts=transfer_reference_facts, module=PlanningEngine.MODULE)
 
-    print("*"*70)
-    print("⚙️⚙️ CONFIGURE WORKING MEMORY > User Equipment ⚙️⚙️")
-    # this is currently hardcoded but will eventually become a query to the user at the start of the process to confirm what equipment they have at their disposal
-    print("*"*70)
-    print("")
 
-    for idx in range(args.num_ovens):
+def configure_equipment(*, wm, num_ovens, num_bowls, num_baking_sheets):
+    """Assert the user's equipment inventory as EQUIPMENT facts"""
+    for idx in range(num_ovens):
         wm.add_fact(fact=Fact(
             fact_title='EQUIPMENT',
             equipment_type='APPLIANCE',
@@ -89,7 +83,7 @@ def main(*, wm, kb, recipe, args):
             number_of_racks=2,
         ), silent=True)
 
-    for idx in range(args.num_bowls):
+    for idx in range(num_bowls):
         wm.add_fact(fact=Fact(
             fact_title='EQUIPMENT',
             equipment_type='CONTAINER',
@@ -100,7 +94,7 @@ def main(*, wm, kb, recipe, args):
             volume_unit='QUARTS',
         ), silent=True)
 
-    for idx in range(args.num_baking_sheets):
+    for idx in range(num_baking_sheets):
         wm.add_fact(fact=Fact(
             fact_title='EQUIPMENT',
             equipment_type='TRAY',
@@ -125,12 +119,62 @@ def main(*, wm, kb, recipe, args):
         state='AVAILABLE',
     ), silent=True)
 
+
+def run_engine(*, wm, kb, recipe, conflict_resolution_strategy='priority', verbose=True, short_circuit=False,
+               profiler=None, tracer=None, flamegraph=None, memory_tracker=None, budget=None):
+    PLANNING_ENGINE = PlanningEngine(
+        wm=wm,
+        kb=kb,
+        conflict_resolution_strategy=conflict_resolution_strategy,
+        verbose=verbose,
+        short_circuit=short_circuit,
+        profiler=profiler,
+        tracer=tracer,
+        flamegraph=flamegraph,
+        memory_tracker=memory_tracker,
+        budget=budget,
+    )
+    success, result = PLANNING_ENGINE.run(recipe=recipe)
+
+    return success, result
+
+
+def main(*, wm, kb, recipe, args, profiler=None, tracer=None, flamegraph=None, memory_tracker=None, budget=None):
     print("*"*70)
-    print("⚙️⚙️ RUN PLANNING INFERENCE ENGINE ⚙️⚙️")
+    print("⚙️⚙️ CONFIGURE KNOWLEDGE BASE ⚙️⚙️")
     print("*"*70)
     print("")
 
-    PLANNING_ENGINE = PlanningEngine(wm=wm, kb=kb, verbose=True)
-    success, result = PLANNING_ENGINE.run(recipe=recipe)
+    configure_knowledge_base(kb=kb)
+
+    print("*"*70)
+    print("⚙️⚙️ CONFIGURE WORKING MEMORY > User Equipment ⚙️⚙️")
+    # this is currently hardcoded but will eventually become a query to the user at the start of the process to confirm what equipment they have at their disposal
+    print("*"*70)
+    print("")
+
+    configure_equipment(
+        wm=wm,
+        num_ovens=args.num_ovens,
+        num_bowls=args.num_bowls,
+        num_baking_sheets=args.num_baking_sheets,
+    )
+
+    print("*"*70)
+    print("⚙️⚙️ RUN PLANNING INFERENCE ENGINE ⚙️⚙️")
+    print("*"*70)
+    print("")
 
-    return success, result
\ No newline at end of file
+    return run_engine(
+        wm=wm,
+        kb=kb,
+        recipe=recipe,
+        conflict_resolution_strategy=args.planning_conflict_resolution,
+        verbose=True,
+        short_circuit=args.short_circuit_matching,
+        profiler=profiler,
+        tracer=tracer,
+        flamegraph=flamegraph,
+        memory_tracker=memory_tracker,
+        budget=budget,
+    )
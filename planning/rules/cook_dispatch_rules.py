@@ -58,12 +58,12 @@ def _initialize_cook(*, bindings, wm, kb, plan):
     )
     wm.add_fact(fact=preheat_request, indent="  ")
 
-    preheat_matches = engine._find_matching_rules(trigger_fact=preheat_request)
-    if not preheat_matches:
+    best_preheat = engine._best_match(trigger_fact=preheat_request)
+    if best_preheat is None:
         bindings['?error'] = "No rule matched for preheat_check_request"
         return bindings
 
-    best_rule, best_bindings_preheat = engine._resolve_conflict(matches=preheat_matches)
+    best_rule, best_bindings_preheat = best_preheat
 
     current_oven_id = best_bindings_preheat.get('?equipment_id')
     if current_oven_id is None:
@@ -189,12 +189,11 @@ def _place_sheet_for_cooking(*, bindings, wm, kb, plan):
             oven_id = oven.attributes['equipment_id']
             if oven_id not in ovens_with_cooking_started:
                 num_racks = oven.attributes.get('number_of_racks', 1)
-                existing_contents = wm.query_facts(
-                    fact_title='equipment_contents',
+                num_contents = wm.count_contents(
                     equipment_name=target_equipment_name,
                     equipment_id=oven_id,
                 )
-                if len(existing_contents) >= num_racks:
+                if num_contents >= num_racks:
                     _fire_cooking_wait(engine=engine, duration=duration, duration_unit=duration_unit, oven_id=oven_id,
                                        target_equipment_name=target_equipment_name, substeps_list=oven_substeps[oven_id])
                     ovens_with_cooking_started.add(oven_id)
@@ -209,7 +208,7 @@ def _place_sheet_for_cooking(*, bindings, wm, kb, plan):
             return bindings
 
         new_oven = resolved_list[0]
-        new_oven.attributes['state'] = 'IN_USE'
+        wm.modify_fact(fact=new_oven, silent=True, state='IN_USE')
         new_oven_id = new_oven.attributes['equipment_id']
 
         oven_substeps[new_oven_id] = []
@@ -302,12 +301,11 @@ def _fire_remaining_cooking_waits(*, bindings, wm, kb, plan):
     for oven in in_use_ovens:
         oid = oven.attributes['equipment_id']
         if oid not in ovens_with_cooking_started:
-            existing_contents = wm.query_facts(
-                fact_title='equipment_contents',
+            num_contents = wm.count_contents(
                 equipment_name=target_equipment_name,
                 equipment_id=oid,
             )
-            if len(existing_contents) > 0:
+            if num_contents > 0:
                 _fire_cooking_wait(engine=engine, duration=duration, duration_unit=duration_unit, oven_id=oid,
                                    target_equipment_name=target_equipment_name, substeps_list=oven_substeps[oid])
                 ovens_with_cooking_started.add(oid)
@@ -339,9 +337,9 @@ def _fire_cooking_wait(*, engine, duration, duration_unit, oven_id, target_equip
     )
     engine.working_memory.add_fact(fact=cooking_request, indent="    ")
 
-    matches = engine._find_matching_rules(trigger_fact=cooking_request)
-    if matches:
-        best_rule, best_bindings = engine._resolve_conflict(matches=matches)
+    best = engine._best_match(trigger_fact=cooking_request)
+    if best is not None:
+        best_rule, best_bindings = best
         derived = engine._fire_rule_dfs(rule=best_rule, bindings=best_bindings, plan_override=substeps_list)
 
         if engine.verbose:
@@ -403,6 +401,7 @@ def get_cook_dispatch_rules():
             ),
         ],
         action_fn=_place_sheet_for_cooking,
+        consumes=['pending_cook_placement'],
         consequent=Fact(
             fact_title='cook_placement_completed',
             step_idx='?step_idx',
@@ -7,7 +7,7 @@ def _clean_equipment(*, bindings, wm, kb, plan):
     equipment_name = bindings['?equipment_name']
     equipment_id = bindings['?equipment_id']
 
-    # Find the DIRTY fact in WM and mutate it to AVAILABLE
+    # Find the DIRTY fact in WM and modify it to AVAILABLE
     dirty_fact = wm.query_equipment(
         equipment_name=equipment_name,
         equipment_id=equipment_id,
@@ -19,9 +19,8 @@ def _clean_equipment(*, bindings, wm, kb, plan):
     plan.append(CleaningStep(equipment_name=equipment_name, equipment_id=equipment_id))
 
     if dirty_fact:
-        dirty_fact.attributes['state'] = 'AVAILABLE'
-        if bindings.get('reserve_after_cleaning'):
-            dirty_fact.attributes['state'] = 'RESERVED'
+        state = 'RESERVED' if bindings.get('reserve_after_cleaning') else 'AVAILABLE'
+        wm.modify_fact(fact=dirty_fact, silent=True, state=state)
 
     return bindings
 
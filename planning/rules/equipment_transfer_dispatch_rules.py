@@ -127,7 +127,7 @@ def _place_next_sheet(*, bindings, wm, kb, plan):
             return bindings
 
         new_oven = resolved_list[0]
-        new_oven.attributes['state'] = 'IN_USE'
+        wm.modify_fact(fact=new_oven, silent=True, state='IN_USE')
         new_oven_id = new_oven.attributes['equipment_id']
 
         plan.append(WaitStep(
@@ -239,6 +239,7 @@ def get_equipment_transfer_dispatch_rules():
             ),
         ],
         action_fn=_place_next_sheet,
+        consumes=['pending_placement'],
         consequent=Fact(
             fact_title='placement_completed',
             step_idx='?step_idx',
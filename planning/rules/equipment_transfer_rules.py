@@ -39,7 +39,7 @@ def _plan_equipment_transfer(*, bindings, wm, kb, plan):
     # Look up source equipment dimensions (baking sheet)
     sheet_dims = None
     rack_dims = None
-    for fact in kb.reference_facts:
+    for fact in kb.visible_reference_facts():
         if fact.fact_title == 'baking_sheet_dimensions':
             sheet_dims = fact
         elif fact.fact_title == 'oven_rack_dimensions':
@@ -94,17 +94,16 @@ def _find_available_rack(*, bindings, wm, kb, plan):
         target_id = target.attributes['equipment_id']
         num_racks = target.attributes.get('number_of_racks', 1)
 
-        # Count existing equipment_contents facts for this equipment
-        existing_contents = wm.query_facts(
-            fact_title='equipment_contents',
+        # Lowest unoccupied rack, from the WM occupancy index
+        rack_number = wm.next_free_slot(
             equipment_name=target_equipment_name,
             equipment_id=target_id,
+            num_slots=num_racks,
         )
-        occupied = len(existing_contents)
 
-        if occupied < num_racks:
+        if rack_number is not None:
             bindings['?equipment_id'] = target_id
-            bindings['?rack_number'] = occupied + 1
+            bindings['?rack_number'] = rack_number
             bindings['?rack_found'] = True
             return bindings
 
@@ -148,6 +147,7 @@ def get_equipment_transfer_rules():
                      target_equipment_name='?target_equipment_name'),
             ],
             action_fn=_check_oven_preheated,
+            consumes=['preheat_check_request'],
             consequent=Fact(
                 fact_title='preheat_completed',
                 equipment_name='?target_equipment_name',
@@ -168,6 +168,7 @@ def get_equipment_transfer_rules():
                      num_source_items='?num_source_items'),
             ],
             action_fn=_plan_equipment_transfer,
+            consumes=['equipment_transfer_planning_request'],
             consequent=Fact(
                 fact_title='equipment_transfer_plan',
                 items_per_rack='?items_per_rack',
@@ -187,6 +188,7 @@ def get_equipment_transfer_rules():
                      target_equipment_name='?target_equipment_name'),
             ],
             action_fn=_find_available_rack,
+            consumes=['available_rack_request'],
             consequent=Fact(
                 fact_title='available_rack',
                 equipment_name='?target_equipment_name',
@@ -1,5 +1,6 @@
 from classes.Rule import Rule
 from classes.Fact import Fact
+from planning.aggregates import contents_volume
 
 
 def _add_ingredient_to_equipment(*, bindings, wm, kb, plan):
@@ -19,7 +20,7 @@ def _add_ingredient_to_equipment(*, bindings, wm, kb, plan):
     else:
         # Look up unit_conversion for the ingredient's unit
         ingredient_conversion = None
-        for fact in kb.reference_facts:
+        for fact in kb.visible_reference_facts():
             if (fact.fact_title == 'unit_conversion'
                     and fact.attributes.get('unit') == unit):
                 ingredient_conversion = fact
@@ -31,7 +32,7 @@ def _add_ingredient_to_equipment(*, bindings, wm, kb, plan):
 
         # Look up unit_conversion for the equipment's volume_unit
         equipment_conversion = None
-        for fact in kb.reference_facts:
+        for fact in kb.visible_reference_facts():
             if (fact.fact_title == 'unit_conversion'
                     and fact.attributes.get('unit') == equipment_volume_unit):
                 equipment_conversion = fact
@@ -47,13 +48,8 @@ def _add_ingredient_to_equipment(*, bindings, wm, kb, plan):
         # Convert ingredient amount to equipment's volume unit
         volume_in_equipment_unit = (amount * ingredient_to_base) / equipment_to_base
 
-        # Check capacity: sum existing contents for this equipment
-        existing_contents = wm.query_facts(
-            fact_title='equipment_contents',
-            equipment_name=equipment_name,
-            equipment_id=equipment_id,
-        )
-        used_volume = sum(f.attributes.get('volume_in_equipment_unit', 0) for f in existing_contents)
+        # Check capacity: volume already in this equipment
+        used_volume = contents_volume(wm=wm, equipment_name=equipment_name, equipment_id=equipment_id)
 
         if used_volume + volume_in_equipment_unit > equipment_volume:
             bindings['?error'] = (
@@ -81,13 +77,8 @@ def _summarize_mixed_contents(*, bindings, wm, kb, plan):
     equipment_name = bindings['?equipment_name']
     equipment_id = bindings['?equipment_id']
 
-    # Sum volume across all equipment_contents for this piece of equipment
-    contents = wm.query_facts(
-        fact_title='equipment_contents',
-        equipment_name=equipment_name,
-        equipment_id=equipment_id,
-    )
-    total_volume = sum(f.attributes.get('volume_in_equipment_unit', 0) for f in contents)
+    # Total volume across all equipment_contents for this piece of equipment
+    total_volume = contents_volume(wm=wm, equipment_name=equipment_name, equipment_id=equipment_id)
 
     # Look up the equipment fact to get volume_unit
     equipment_fact = wm.query_equipment(
@@ -108,7 +108,8 @@ def get_mixing_dispatch_rules():
 
     # M2b: Mark ingredient as processed — PURE PATTERN RULE
     # After add_volume_ingredient fires and derives ingredient_added,
-    # this rule marks it processed so M2 won't re-fire for the same ingredient.
+    # this rule marks it processed so M2 won't re-fire for the same ingredient,
+    # and consumes the pending_ingredient (M2 can't consume it: M2b still joins on it).
     rules.append(Rule(
         rule_name='mark_ingredient_processed',
         priority=185,
@@ -125,6 +126,7 @@ def get_mixing_dispatch_rules():
                         ingredient_id='?ingredient_id'),
         ],
         action_fn=None,
+        consumes=['pending_ingredient'],
         consequent=Fact(
             fact_title='ingredient_processed',
             step_idx='?step_idx',
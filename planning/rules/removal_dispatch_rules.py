@@ -84,12 +84,10 @@ def _process_oven_slot_removal(*, bindings, wm, kb, plan):
                   f"({duration} {duration_unit})")
 
     # Get content info for the removal step description
-    contents_fact = wm.query_facts(
-        fact_title='equipment_contents',
+    contents_fact = wm.query_slot(
         equipment_name=source_equipment_name,
         equipment_id=source_equipment_id,
         slot_number=slot_number,
-        first=True,
     )
     if contents_fact is None:
         bindings['?error'] = (
@@ -11,12 +11,10 @@ def _remove_equipment(*, bindings, wm, kb, plan):
     target_equipment_id = bindings['?target_equipment_id']
 
     # Find the equipment_contents fact for this source slot
-    contents_fact = wm.query_facts(
-        fact_title='equipment_contents',
+    contents_fact = wm.query_slot(
         equipment_name=source_equipment_name,
         equipment_id=source_equipment_id,
         slot_number=slot_number,
-        first=True,
     )
 
     if contents_fact is None:
@@ -42,19 +40,18 @@ def _remove_equipment(*, bindings, wm, kb, plan):
     ), indent="    ")
 
     # Check if source is now empty
-    remaining = wm.query_facts(
-        fact_title='equipment_contents',
+    remaining = wm.count_contents(
         equipment_name=source_equipment_name,
         equipment_id=source_equipment_id,
     )
-    if len(remaining) == 0:
+    if remaining == 0:
         source_eq = wm.query_equipment(
             equipment_name=source_equipment_name,
             equipment_id=source_equipment_id,
             first=True,
         )
         if source_eq:
-            source_eq.attributes['state'] = 'AVAILABLE'
+            wm.modify_fact(fact=source_eq, silent=True, state='AVAILABLE')
 
     bindings['?content_equipment_id'] = content_equipment_id
     bindings['?content_type_name'] = content_type
@@ -69,8 +66,7 @@ def _transfer_items(*, bindings, wm, kb, plan):
     content_type = bindings['?content_type']
 
     # Find equipment_contents on the source matching content_type
-    contents_fact = wm.query_facts(
-        fact_title='equipment_contents',
+    contents_fact = wm.query_contents(
         equipment_name=source_equipment_name,
         equipment_id=source_equipment_id,
         content_type=content_type,
@@ -107,7 +103,7 @@ def _transfer_items(*, bindings, wm, kb, plan):
         first=True,
     )
     if source_eq:
-        source_eq.attributes['state'] = 'DIRTY'
+        wm.modify_fact(fact=source_eq, silent=True, state='DIRTY')
 
     bindings['?quantity'] = quantity
     return bindings
@@ -133,8 +129,7 @@ def _chain_removal_to_transfer(*, bindings, wm, kb, plan):
     final_target_id = item_transfer_target.attributes['target_equipment_id']
 
     # Find items on the content equipment (e.g., DOUGH_BALLS on BAKING_SHEET)
-    source_contents = wm.query_facts(
-        fact_title='equipment_contents',
+    source_contents = wm.query_contents(
         equipment_name=content_type_name,
         equipment_id=content_equipment_id,
     )
@@ -169,11 +164,10 @@ def _chain_removal_to_transfer(*, bindings, wm, kb, plan):
         first=True,
     )
     if source_eq:
-        source_eq.attributes['state'] = 'DIRTY'
+        wm.modify_fact(fact=source_eq, silent=True, state='DIRTY')
 
     # Also retract the equipment_contents fact on the intermediate surface
-    surface_content = wm.query_facts(
-        fact_title='equipment_contents',
+    surface_content = wm.query_contents(
         equipment_name=surface_name,
         equipment_id=surface_id,
         content_equipment_id=content_equipment_id,
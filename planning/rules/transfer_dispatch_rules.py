@@ -2,6 +2,7 @@ from classes.Rule import Rule
 from classes.Fact import Fact
 from classes.NegatedFact import NegatedFact
 from planning.classes.TransferItem import TransferItem
+from planning.aggregates import transfers_completed
 
 
 def _initialize_transfer(*, bindings, wm, kb, plan):
@@ -62,8 +63,28 @@ def _initialize_transfer(*, bindings, wm, kb, plan):
     return bindings
 
 
+def _reserve_sheets(*, wm, equipment_name, count):
+    """Reserve up to count AVAILABLE pieces of equipment in one pass, in WM order."""
+    reserved = wm.query_equipment(equipment_name=equipment_name, state='AVAILABLE')[:count]
+    for eq in reserved:
+        wm.modify_fact(fact=eq, silent=True, state='IN_USE')
+    return reserved
+
+
+def _release_sheets(*, wm, sheets):
+    """Return reserved but unused equipment to the AVAILABLE pool."""
+    for eq in sheets:
+        wm.modify_fact(fact=eq, silent=True, state='AVAILABLE')
+
+
 def _allocate_next_sheet(*, bindings, wm, kb, plan):
-    """Resolve one sheet, calculate quantity, assert transfer_request, append TransferItem to plan."""
+    """Allocate every remaining sheet for the transfer_plan in one firing.
+    Sheets are reserved up front from the AVAILABLE pool; any shortfall falls back to
+    _resolve_equipment (cleaning DIRTY sheets) at the same position it would have been
+    resolved one firing at a time. Per sheet: assert transfer_request, chain it, append a
+    TransferItem, then assert the sheet_allocated fact that firing used to derive. Facts
+    are asserted in the same order with the same derivation as the per-sheet path. On an
+    error, the reserved sheets not yet used are released."""
     engine = bindings['_engine']
     step_idx = bindings['?step_idx']
     source_name = bindings['?source_equipment_name']
@@ -75,76 +96,88 @@ def _allocate_next_sheet(*, bindings, wm, kb, plan):
     scoop_size_amount = bindings['?scoop_size_amount']
     scoop_size_unit = bindings['?scoop_size_unit']
 
-    # Count existing transfer_completed facts for this source to know how many sheets done
-    completed = wm.query_facts(
-        fact_title='transfer_completed',
-        source_equipment_name=source_name,
-        source_equipment_id=source_id,
-    )
-    sheets_done = len(completed)
-
-    if sheets_done >= num_sheets_needed:
-        # All sheets done — assert completion marker
-        wm.add_fact(fact=Fact(
-            fact_title='all_sheets_transferred',
-            step_idx=step_idx,
-            source_equipment_id=source_id,
-        ), indent="  ")
-        bindings['?target_equipment_id'] = 0
-        bindings['?quantity'] = 0
-        return bindings
-
-    # Resolve one target sheet
-    equipment_need = {'equipment_name': target_equipment_name, 'required_count': 1}
-    resolved_list = engine._resolve_equipment(equipment_need=equipment_need)
-    if resolved_list is None:
-        bindings['?error'] = f"Could not resolve {target_equipment_name} for sheet {sheets_done + 1}"
-        return bindings
-
-    target_eq = resolved_list[0]
-    target_eq.attributes['state'] = 'IN_USE'
-    target_eq_id = target_eq.attributes['equipment_id']
+    # Sheets already done for this source (transfer_completed count)
+    sheets_done = transfers_completed(wm=wm, source_equipment_name=source_name, source_equipment_id=source_id)
 
-    # Calculate quantity for this sheet
-    remaining = num_dough_balls - (sheets_done * capacity_per_sheet)
-    quantity = min(remaining, capacity_per_sheet)
-
-    if engine.verbose:
-        print(f"\n  Sheet {sheets_done + 1}: {target_equipment_name} #{target_eq_id} — placing {quantity} dough balls")
-
-    # Fire execute_transfer rule
-    transfer_request = Fact(
-        fact_title='transfer_request',
-        source_equipment_name=source_name,
-        source_equipment_id=source_id,
-        target_equipment_name=target_equipment_name,
-        target_equipment_id=target_eq_id,
-        quantity=quantity,
-        scoop_size_amount=scoop_size_amount,
-        scoop_size_unit=scoop_size_unit,
+    reserved = _reserve_sheets(
+        wm=wm,
+        equipment_name=target_equipment_name,
+        count=max(num_sheets_needed - sheets_done, 0),
     )
-    wm.add_fact(fact=transfer_request, indent="    ")
-    _, derived = engine._forward_chain(trigger_fact=transfer_request)
 
-    if engine.last_error:
-        bindings['?error'] = engine.last_error
-        return bindings
+    for sheet_idx in range(sheets_done, num_sheets_needed):
+        if reserved:
+            target_eq = reserved.pop(0)
+        else:
+            # AVAILABLE pool exhausted — resolve one sheet (cleans DIRTY sheets via rules)
+            equipment_need = {'equipment_name': target_equipment_name, 'required_count': 1}
+            resolved_list = engine._resolve_equipment(equipment_need=equipment_need)
+            if resolved_list is None:
+                bindings['?error'] = f"Could not resolve {target_equipment_name} for sheet {sheet_idx + 1}"
+                return bindings
+            target_eq = resolved_list[0]
+            wm.modify_fact(fact=target_eq, silent=True, state='IN_USE')
+        target_eq_id = target_eq.attributes['equipment_id']
+
+        # Calculate quantity for this sheet
+        remaining = num_dough_balls - (sheet_idx * capacity_per_sheet)
+        quantity = min(remaining, capacity_per_sheet)
 
-    if engine.verbose and derived is not None:
-        print(f"    [Derived] {derived}")
-
-    # Append TransferItem to plan
-    sheet_step = TransferItem(
-        description=f"Transfer {quantity} dough balls to {target_equipment_name} #{target_eq_id}",
-        source_equipment_name=source_name,
-        target_equipment_name=target_equipment_name,
-        scoop_size_amount=scoop_size_amount,
-        scoop_size_unit=scoop_size_unit,
-    )
-    plan.append(sheet_step)
+        if engine.verbose:
+            print(f"\n  Sheet {sheet_idx + 1}: {target_equipment_name} #{target_eq_id} — placing {quantity} dough balls")
 
-    bindings['?target_equipment_id'] = target_eq_id
-    bindings['?quantity'] = quantity
+        # Fire execute_transfer rule
+        transfer_request = Fact(
+            fact_title='transfer_request',
+            source_equipment_name=source_name,
+            source_equipment_id=source_id,
+            target_equipment_name=target_equipment_name,
+            target_equipment_id=target_eq_id,
+            quantity=quantity,
+            scoop_size_amount=scoop_size_amount,
+            scoop_size_unit=scoop_size_unit,
+        )
+        wm.add_fact(fact=transfer_request, indent="    ")
+        _, derived = engine._forward_chain(trigger_fact=transfer_request)
+
+        if engine.last_error:
+            _release_sheets(wm=wm, sheets=reserved)
+            bindings['?error'] = engine.last_error
+            return bindings
+
+        if engine.verbose and derived is not None:
+            print(f"    [Derived] {derived}")
+
+        # Append TransferItem to plan
+        plan.append(TransferItem(
+            description=f"Transfer {quantity} dough balls to {target_equipment_name} #{target_eq_id}",
+            source_equipment_name=source_name,
+            target_equipment_name=target_equipment_name,
+            scoop_size_amount=scoop_size_amount,
+            scoop_size_unit=scoop_size_unit,
+        ))
+
+        # Per-sheet allocation record (wm._current_derivation attributes it to this rule)
+        sheet_allocated = Fact(
+            fact_title='sheet_allocated',
+            step_idx=step_idx,
+            source_equipment_id=source_id,
+            target_equipment_id=target_eq_id,
+            quantity=quantity,
+        )
+        if not engine._fact_exists(fact=sheet_allocated):
+            if engine.verbose:
+                print(f"[Rule fired] allocate_next_sheet -> {sheet_allocated}")
+            wm.add_fact(fact=sheet_allocated, silent=not engine.verbose)
+
+    # All sheets done — assert completion marker
+    wm.add_fact(fact=Fact(
+        fact_title='all_sheets_transferred',
+        step_idx=step_idx,
+        source_equipment_id=source_id,
+    ), indent="  ")
+    bindings['?target_equipment_id'] = 0
+    bindings['?quantity'] = 0
     return bindings
 
 
@@ -160,7 +193,7 @@ def _finalize_transfer_source(*, bindings, wm, kb, plan):
         first=True,
     )
     if source_eq:
-        source_eq.attributes['state'] = 'DIRTY'
+        wm.modify_fact(fact=source_eq, silent=True, state='DIRTY')
         if engine.verbose:
             print(f"\n  -> {source_name} #{source_id} is now DIRTY")
 
@@ -196,9 +229,9 @@ def get_transfer_dispatch_rules():
         ),
     ))
 
-    # T2: Allocate next sheet — resolve one sheet, transfer dough balls
-    # Iterates via while-matches loop: after each transfer_completed,
-    # re-evaluates and fires for the next sheet.
+    # T2: Allocate sheets — reserve every sheet the transfer_plan needs and
+    # transfer dough balls onto each in a single firing. The consequent is the
+    # closing sheet_allocated (target 0, quantity 0) once all sheets are done.
     rules.append(Rule(
         rule_name='allocate_next_sheet',
         priority=190,
@@ -1,6 +1,7 @@
 import math
 from classes.Rule import Rule
 from classes.Fact import Fact
+from planning.aggregates import contents_volume
 
 
 def _plan_transfer(*, bindings, wm, kb, plan):
@@ -21,19 +22,16 @@ def _plan_transfer(*, bindings, wm, kb, plan):
 
     equipment_volume_unit = source_equipment.attributes.get('volume_unit', '')
 
-    existing_contents = wm.query_facts(
-        fact_title='equipment_contents',
+    total_volume_in_eq_unit = contents_volume(
+        wm=wm,
         equipment_name=source_equipment_name,
         equipment_id=source_equipment_id,
     )
-    total_volume_in_eq_unit = sum(
-        f.attributes.get('volume_in_equipment_unit', 0) for f in existing_contents
-    )
 
     # 2. Convert total volume and scoop size to base unit (teaspoons)
     eq_conversion = None
     scoop_conversion = None
-    for fact in kb.reference_facts:
+    for fact in kb.visible_reference_facts():
         if fact.fact_title == 'unit_conversion':
             if fact.attributes.get('unit') == equipment_volume_unit:
                 eq_conversion = fact
@@ -57,7 +55,7 @@ def _plan_transfer(*, bindings, wm, kb, plan):
     sheet_dims = None
     cookie_specs = None
     sheet_margin = None
-    for fact in kb.reference_facts:
+    for fact in kb.visible_reference_facts():
         if fact.fact_title == 'baking_sheet_dimensions':
             sheet_dims = fact
         elif fact.fact_title == 'cookie_specifications':
@@ -118,7 +116,7 @@ def _execute_transfer(*, bindings, wm, kb, plan):
         first=True,
     )
     if target_equipment:
-        target_equipment.attributes['state'] = 'IN_USE'
+        wm.modify_fact(fact=target_equipment, silent=True, state='IN_USE')
 
     return bindings
 
@@ -140,6 +138,7 @@ def get_transfer_rules():
                      target_equipment_name='?target_equipment_name'),
             ],
             action_fn=_plan_transfer,
+            consumes=['transfer_planning_request'],
             consequent=Fact(
                 fact_title='transfer_plan',
                 num_dough_balls='?num_dough_balls',
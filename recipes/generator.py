@@ -0,0 +1,260 @@
+import sys
+import json
+import math
+import random
+import argparse
+
+# modules
+from recipes.loader import recipe_to_dict
+from scaling.facts.measurement_unit_conversions import get_measurement_unit_conversion_facts
+from planning.facts.transfer_reference_facts import get_transfer_reference_facts
+
+# classes
+from classes.Recipe import Recipe
+from classes.Ingredient import Ingredient
+from planning.classes.PreheatStep import PreheatStep
+from planning.classes.MixingStep import MixingStep
+from planning.classes.MixingSubstep import MixingSubstep
+from planning.classes.TransferEquipment import TransferEquipment
+from planning.classes.TransferItem import TransferItem
+from planning.classes.CookStep import CookStep
+from planning.classes.WaitStep import WaitStep
+
+# Generated recipes follow the cookie recipe's shape (preheat, mix, scoop onto sheets, bake,
+# remove, cool), which is the flow the planning rules handle, with randomized ingredients,
+# units, amounts, substep groupings, temperatures and bake times. Every run with the same
+# seed produces the same recipes.
+
+# Ingredient names per measurement type. Some are in the scaling classification facts
+# (BAKING_SODA, SALT, ...) so both the known and the default classification rules fire.
+INGREDIENT_NAMES = {
+    'VOLUME': ('all-purpose flour', 'white sugar', 'brown sugar', 'baking soda', 'baking powder', 'salt',
+               'cocoa powder', 'rolled oats', 'chocolate chips', 'cinnamon'),
+    'LIQUID': ('vanilla extract', 'milk', 'water', 'vegetable oil', 'honey', 'maple syrup'),
+    'WEIGHT': ('butter', 'cream cheese', 'dark chocolate', 'walnuts'),
+    'WHOLE': ('eggs', 'egg yolks', 'bananas'),
+}
+AMOUNTS = (0.25, 0.5, 0.75, 1, 1.5, 2, 3)
+
+# The bowl configure_equipment provides; generated recipes fill between these shares of it,
+# so the mix always fits one bowl and makes at least a sheet of dough balls
+BOWL_VOLUME = (4, 'QUARTS')
+MIN_BOWL_FILL = 0.1
+MAX_BOWL_FILL = 0.9
+
+# TransferItem scoop onto the baking sheets
+SCOOP_SIZE = (2, 'TABLESPOONS')
+
+
+def _units_by_type():
+    units = {}
+    for fact in get_measurement_unit_conversion_facts():
+        units.setdefault(fact.attributes['measurement_type'], []).append(fact.attributes['unit'])
+    return units
+
+
+def _to_base(unit):
+    """Teaspoons (or ounces/whole) per unit, by the first unit_conversion for it, the same
+    lookup the planning action functions use."""
+    for fact in get_measurement_unit_conversion_facts():
+        if fact.attributes['unit'] == unit:
+            return fact.attributes['to_base']
+    raise ValueError(f"No unit_conversion found for {unit}")
+
+
+def _mix_volume(*, ingredients):
+    """Volume the ingredients occupy in a bowl, in the conversion base unit (WHOLE items take none)."""
+    return sum(
+        ingredient.amount * _to_base(ingredient.unit)
+        for ingredient in ingredients
+        if ingredient.measurement_category != 'WHOLE'
+    )
+
+
+def generate_recipe(*, seed, num_ingredients, name=None):
+    """A seeded random Recipe with num_ingredients ingredients. The first ingredients cover
+    every unit_conversion measurement type, and non-WHOLE amounts are rescaled when needed so
+    the mix fits one bowl."""
+    rng = random.Random(seed)
+    units = _units_by_type()
+    measurement_types = sorted(units)
+
+    used_names = {}
+    names = {}  # ingredient id -> name as written, for the substep descriptions
+    ingredients = []
+    for idx in range(num_ingredients):
+        if idx < len(measurement_types):
+            measurement_type = measurement_types[idx]
+        else:
+            measurement_type = rng.choice(measurement_types)
+
+        base_name = rng.choice(INGREDIENT_NAMES[measurement_type])
+        used_names[base_name] = used_names.get(base_name, 0) + 1
+        ingredient_name = base_name if used_names[base_name] == 1 else f"{base_name} {used_names[base_name]}"
+        names[idx + 1] = ingredient_name
+
+        ingredients.append(Ingredient(
+            id=idx + 1,
+            name=ingredient_name,
+            amount=rng.choice(AMOUNTS),
+            unit=rng.choice(units[measurement_type]),
+            measurement_category=measurement_type,
+        ))
+
+    bowl_volume = BOWL_VOLUME[0] * _to_base(BOWL_VOLUME[1])
+    volume = _mix_volume(ingredients=ingredients)
+    target = min(max(volume, bowl_volume * MIN_BOWL_FILL), bowl_volume * MAX_BOWL_FILL)
+    if volume and target != volume:
+        for ingredient in ingredients:
+            if ingredient.measurement_category != 'WHOLE':
+                ingredient.amount = round(ingredient.amount * target / volume, 4)
+
+    # Add the ingredients in a shuffled order, one to four at a time
+    order = [ingredient.id for ingredient in ingredients]
+    rng.shuffle(order)
+    substeps = []
+    while order:
+        group_size = rng.randint(1, 4)
+        group, order = order[:group_size], order[group_size:]
+        substeps.append(MixingSubstep(
+            ingredient_ids=group,
+            description=f"Add {', '.join(names[ingredient_id] for ingredient_id in group)}",
+        ))
+
+    temperature = rng.randrange(325, 426, 25)
+    bake_minutes = rng.randint(8, 14)
+    steps = [
+        PreheatStep(
+            description=f"Preheat the oven to {temperature} degrees F",
+            required_equipment=[{'equipment_name': 'OVEN', 'required_count': 1}],
+            temperature=temperature,
+            temperature_unit="fahrenheit",
+        ),
+        MixingStep(
+            description="Mix the ingredients",
+            required_equipment=[{'equipment_name': 'BOWL', 'required_count': 1}],
+            substeps=substeps,
+        ),
+        TransferItem(
+            description="Scoop dough onto baking sheets",
+            source_equipment_name='BOWL',
+            target_equipment_name='BAKING_SHEET',
+            scoop_size_amount=SCOOP_SIZE[0],
+            scoop_size_unit=SCOOP_SIZE[1],
+            required_equipment=[],
+        ),
+        CookStep(
+            description="Bake",
+            substeps=[
+                TransferEquipment(
+                    description="Transfer baking sheets to oven racks",
+                    source_equipment_name='BAKING_SHEET',
+                    target_equipment_name='OVEN',
+                    required_equipment=[],
+                ),
+                WaitStep(
+                    description="Wait for the bake",
+                    equipment_name='OVEN',
+                    duration=bake_minutes,
+                    duration_unit='minutes',
+                ),
+            ],
+            required_equipment=[],
+        ),
+        TransferEquipment(
+            description="Remove baking sheets from oven to countertop",
+            source_equipment_name='OVEN',
+            target_equipment_name='COUNTERTOP',
+            required_equipment=[],
+        ),
+        TransferItem(
+            description="Transfer from baking sheets to cooling rack",
+            source_equipment_name='BAKING_SHEET',
+            target_equipment_name='COOLING_RACK',
+            scoop_size_amount=1,
+            scoop_size_unit='WHOLE',
+            required_equipment=[],
+        ),
+    ]
+
+    return Recipe(
+        name=name or f"generated_{seed}_{num_ingredients}",
+        ingredients=ingredients,
+        required_equipment=[
+            {'equipment_name': 'OVEN', 'required_count': 1},
+            {'equipment_name': 'BOWL', 'required_count': 1},
+        ],
+        steps=steps,
+    )
+
+
+def generate_kitchen(*, recipe, spare=0):
+    """Kitchen fields (num_ovens, num_bowls, num_baking_sheets) with enough EQUIPMENT to plan
+    recipe: sheets for every dough ball and oven racks for every sheet, computed from the
+    same reference facts the planning rules use, plus spare of each."""
+    reference = {fact.fact_title: fact.attributes for fact in get_transfer_reference_facts()}
+    sheet = reference['baking_sheet_dimensions']
+    cookie = reference['cookie_specifications']
+    margin = reference['baking_sheet_margin']['edge_margin']
+
+    grid_spacing = cookie['diameter'] + cookie['spacing']
+    capacity_per_sheet = (
+        math.floor((sheet['width'] - 2 * margin) / grid_spacing)
+        * math.floor((sheet['length'] - 2 * margin) / grid_spacing)
+    )
+    num_dough_balls = int(_mix_volume(ingredients=recipe.ingredients) / (SCOOP_SIZE[0] * _to_base(SCOOP_SIZE[1])))
+    num_baking_sheets = max(1, math.ceil(num_dough_balls / capacity_per_sheet))
+
+    # configure_equipment gives every oven two racks
+    return {
+        'num_ovens': max(1, math.ceil(num_baking_sheets / 2)) + spare,
+        'num_bowls': 1 + spare,
+        'num_baking_sheets': num_baking_sheets + spare,
+    }
+
+
+def generate_workload(*, seed, num_recipes, num_ingredients, scaling_factors=(1,)):
+    """Yield num_recipes batch records {'recipe', 'scaling_factor', kitchen fields...}.
+    Recipe i uses seed + i, an ingredient count cycling through num_ingredients and a
+    scaling factor cycling through scaling_factors. 'recipe' is a Recipe object."""
+    for idx in range(num_recipes):
+        recipe = generate_recipe(seed=seed + idx, num_ingredients=num_ingredients[idx % len(num_ingredients)])
+        yield {
+            'recipe': recipe,
+            'scaling_factor': scaling_factors[idx % len(scaling_factors)],
+            **generate_kitchen(recipe=recipe),
+        }
+
+
+def write_jsonl(*, records, out):
+    """Write generate_workload records as JSON Lines in the batch runner's --input format."""
+    for record in records:
+        out.write(json.dumps({**record, 'recipe': recipe_to_dict(recipe=record['recipe'])}) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generates seeded synthetic recipe workloads as JSON Lines (batch runner --input format).",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first recipe")
+    parser.add_argument("--num_recipes", type=int, default=10, help="Number of records to generate")
+    parser.add_argument("--num_ingredients", type=int, nargs="+", default=[10],
+                        help="Ingredient counts, cycled across records")
+    parser.add_argument("--scaling_factors", type=float, nargs="+", default=[1],
+                        help="Scaling factors, cycled across records")
+    parser.add_argument("--output", type=str, default=None, help="Write here instead of stdout")
+
+    args = parser.parse_args()
+
+    records = generate_workload(
+        seed=args.seed,
+        num_recipes=args.num_recipes,
+        num_ingredients=args.num_ingredients,
+        scaling_factors=args.scaling_factors,
+    )
+    if args.output:
+        with open(args.output, "w") as out:
+            write_jsonl(records=records, out=out)
+    else:
+        write_jsonl(records=records, out=sys.stdout)
@@ -0,0 +1,142 @@
+# classes
+from classes.Recipe import Recipe
+from classes.Ingredient import Ingredient
+from planning.classes.PreheatStep import PreheatStep
+from planning.classes.MixingStep import MixingStep
+from planning.classes.MixingSubstep import MixingSubstep
+from planning.classes.TransferEquipment import TransferEquipment
+from planning.classes.TransferItem import TransferItem
+from planning.classes.CookStep import CookStep
+from planning.classes.WaitStep import WaitStep
+
+# Recipes as plain dicts (one JSON object per recipe):
+# {
+#   "name": "chocolate_chip_cookies",
+#   "ingredients": [{"id": 1, "name": "all-purpose flour", "amount": 2.25, "unit": "cups", "measurement_category": "VOLUME"}, ...],
+#   "required_equipment": [{"equipment_name": "OVEN", "required_count": 1}, ...],
+#   "steps": [{"type": "PreheatStep", "description": "...", "temperature": 350}, ...]
+# }
+# Each step's "type" names one of the step classes below; the remaining keys are
+# that class's keyword arguments, with "substeps" nested the same way.
+STEP_CLASSES = {
+    'PreheatStep': PreheatStep,
+    'MixingStep': MixingStep,
+    'MixingSubstep': MixingSubstep,
+    'TransferEquipment': TransferEquipment,
+    'TransferItem': TransferItem,
+    'CookStep': CookStep,
+    'WaitStep': WaitStep,
+}
+
+INGREDIENT_FIELDS = ('id', 'name', 'amount', 'unit', 'measurement_category')
+
+
+def recipe_from_dict(*, data):
+    """Build a Recipe from its dict form. Raises ValueError on a malformed recipe."""
+    if not isinstance(data, dict):
+        raise ValueError("recipe must be an object")
+    for key in ('name', 'ingredients', 'steps'):
+        if key not in data:
+            raise ValueError(f"recipe is missing '{key}'")
+    for key in ('ingredients', 'required_equipment', 'steps'):
+        if not isinstance(data.get(key, []), list):
+            raise ValueError(f"recipe '{key}' must be a list")
+
+    ingredients = []
+    for item in data['ingredients']:
+        if not isinstance(item, dict):
+            raise ValueError(f"ingredient must be an object, got {item!r}")
+        missing = [field for field in INGREDIENT_FIELDS if field not in item]
+        if missing:
+            raise ValueError(f"ingredient {item.get('id', '?')} is missing {', '.join(missing)}")
+        ingredients.append(Ingredient(**{field: item[field] for field in INGREDIENT_FIELDS}))
+
+    return Recipe(
+        name=data['name'],
+        ingredients=ingredients,
+        required_equipment=_equipment_from_list(data=data.get('required_equipment', [])),
+        steps=[_step_from_dict(data=step) for step in data['steps']],
+    )
+
+
+def recipe_to_dict(*, recipe):
+    """Dict form of a Recipe; recipe_from_dict(data=recipe_to_dict(recipe=r)) rebuilds r."""
+    return {
+        'name': recipe.name,
+        'ingredients': [
+            {
+                'id': ingredient.id,
+                'name': ingredient.ingredient_name,
+                'amount': ingredient.amount,
+                'unit': ingredient.unit,
+                'measurement_category': ingredient.measurement_category,
+            }
+            for ingredient in recipe.ingredients
+        ],
+        'required_equipment': [dict(r) for r in recipe.required_equipment],
+        'steps': [_step_to_dict(step=step) for step in recipe.steps],
+    }
+
+
+def _equipment_from_list(*, data):
+    if not isinstance(data, list) or not all(isinstance(r, dict) for r in data):
+        raise ValueError("required_equipment must be a list of objects")
+    return [dict(r) for r in data]
+
+
+def _step_from_dict(*, data):
+    if not isinstance(data, dict):
+        raise ValueError(f"step must be an object, got {data!r}")
+    step_type = data.get('type')
+    if step_type not in STEP_CLASSES:
+        raise ValueError(f"unknown step type: {step_type!r}")
+
+    kwargs = {key: value for key, value in data.items() if key != 'type'}
+    if 'substeps' in kwargs:
+        if not isinstance(kwargs['substeps'], list):
+            raise ValueError(f"{step_type} substeps must be a list")
+        kwargs['substeps'] = [_step_from_dict(data=substep) for substep in kwargs['substeps']]
+    if 'required_equipment' in kwargs:
+        kwargs['required_equipment'] = _equipment_from_list(data=kwargs['required_equipment'])
+
+    try:
+        return STEP_CLASSES[step_type](**kwargs)
+    except TypeError as e:
+        raise ValueError(f"invalid {step_type}: {e}") from None
+
+
+def _step_to_dict(*, step):
+    if isinstance(step, MixingSubstep):
+        return {
+            'type': 'MixingSubstep',
+            'ingredient_ids': list(step.ingredient_ids),
+            'description': step.description,
+        }
+
+    data = {
+        'type': type(step).__name__,
+        'description': step.description,
+        'required_equipment': [dict(r) for r in step.required_equipment],
+    }
+
+    if isinstance(step, WaitStep):
+        data['equipment_name'] = step.equipment_name
+        data['equipment_id'] = step.equipment_id
+        data['duration'] = step.duration
+        data['duration_unit'] = step.duration_unit
+        if isinstance(step, PreheatStep):
+            data['temperature'] = step.temperature
+            data['temperature_unit'] = step.temperature_unit
+    else:
+        data['is_passive'] = step.is_passive
+        if isinstance(step, (TransferEquipment, TransferItem)):
+            data['source_equipment_name'] = step.source_equipment_name
+            data['target_equipment_name'] = step.target_equipment_name
+            if isinstance(step, TransferItem):
+                data['scoop_size_amount'] = step.scoop_size_amount
+                data['scoop_size_unit'] = step.scoop_size_unit
+
+    if step.substeps:
+        data['substeps'] = [_step_to_dict(step=substep) for substep in step.substeps]
+
+    return data
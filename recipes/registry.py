@@ -0,0 +1,6 @@
+from recipes.chocolate_chip_cookies import chocolate_chip_cookies_recipe
+
+# Recipes addressable by name from the batch runner and the service
+RECIPES = {
+    'chocolate_chip_cookies': chocolate_chip_cookies_recipe,
+}
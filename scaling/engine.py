@@ -1,23 +1,59 @@
 from classes.Fact import Fact
+from classes.Agenda import Agenda, RULE_SALIENCE
+from classes.BindingEnvironment import BindingEnvironment
 from classes.NegatedFact import NegatedFact
 
 
 class ScalingEngine:
-    def __init__(self, *, wm, kb, conflict_resolution_strategy='priority', verbose=True):
+    # Knowledge base module holding the scaling rules and reference facts
+    MODULE = 'SCALING'
+    # Environment _iter_antecedent_matches binds into (a RuleProfiler swaps in a counting one)
+    _binding_environment = BindingEnvironment
+
+    def __init__(self, *, wm, kb, conflict_resolution_strategy='priority', verbose=True, short_circuit=False,
+                 profiler=None, tracer=None, flamegraph=None, memory_tracker=None, budget=None):
         self.working_memory = wm
         self.knowledge_base = kb
         self.conflict_resolution_strategy = conflict_resolution_strategy
         self.verbose = verbose
+        # Scan rules in salience order and stop at the first unfired activation
+        # instead of matching every rule before picking one
+        self.short_circuit = short_circuit
         self.cycle = 0
+        # Dependency layers of the visible scaling rules, set by run() (see RuleGraph.strata);
+        # None when the rules are cyclic
+        self.strata = None
+        if profiler is not None:
+            profiler.attach(engine=self)
+        if tracer is not None:
+            tracer.attach(engine=self)
+        if flamegraph is not None:
+            flamegraph.attach(engine=self)
+        if memory_tracker is not None:
+            memory_tracker.attach(engine=self)
+        if budget is not None:
+            budget.attach(engine=self)
 
     def run(self):
         # Snapshot recipe_ingredient facts — these are the triggers
         # triggers = self.working_memory.facts
         triggers = [f for f in self.working_memory.facts]
 
-        # for trigger in self.working_memory.facts:
-        for trigger in triggers:
-            self._forward_chain(trigger_fact=trigger)
+        self.knowledge_base.focus(module=self.MODULE)
+        try:
+            # Stratified rules (scaling.main's are, checked at configuration) chain each trigger
+            # up one stratum per firing, so its DFS ends within len(strata) levels. Cached per
+            # focus stack; rule sets that chain recursively have none.
+            try:
+                self.strata = self.knowledge_base.rule_graph().strata()
+            except ValueError:
+                self.strata = None
+
+            # for trigger in self.working_memory.facts:
+            for trigger in triggers:
+                self._forward_chain(trigger_fact=trigger)
+        finally:
+            self.knowledge_base.pop_focus()
 
     def _forward_chain(self, *, trigger_fact):
         """Find matching rules for a trigger fact, resolve conflict, fire via DFS.
@@ -28,42 +64,27 @@ class ScalingEngine:
         any_rule_fired = False
         fired = set()
 
-        print("")
-        print(f'🔁 CYCLE: {self.cycle}')
-        print(f'🧠 CURRENT WORKING MEMORY ({len(self.working_memory.facts)})\n')
-        for fact in self.working_memory.facts:
-            print(f"\t{fact}")
-        print('###############################################################################')
-
-        matches = self._find_matching_rules(trigger_fact=trigger_fact)
-        print("")
-        print(f"🧠 Matches Found {len(matches)}")
-        if not matches:
-            print(f"No rules matched trigger - nothing new added to working memory")
-        while matches:
-            wm_size = len(self.working_memory.facts)
-
-            # Filter out already-fired matches
-            fresh = []
-            for m_rule, m_bindings in matches:
-                binding_key = frozenset(
-                    (k, v) for k, v in m_bindings.items()
-                    if isinstance(k, str) and k.startswith('?')
-                )
-                has_negated = any(
-                    isinstance(a, NegatedFact) for a in m_rule.antecedents
-                )
-                if has_negated:
-                    key = (m_rule.rule_name, wm_size, binding_key)
-                else:
-                    key = (m_rule.rule_name, binding_key)
-                if key not in fired:
-                    fresh.append((m_rule, m_bindings, key))
-            if not fresh:
+        if self.verbose:
+            print("")
+            print(f'🔁 CYCLE: {self.cycle}')
+            print(f'🧠 CURRENT WORKING MEMORY ({len(self.working_memory.facts)})\n')
+            for fact in self.working_memory.facts:
+                print(f"\t{fact}")
+            print('###############################################################################')
+
+        matches = None
+        if not self.short_circuit:
+            matches = self._find_matching_rules(trigger_fact=trigger_fact)
+            if self.verbose:
+                print("")
+                print(f"🧠 Matches Found {len(matches)}")
+                if not matches:
+                    print(f"No rules matched trigger - nothing new added to working memory")
+        while True:
+            selected = self._next_activation(trigger_fact=trigger_fact, matches=matches, fired=fired)
+            if selected is None:
                 break
-
-            best_rule, best_bindings, fire_key = self._resolve_conflict(matches=fresh)
-            fired.add(fire_key)
+            best_rule, best_bindings = selected
 
             any_rule_fired = True
             derived = self._fire_rule_dfs(rule=best_rule, bindings=best_bindings)
@@ -71,9 +92,11 @@ class ScalingEngine:
                 last_derived = derived
 
             # Re-evaluate: new facts may have changed what matches
-            matches = self._find_matching_rules(trigger_fact=trigger_fact)
-            print("")
-            print(f"🧠 Matches Found {len(matches)}")
+            if not self.short_circuit:
+                matches = self._find_matching_rules(trigger_fact=trigger_fact)
+                if self.verbose:
+                    print("")
+                    print(f"🧠 Matches Found {len(matches)}")
 
         return (any_rule_fired, last_derived)
 
@@ -81,62 +104,96 @@ class ScalingEngine:
         """Return all (rule, bindings) pairs whose antecedents are satisfied.
         Uses trigger_fact as a cheap filter: only consider rules where at least one
         positive antecedent unifies with the trigger."""
-        matches = []
-        for rule in self.knowledge_base.rules:
+        return list(self._iter_matching_rules(trigger_fact=trigger_fact))
+
+    def _iter_matching_rules(self, *, trigger_fact):
+        """Lazily yield (rule, bindings) activations for trigger_fact, rule by rule in KB order.
+        Only rules the KB indexes under the trigger's title are tried. Activations are
+        deduplicated by _activation_key (a hashed set) as they are produced."""
+        # A consumed trigger has left WM and can't anchor new matches
+        if self.working_memory.is_consumed(fact=trigger_fact):
+            return
+
+        seen = set()
+        for rule, anchor_idx in self.knowledge_base.rules_for_trigger(fact_title=trigger_fact.fact_title):
+            for bindings in self._iter_rule_activations(rule=rule, anchor_idx=anchor_idx, trigger_fact=trigger_fact):
+                key = self._activation_key(rule=rule, bindings=bindings)
+                if key not in seen:
+                    seen.add(key)
+                    if self.verbose:
+                        print(f'✅ Match succeeded')
+                    yield (rule, bindings)
+
+    def _iter_rule_activations(self, *, rule, anchor_idx, trigger_fact):
+        """Lazily yield the binding sets for one rule, with antecedent anchor_idx anchored on trigger_fact."""
+        if self.verbose:
             print("")
             print(f'👀 Attempting to match: \trule "{rule.rule_name}" 👉 fact "{trigger_fact.fact_title}"')
 
-            for ant_idx, antecedent in enumerate(rule.antecedents):
-                if isinstance(antecedent, NegatedFact):
-                    continue
-
-                initial_bindings = self._unify(pattern=antecedent, fact=trigger_fact, bindings={})
-                if initial_bindings is None:
-                    print(f'❌ Match Failed')
-                    break
-                    # continue
-
-                initial_bindings['_matched_facts'] = [trigger_fact]
-
-                # Anchor: this antecedent binds to trigger_fact.
-                # Match remaining antecedents against all KB + WM facts.
-                remaining = rule.antecedents[:ant_idx] + rule.antecedents[ant_idx + 1:]
-                bindings_list = self._match_antecedents(antecedents=remaining, bindings=initial_bindings)
-                if not bindings_list:
-                    print(f'❌ Match Failed')
-                for bindings in bindings_list:
-                    if (rule, bindings) not in matches:
-                        print(f'✅ Match succeeded')
-                        matches.append((rule, bindings))
-                break  # Only anchor to first matching antecedent per rule
-
-        return matches
+        initial_bindings = self._unify(pattern=rule.antecedents[anchor_idx], fact=trigger_fact, bindings={})
+        if initial_bindings is None:
+            if self.verbose:
+                print(f'❌ Match Failed')
+            return
+
+        initial_bindings['_matched_facts'] = [trigger_fact]
+
+        # Anchor: this antecedent MUST bind to trigger_fact.
+        # Match remaining antecedents against all KB + WM facts.
+        remaining = rule.antecedents[:anchor_idx] + rule.antecedents[anchor_idx + 1:]
+        matched = False
+        for bindings in self._iter_antecedent_matches(antecedents=remaining, bindings=initial_bindings):
+            matched = True
+            yield bindings
+        if not matched and self.verbose:
+            print(f'❌ Match Failed')
+
+    def _activation_key(self, *, rule, bindings):
+        """Hashable identity of an activation: the rule plus the exact facts it matched.
+        The variable bindings follow from those facts, so equal keys mean equal activations."""
+        return (id(rule), tuple(id(fact) for fact in bindings['_matched_facts']))
 
     def _match_antecedents(self, *, antecedents, bindings):
-        """Recursively match a list of antecedents against KB reference facts + WM facts.
-        Returns all valid binding sets. Handles NegatedFact via negation-as-failure."""
-        if not antecedents:
-            return [bindings]
-
-        first = antecedents[0]
-        rest = antecedents[1:]
-        all_facts = self.knowledge_base.reference_facts + self.working_memory.facts
-
-        if isinstance(first, NegatedFact):
-            pattern = first.fact
-            for fact in all_facts:
-                if self._unify(pattern=pattern, fact=fact, bindings=bindings) is not None:
-                    return []
-            return self._match_antecedents(antecedents=rest, bindings=bindings)
-
-        results = []
-        for fact in all_facts:
-            new_bindings = self._unify(pattern=first, fact=fact, bindings=bindings)
-            if new_bindings is not None:
-                new_bindings['_matched_facts'] = bindings.get('_matched_facts', []) + [fact]
-                sub_results = self._match_antecedents(antecedents=rest, bindings=new_bindings)
-                results.extend(sub_results)
-        return results
+        """Match a list of antecedents against visible KB reference facts + WM facts.
+        Returns all valid binding sets, in the order _iter_antecedent_matches yields them."""
+        return list(self._iter_antecedent_matches(antecedents=antecedents, bindings=bindings))
+
+    def _iter_antecedent_matches(self, *, antecedents, bindings):
+        """Lazily yield the binding sets that satisfy antecedents, depth-first in the same order
+        as a recursive left-to-right search, so a caller that only needs the first result stops
+        the search there. One BindingEnvironment is bound and undone in place along the way;
+        a dict is only built per yielded binding set. Handles NegatedFact via negation-as-failure."""
+        all_facts = self.knowledge_base.visible_reference_facts() + self.working_memory.facts
+        env = self._binding_environment(bindings=bindings)
+        # Frames: (antecedent index, remaining candidate facts, environment mark on entry)
+        stack = [(0, iter(all_facts), env.mark())]
+
+        while stack:
+            ant_idx, candidates, mark = stack[-1]
+            # Backtrack whatever the previous candidate at this depth bound
+            env.undo(mark=mark)
+
+            if ant_idx == len(antecedents):
+                stack.pop()
+                yield env.snapshot()
+                continue
+
+            antecedent = antecedents[ant_idx]
+            if isinstance(antecedent, NegatedFact):
+                stack.pop()
+                pattern = antecedent.fact
+                title = pattern.fact_title
+                if not any(fact.fact_title == title and env.can_unify(pattern=pattern, fact=fact) for fact in all_facts):
+                    stack.append((ant_idx + 1, iter(all_facts), env.mark()))
+                continue
+
+            title = antecedent.fact_title
+            for fact in candidates:
+                if fact.fact_title == title and env.match_fact(pattern=antecedent, fact=fact):
+                    stack.append((ant_idx + 1, iter(all_facts), env.mark()))
+                    break
+            else:
+                stack.pop()
 
     def _unify(self, *, pattern, fact, bindings):
         """Try to match one antecedent pattern against one fact.
@@ -185,23 +242,56 @@ class ScalingEngine:
         return False
 
     def _resolve_conflict(self, *, matches):
-        """Pick the best (rule, bindings, fire_key) from a list.
-        Supports priority (default) and specificity strategies."""
-        if self.conflict_resolution_strategy == "specificity":
-            return max(matches, key=lambda x: len(x[0].antecedents))
-        return max(matches, key=lambda x: x[0].priority)
+        """Pick the best (rule, bindings, fire_key) from a list using an Agenda for the
+        conflict resolution strategy (priority by default; see classes/Agenda.py)."""
+        agenda = Agenda(strategy=self.conflict_resolution_strategy)
+        agenda.extend(activations=matches)
+        return agenda.pop()
 
     def _fire_rule_dfs(self, *, rule, bindings):
         """Fire a rule: run action_fn if present, then derive consequent.
-        DFS: if the derived fact triggers further rules, fire them recursively
-        via a while-loop with explicit fired-set tracking."""
+        DFS: if the derived fact triggers further rules, fire them depth-first with
+        explicit fired-set tracking. The chain runs over an explicit stack with one
+        frame per derived fact still being chased, so chain depth is not bounded by
+        the interpreter recursion limit."""
+        derived = self._fire_rule(rule=rule, bindings=bindings)
+        if derived is None:
+            return None
+
+        stack = []
+        if self._can_chain(derived=derived):
+            stack.append(self._chain_frame(derived=derived))
+        while stack:
+            frame = stack[-1]
+            if frame['resumed']:
+                # Resuming after a chained firing: new facts may enable new matches
+                frame['resumed'] = False
+                if not self.short_circuit:
+                    frame['matches'] = self._find_chain_matches(trigger_fact=frame['derived'])
+
+            selected = self._next_activation(trigger_fact=frame['derived'], matches=frame['matches'], fired=frame['fired'])
+            if selected is None:
+                stack.pop()
+                continue
+
+            chain_rule, chain_bindings = selected
+            frame['resumed'] = True
+            chain_derived = self._fire_rule(rule=chain_rule, bindings=chain_bindings)
+            if chain_derived is not None and self._can_chain(derived=chain_derived):
+                stack.append(self._chain_frame(derived=chain_derived))
+
+        return derived
+
+    def _fire_rule(self, *, rule, bindings):
+        """Fire one rule without chaining: run action_fn, then assert the consequent.
+        Returns the derived fact to chain from, or None when the rule has no consequent."""
         matched_facts = bindings.get('_matched_facts', [])
         derivation = {'rule_name': rule.rule_name, 'antecedent_facts': list(matched_facts)}
         prev_derivation = self.working_memory._current_derivation
         self.working_memory._current_derivation = derivation
 
         if rule.action_fn:
-            bindings = rule.action_fn(bindings=bindings, wm=self.working_memory, kb=self.knowledge_base)
+            bindings = self._run_action(rule=rule, bindings=bindings)
 
         if rule.consequent is not None:
             derived = self._apply_bindings(fact_template=rule.consequent, bindings=bindings)
@@ -217,46 +307,107 @@ class ScalingEngine:
                     print(f"[Rule fired] {rule.rule_name} -> No new WM assertions (fact already exists)")
 
             self.working_memory._current_derivation = prev_derivation
+            self._retract_consumed(rule=rule, matched_facts=matched_facts)
+            return derived
+        elif self.verbose:
+            print(f"👀 No new WM assertions")
 
-            # DFS: chase rules triggered by the derived fact
-            fired = set()
-            chain_matches = self._find_matching_rules(trigger_fact=derived)
+        self.working_memory._current_derivation = prev_derivation
+        self._retract_consumed(rule=rule, matched_facts=matched_facts)
+        return None
 
+    def _can_chain(self, *, derived):
+        """Whether any visible rule anchors on derived's title. When none does (per the static
+        RuleGraph) there is nothing to chase, so no frame is pushed and no matching is done."""
+        return self.knowledge_base.rule_graph().can_trigger(fact_title=derived.fact_title)
+
+    def _run_action(self, *, rule, bindings):
+        return rule.action_fn(bindings=bindings, wm=self.working_memory, kb=self.knowledge_base)
+
+    def _chain_frame(self, *, derived):
+        """DFS stack frame for chasing the rules a derived fact triggers.
+        fired tracks (rule_name, bindings) already fired from this frame; matches stays
+        None in short-circuit mode, where activations are found by _next_activation."""
+        return {
+            'derived': derived,
+            'fired': set(),
+            'matches': None if self.short_circuit else self._find_chain_matches(trigger_fact=derived),
+            'resumed': False,
+        }
+
+    def _find_chain_matches(self, *, trigger_fact):
+        matches = self._find_matching_rules(trigger_fact=trigger_fact)
+        if self.verbose:
             print("")
-            print(f"🧠 Matches Found {len(chain_matches)}")
-            while chain_matches:
-                wm_size = len(self.working_memory.facts)
-
-                fresh = []
-                for m_rule, m_bindings in chain_matches:
-                    binding_key = frozenset(
-                        (k, v) for k, v in m_bindings.items()
-                        if isinstance(k, str) and k.startswith('?')
-                    )
-                    has_negated = any(
-                        isinstance(a, NegatedFact) for a in m_rule.antecedents
-                    )
-                    if has_negated:
-                        key = (m_rule.rule_name, wm_size, binding_key)
-                    else:
-                        key = (m_rule.rule_name, binding_key)
-                    if key not in fired:
-                        fresh.append((m_rule, m_bindings, key))
-                if not fresh:
-                    break
+            print(f"🧠 Matches Found {len(matches)}")
+        return matches
 
-                best_chain_rule, best_chain_bindings, fire_key = self._resolve_conflict(matches=fresh)
-                fired.add(fire_key)
+    def _next_activation(self, *, trigger_fact, matches, fired):
+        """Next (rule, bindings) to fire for trigger_fact, recorded in fired, or None.
+        matches is the full match list, or None in short-circuit mode. Strategies that
+        rank activations by more than the rule (recency, lex, mea) can't short-circuit,
+        so they always match in full."""
+        if matches is None:
+            salience = RULE_SALIENCE.get(self.conflict_resolution_strategy)
+            if salience is not None:
+                return self._first_unfired_by_salience(trigger_fact=trigger_fact, fired=fired, salience=salience)
+            matches = self._find_matching_rules(trigger_fact=trigger_fact)
+        return self._select_unfired(matches=matches, fired=fired)
+
+    def _select_unfired(self, *, matches, fired):
+        """Resolve conflict among the matches not yet in fired and record the winner there.
+        Activations are popped off an Agenda in strategy order and fire keys are only
+        computed for the ones popped. Returns (rule, bindings), or None when nothing fresh is left."""
+        if not matches:
+            return None
 
-                self._fire_rule_dfs(rule=best_chain_rule, bindings=best_chain_bindings)
+        wm_revision = self.working_memory.revision
 
-                chain_matches = self._find_matching_rules(trigger_fact=derived)
-                print("")
-                print(f"🧠 Matches Found {len(chain_matches)}")
+        agenda = Agenda(strategy=self.conflict_resolution_strategy)
+        agenda.extend(activations=((m_rule, m_bindings, None) for m_rule, m_bindings in matches))
+        while agenda:
+            best_rule, best_bindings, _ = agenda.pop()
+            fire_key = self._fire_key(rule=best_rule, bindings=best_bindings, wm_revision=wm_revision)
+            if fire_key not in fired:
+                fired.add(fire_key)
+                return (best_rule, best_bindings)
+        return None
 
-            return derived
-        else:
-            print(f"👀 No new WM assertions")
+    def _first_unfired_by_salience(self, *, trigger_fact, fired, salience):
+        """Short-circuit counterpart of _find_matching_rules + _select_unfired. Rules are scanned
+        in descending salience for the conflict resolution strategy (ties in KB order), so the
+        first unfired activation found is the one _resolve_conflict would pick, and no rule
+        after it is matched at all."""
+        if self.working_memory.is_consumed(fact=trigger_fact):
+            return None
 
-        self.working_memory._current_derivation = prev_derivation
+        wm_revision = self.working_memory.revision
+        for rule, anchor_idx in self.knowledge_base.rules_by_salience(fact_title=trigger_fact.fact_title, salience=salience):
+            for bindings in self._iter_rule_activations(rule=rule, anchor_idx=anchor_idx, trigger_fact=trigger_fact):
+                key = self._fire_key(rule=rule, bindings=bindings, wm_revision=wm_revision)
+                if key not in fired:
+                    if self.verbose:
+                        print(f'✅ Match succeeded')
+                    fired.add(key)
+                    return (rule, bindings)
         return None
+
+    def _fire_key(self, *, rule, bindings, wm_revision):
+        """Identity of a firing for the fired sets: (rule_name, bindings). Rules with NegatedFact
+        guards include the WM revision, so they may re-fire with the same bindings once WM has changed."""
+        binding_key = frozenset(
+            (k, v) for k, v in bindings.items()
+            if isinstance(k, str) and k.startswith('?')
+        )
+        has_negated = any(
+            isinstance(a, NegatedFact) for a in rule.antecedents
+        )
+        if has_negated:
+            return (rule.rule_name, wm_revision, binding_key)
+        return (rule.rule_name, binding_key)
+
+    def _retract_consumed(self, *, rule, matched_facts):
+        """Retract the matched facts whose titles the rule consumes (transient request facts)."""
+        for fact in matched_facts:
+            if fact.fact_title in rule.consumes:
+                self.working_memory.consume_fact(fact=fact, indent="  ", silent=not self.verbose)
@@ -12,38 +12,39 @@ from scaling.rules.scaled_ingredients import get_scaled_ingredient_rules
 from scaling.rules.optimally_scaled_measurement_unit_conversions import get_optimal_unit_conversion_rules
 
 
-def main(*, wm, kb, recipe, args):
-    print("*"*70)
-    print("⚙️⚙️ CONFIGURE KNOWLEDGE BASE ⚙️⚙️")
-    print("*"*70)
-    print("")
-
+def configure_knowledge_base(*, kb):
+    """Load the scaling reference facts and rules into the knowledge base's SCALING module"""
     ingredient_classification_facts = get_ingredient_classification_facts()
-    kb.add_reference_facts(facts=ingredient_classification_facts)
+    kb.add_reference_facts(facts=ingredient_classification_facts, module=ScalingEngine.MODULE)
 
     ingredient_classification_scale_factors = get_ingredient_classification_scale_factor_facts()
-    kb.add_reference_facts(facts=ingredient_classification_scale_factors)
+    kb.add_reference_facts(facts=ingredient_classification_scale_factors, module=ScalingEngine.MODULE)
 
     measurement_unit_conversions = get_measurement_unit_conversion_facts()
-    kb.add_reference_facts(facts=measurement_unit_conversions)
+    kb.add_reference_facts(facts=measurement_unit_conversions, module=ScalingEngine.MODULE)
 
     ingredient_classification_rules = get_ingredient_classification_rules()
-    kb.add_rules(rules=ingredient_classification_rules)
+    kb.add_rules(rules=ingredient_classification_rules, module=ScalingEngine.MODULE)
 
     scaling_multiplier_rules = get_ingredient_classification_scaling_multiplier_rules()
-    kb.add_rules(rules=scaling_multiplier_rules)
+    kb.add_rules(rules=scaling_multiplier_rules, module=ScalingEngine.MODULE)
 
     scaled_ingredient_rules = get_scaled_ingredient_rules()
-    kb.add_rules(rules=scaled_ingredient_rules)
+    kb.add_rules(rules=scaled_ingredient_rules, module=ScalingEngine.MODULE)
 
     optimal_unit_conversion_rules = get_optimal_unit_conversion_rules()
-    kb.add_rules(rules=optimal_unit_conversion_rules)
+    kb.add_rules(rules=optimal_unit_conversion_rules, module=ScalingEngine.MODULE)
 
-    print("*"*70)
-    print("⚙️⚙️ CONFIGURE WORKING MEMORY ⚙️⚙️")
-    print("*"*70)
-    print("")
+    # Precompute the scaling rules' stratification (raises ValueError if they are cyclic)
+    kb.focus(module=ScalingEngine.MODULE)
+    try:
+        kb.rule_graph().strata()
+    finally:
+        kb.pop_focus()
 
+
+def configure_working_memory(*, wm, recipe):
+    """Assert one recipe_ingredient fact per recipe ingredient"""
     for ingredient in recipe.ingredients:
         wm.add_fact(
             fact=Fact(fact_title='recipe_ingredient',
@@ -55,10 +56,54 @@ def main(*, wm, kb, recipe, args):
             silent=True
         )
 
+
+def run_engine(*, wm, kb, conflict_resolution_strategy='priority', verbose=True, short_circuit=False,
+               profiler=None, tracer=None, flamegraph=None, memory_tracker=None, budget=None):
+    SCALING_ENGINE = ScalingEngine(
+        wm=wm,
+        kb=kb,
+        conflict_resolution_strategy=conflict_resolution_strategy,
+        verbose=verbose,
+        short_circuit=short_circuit,
+        profiler=profiler,
+        tracer=tracer,
+        flamegraph=flamegraph,
+        memory_tracker=memory_tracker,
+        budget=budget,
+    )
+    SCALING_ENGINE.run()
+    return SCALING_ENGINE
+
+
+def main(*, wm, kb, recipe, args, profiler=None, tracer=None, flamegraph=None, memory_tracker=None, budget=None):
+    print("*"*70)
+    print("⚙️⚙️ CONFIGURE KNOWLEDGE BASE ⚙️⚙️")
+    print("*"*70)
+    print("")
+
+    configure_knowledge_base(kb=kb)
+
+    print("*"*70)
+    print("⚙️⚙️ CONFIGURE WORKING MEMORY ⚙️⚙️")
+    print("*"*70)
+    print("")
+
+    configure_working_memory(wm=wm, recipe=recipe)
+
     print("*"*70)
     print("⚙️⚙️ RUN SCALING INFERENCE ENGINE ⚙️⚙️")
     print("*"*70)
     print("")
 
-    SCALING_ENGINE = ScalingEngine(wm=wm, kb=kb, conflict_resolution_strategy=args.scaling_conflict_resolution, verbose=True)
-    SCALING_ENGINE.run()
+    run_engine(
+        wm=wm,
+        kb=kb,
+        conflict_resolution_strategy=args.scaling_conflict_resolution,
+        verbose=True,
+        short_circuit=args.short_circuit_matching,
+        profiler=profiler,
+        tracer=tracer,
+        flamegraph=flamegraph,
+        memory_tracker=memory_tracker,
+        budget=budget,
+    )
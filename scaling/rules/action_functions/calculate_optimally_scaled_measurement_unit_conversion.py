@@ -109,7 +109,7 @@ def calculate_optimal_unit(*, bindings, wm, kb):
 
     base_amount = scaled_amount * current_to_base
 
-    all_facts = kb.reference_facts + wm.facts
+    all_facts = kb.visible_reference_facts() + wm.facts
     unit_conversions = [
         fact for fact in all_facts
         if fact.fact_title == 'unit_conversion'
@@ -0,0 +1,78 @@
+import json
+import asyncio
+import argparse
+import itertools
+
+
+class ServiceClient:
+    """Minimal asyncio client for service.server: one connection, pipelined requests."""
+
+    def __init__(self, *, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._read_task = asyncio.create_task(self._read_responses())
+
+    @classmethod
+    async def connect(cls, *, path=None, host='127.0.0.1', port=None):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path=path)
+        else:
+            reader, writer = await asyncio.open_connection(host=host, port=port)
+        return cls(reader=reader, writer=writer)
+
+    async def request(self, **payload):
+        """Send one request (op=..., scaling_factor=..., ...) and await its response dict."""
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self.writer.write((json.dumps({'id': request_id, **payload}) + "\n").encode())
+        await self.writer.drain()
+        return await future
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self._read_task.cancel()
+
+    async def _read_responses(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self._pending.pop(response.get('id'), None)
+            if future is not None and not future.done():
+                future.set_result(response)
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("service closed the connection"))
+        self._pending.clear()
+
+
+async def _main(*, args):
+    client = await ServiceClient.connect(path=args.socket, port=args.port)
+    try:
+        payload = {'op': args.op, 'recipe': args.recipe, 'scaling_factor': args.scaling_factor}
+        if args.deadline_ms is not None:
+            payload['deadline_ms'] = args.deadline_ms
+        response = await client.request(**payload)
+    finally:
+        await client.close()
+    print(json.dumps(response, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sends one request to a running recipe service.")
+    parser.add_argument("--socket", type=str, default=None, help="Unix socket path of the service")
+    parser.add_argument("--port", type=int, default=None, help="Local TCP port of the service")
+    parser.add_argument("--op", type=str, default="scale", choices=["scale", "plan"], help="Request type")
+    parser.add_argument("--recipe", type=str, default="chocolate_chip_cookies", help="Recipe to scale")
+    parser.add_argument("--scaling_factor", type=float, default=2, help="Scaling factor")
+    parser.add_argument("--deadline_ms", type=float, default=None, help="Per-request deadline")
+
+    args = parser.parse_args()
+    if args.socket is None and args.port is None:
+        parser.error("one of --socket or --port is required")
+    asyncio.run(_main(args=args))
@@ -0,0 +1,89 @@
+import json
+import time
+import asyncio
+import argparse
+import itertools
+
+# modules
+from service.client import ServiceClient
+
+
+def percentile(*, values, pct):
+    """Nearest-rank percentile of values (pct in 0-100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(*, latencies_ms, num_errors, elapsed_s):
+    num_requests = len(latencies_ms) + num_errors
+    return {
+        'requests': num_requests,
+        'errors': num_errors,
+        'elapsed_s': round(elapsed_s, 3),
+        'throughput_rps': round(num_requests / elapsed_s, 1) if elapsed_s else None,
+        'p50_ms': percentile(values=latencies_ms, pct=50),
+        'p90_ms': percentile(values=latencies_ms, pct=90),
+        'p99_ms': percentile(values=latencies_ms, pct=99),
+        'max_ms': max(latencies_ms) if latencies_ms else None,
+    }
+
+
+async def run_load(*, client, num_requests, concurrency, payloads):
+    """Closed-loop load: concurrency callers each send their next request as soon as the
+    previous one answers. Latency is measured client-side, round trip included."""
+    payloads = itertools.cycle(payloads)
+    remaining = itertools.count(num_requests, -1)
+    latencies_ms = []
+    num_errors = 0
+
+    async def caller():
+        nonlocal num_errors
+        while next(remaining) > 0:
+            start = time.perf_counter()
+            response = await client.request(**next(payloads))
+            if response['ok'] and response['result']['success']:
+                latencies_ms.append(round((time.perf_counter() - start) * 1000, 3))
+            else:
+                num_errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    return summarize(latencies_ms=latencies_ms, num_errors=num_errors, elapsed_s=time.perf_counter() - start)
+
+
+async def _main(*, args):
+    payloads = []
+    for scaling_factor in args.scaling_factors:
+        payload = {'op': args.op, 'recipe': args.recipe, 'scaling_factor': scaling_factor}
+        if args.deadline_ms is not None:
+            payload['deadline_ms'] = args.deadline_ms
+        payloads.append(payload)
+
+    client = await ServiceClient.connect(path=args.socket, port=args.port)
+    try:
+        summary = await run_load(client=client, num_requests=args.requests,
+                                 concurrency=args.concurrency, payloads=payloads)
+    finally:
+        await client.close()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drives a running recipe service and reports latency percentiles.")
+    parser.add_argument("--socket", type=str, default=None, help="Unix socket path of the service")
+    parser.add_argument("--port", type=int, default=None, help="Local TCP port of the service")
+    parser.add_argument("--requests", type=int, default=200, help="Total requests to send")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests kept outstanding at once")
+    parser.add_argument("--op", type=str, default="plan", choices=["scale", "plan"], help="Request type")
+    parser.add_argument("--recipe", type=str, default="chocolate_chip_cookies", help="Recipe to scale")
+    parser.add_argument("--scaling_factors", type=float, nargs="+", default=[1, 2, 4],
+                        help="Scaling factors cycled across requests")
+    parser.add_argument("--deadline_ms", type=float, default=None, help="Per-request deadline")
+
+    args = parser.parse_args()
+    if args.socket is None and args.port is None:
+        parser.error("one of --socket or --port is required")
+    asyncio.run(_main(args=args))
@@ -0,0 +1,64 @@
+import sys
+import asyncio
+import argparse
+
+# modules
+from batch.runner import create_process_pool
+from service.server import RecipeService, serve_socket, serve_stdio
+
+
+def _warm_up():
+    return None
+
+
+async def _serve(*, args):
+    pool = create_process_pool(max_workers=args.num_workers)
+    # start every worker now so the first requests don't pay for the fork
+    for future in [pool.submit(_warm_up) for _ in range(args.num_workers)]:
+        future.result()
+
+    try:
+        service = RecipeService(
+            executor=pool,
+            max_concurrency=args.max_concurrency or args.num_workers,
+            max_queue=args.max_queue,
+            default_deadline_ms=args.deadline_ms,
+        )
+        if args.stdio:
+            await serve_stdio(service=service)
+        else:
+            where = args.socket or f"127.0.0.1:{args.port}"
+            print(f"recipe service listening on {where}", file=sys.stderr)
+            await serve_socket(service=service, path=args.socket, port=args.port)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Long-running recipe scaling/planning service (JSON lines over a local socket or stdio).",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+
+    parser.add_argument("--socket", type=str, default=None, help="Listen on this unix socket path")
+    parser.add_argument("--port", type=int, default=None, help="Listen on this local TCP port")
+    parser.add_argument("--stdio", action="store_true", default=False,
+                        help="Read requests from stdin and write responses to stdout")
+    parser.add_argument("--num_workers", type=int, default=4, help="Worker processes")
+    parser.add_argument("--max_concurrency", type=int, default=None,
+                        help="Requests running at once (default: --num_workers)")
+    parser.add_argument("--max_queue", type=int, default=None,
+                        help="Requests allowed to wait for a slot before new ones are rejected (default: unbounded)")
+    parser.add_argument("--deadline_ms", type=float, default=None,
+                        help="Default per-request deadline, queueing included (default: none)")
+
+    args = parser.parse_args()
+    if sum([args.socket is not None, args.port is not None, args.stdio]) != 1:
+        parser.error("exactly one of --socket, --port or --stdio is required")
+    if args.num_workers < 1:
+        parser.error("--num_workers must be at least 1")
+
+    try:
+        asyncio.run(_serve(args=args))
+    except KeyboardInterrupt:
+        pass
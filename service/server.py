@@ -0,0 +1,197 @@
+import sys
+import json
+import time
+import asyncio
+
+# modules
+from batch.runner import warm_knowledge_base, run_job_in_worker
+
+# classes
+from batch.classes.BatchJob import BatchJob
+from classes.Agenda import STRATEGIES
+from recipes.registry import RECIPES
+
+# Requests are JSON objects, one per line:
+#   {"id": 1, "op": "scale", "recipe": "chocolate_chip_cookies", "scaling_factor": 2}
+#   {"id": 2, "op": "plan", "scaling_factor": 2, "num_ovens": 2, "deadline_ms": 500}
+# Every request gets exactly one response line carrying the same id:
+#   {"id": 1, "ok": true, "result": {...run_job result...}, "error": null, "elapsed_ms": 3.1}
+# ok is false only when the service could not produce a result (bad request,
+# overload, deadline, job crash); an inference failure is reported in result['success'].
+OPS = ('scale', 'plan')
+JOB_FIELDS = (
+    'scaling_conflict_resolution', 'planning_conflict_resolution',
+    'num_ovens', 'num_bowls', 'num_baking_sheets',
+)
+
+
+class RecipeService:
+    """Serves scale/plan requests against one warm knowledge base.
+    Jobs run on the given executor (normally batch.runner.create_process_pool); at most
+    max_concurrency run at once and at most max_queue more may wait for a slot."""
+
+    def __init__(self, *, executor, max_concurrency=4, max_queue=None, default_deadline_ms=None):
+        warm_knowledge_base()
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.default_deadline_ms = default_deadline_ms
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+        self._next_job_id = 0
+
+    async def handle_request(self, *, request):
+        """Run one decoded request and return its response dict (never raises)."""
+        start = time.perf_counter()
+        request_id = request.get('id') if isinstance(request, dict) else None
+
+        try:
+            job = self._build_job(request=request)
+        except ValueError as e:
+            return self._response(request_id=request_id, start=start, error=str(e))
+
+        deadline_ms = request.get('deadline_ms')
+        if deadline_ms is None:
+            deadline_ms = self.default_deadline_ms
+        if self.max_queue is not None and self._slots.locked() and self._waiting >= self.max_queue:
+            return self._response(request_id=request_id, start=start, error='overloaded')
+
+        try:
+            result = await asyncio.wait_for(
+                self._run_job(job=job),
+                timeout=None if deadline_ms is None else deadline_ms / 1000,
+            )
+        except asyncio.TimeoutError:
+            return self._response(request_id=request_id, start=start, error='deadline exceeded')
+        except Exception as e:
+            # e.g. BrokenProcessPool when a worker dies
+            return self._response(request_id=request_id, start=start, error=f"job failed: {e!r}")
+
+        return self._response(request_id=request_id, start=start, result=result)
+
+    async def handle_line(self, *, line):
+        """Decode one framed request line and return the encoded response line."""
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            response = self._response(request_id=None, start=time.perf_counter(), error=f"invalid JSON: {e}")
+        else:
+            response = await self.handle_request(request=request)
+        return json.dumps(response) + "\n"
+
+    async def serve_connection(self, reader, writer):
+        """Serve one JSON-lines stream. Requests on a connection are handled concurrently,
+        so responses may come back out of order; clients match them up by id."""
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(line):
+            response = await self.handle_line(line=line)
+            async with write_lock:
+                writer.write(response.encode())
+                await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _run_job(self, *, job):
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, run_job_in_worker, job)
+        except BaseException:
+            self._slots.release()
+            raise
+        # A deadline only abandons the job, which keeps its worker busy until it finishes,
+        # so the slot is held until then too
+        future.add_done_callback(self._release_slot)
+        return await asyncio.shield(future)
+
+    def _release_slot(self, future):
+        self._slots.release()
+        # Retrieve the outcome of abandoned jobs, so a failure isn't logged as never retrieved
+        if not future.cancelled():
+            future.exception()
+
+    def _build_job(self, *, request):
+        if not isinstance(request, dict):
+            raise ValueError("request must be a JSON object")
+
+        op = request.get('op')
+        if op not in OPS:
+            raise ValueError(f"unknown op: {op!r}")
+
+        recipe_name = request.get('recipe', 'chocolate_chip_cookies')
+        if not isinstance(recipe_name, str):
+            raise ValueError("recipe must be a recipe name")
+        if recipe_name not in RECIPES:
+            raise ValueError(f"unknown recipe: {recipe_name!r}")
+
+        scaling_factor = request.get('scaling_factor')
+        if isinstance(scaling_factor, bool) or not isinstance(scaling_factor, (int, float)) or scaling_factor <= 0:
+            raise ValueError("scaling_factor must be a positive number")
+
+        deadline_ms = request.get('deadline_ms')
+        if deadline_ms is not None and (
+            isinstance(deadline_ms, bool) or not isinstance(deadline_ms, (int, float)) or deadline_ms <= 0
+        ):
+            raise ValueError("deadline_ms must be a positive number")
+
+        for field in ('scaling_conflict_resolution', 'planning_conflict_resolution'):
+            if field in request and request[field] not in STRATEGIES:
+                raise ValueError(f"unknown {field}: {request[field]!r}")
+
+        self._next_job_id += 1
+        return BatchJob(
+            job_id=request.get('id', self._next_job_id),
+            recipe=RECIPES[recipe_name],
+            scaling_factor=scaling_factor,
+            run_planning=(op == 'plan'),
+            **{field: request[field] for field in JOB_FIELDS if field in request},
+        )
+
+    def _response(self, *, request_id, start, result=None, error=None):
+        return {
+            'id': request_id,
+            'ok': error is None,
+            'result': result,
+            'error': error,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 3),
+        }
+
+
+async def serve_socket(*, service, path=None, host='127.0.0.1', port=None):
+    """Serve on a unix socket at path, or on a local TCP port, until cancelled."""
+    if path is not None:
+        server = await asyncio.start_unix_server(service.serve_connection, path=path)
+    else:
+        server = await asyncio.start_server(service.serve_connection, host=host, port=port)
+    async with server:
+        await server.serve_forever()
+
+
+async def serve_stdio(*, service):
+    """Serve JSON lines read from stdin, writing responses to stdout, until EOF."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    write_transport, write_protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, sys.stdout)
+    writer = asyncio.StreamWriter(write_transport, write_protocol, reader, loop)
+    await service.serve_connection(reader, writer)
@@ -0,0 +1,148 @@
+import io
+import json
+
+import pytest
+
+from batch.classes.BatchJob import BatchJob
+from batch.runner import build_knowledge_base, run_job
+from batch.pipeline import iter_record_jobs, run_pipeline
+from recipes.loader import recipe_from_dict, recipe_to_dict
+from recipes.generator import generate_recipe, generate_workload, write_jsonl
+from recipes.chocolate_chip_cookies import chocolate_chip_cookies_recipe
+
+
+def _line(**record):
+    return json.dumps({'recipe': recipe_to_dict(recipe=chocolate_chip_cookies_recipe), **record}) + "\n"
+
+
+# ── recipes.loader ───────────────────────────────────────────────────
+
+class TestRecipeLoader:
+    def test_round_trip_through_json(self):
+        data = json.loads(json.dumps(recipe_to_dict(recipe=chocolate_chip_cookies_recipe)))
+        recipe = recipe_from_dict(data=data)
+        assert recipe_to_dict(recipe=recipe) == data
+
+    def test_loaded_recipe_plans_identically(self):
+        kb = build_knowledge_base()
+        loaded = recipe_from_dict(data=recipe_to_dict(recipe=chocolate_chip_cookies_recipe))
+        original = run_job(job=BatchJob(job_id=1, recipe=chocolate_chip_cookies_recipe, scaling_factor=3, run_planning=True), kb=kb)
+        reloaded = run_job(job=BatchJob(job_id=1, recipe=loaded, scaling_factor=3, run_planning=True), kb=kb)
+        assert reloaded == original
+
+    @pytest.mark.parametrize("mutate, error", [
+        (lambda d: d.pop('steps'), "recipe is missing 'steps'"),
+        (lambda d: d['ingredients'][0].pop('unit'), "ingredient 1 is missing unit"),
+        (lambda d: d['steps'][0].update(type='FryStep'), "unknown step type: 'FryStep'"),
+        (lambda d: d['steps'][0].pop('temperature'), "invalid PreheatStep"),
+        (lambda d: d.update(ingredients=[1]), "ingredient must be an object, got 1"),
+        (lambda d: d.update(steps=['bake']), "step must be an object, got 'bake'"),
+        (lambda d: d.update(steps='bake'), "recipe 'steps' must be a list"),
+        (lambda d: d['steps'][1].update(substeps=[None]), "step must be an object, got None"),
+        (lambda d: d.update(required_equipment=['OVEN']), "required_equipment must be a list of objects"),
+    ])
+    def test_malformed_recipes_raise_value_error(self, mutate, error):
+        data = recipe_to_dict(recipe=chocolate_chip_cookies_recipe)
+        mutate(data)
+        with pytest.raises(ValueError, match=error):
+            recipe_from_dict(data=data)
+
+
+# ── recipes.generator ────────────────────────────────────────────────
+
+class TestRecipeGenerator:
+    def test_same_seed_same_recipe(self):
+        first = recipe_to_dict(recipe=generate_recipe(seed=7, num_ingredients=12))
+        assert recipe_to_dict(recipe=generate_recipe(seed=7, num_ingredients=12)) == first
+        assert recipe_to_dict(recipe=generate_recipe(seed=8, num_ingredients=12)) != first
+
+    def test_covers_every_measurement_type_and_mixes_every_ingredient(self):
+        recipe = generate_recipe(seed=1, num_ingredients=4)
+        assert sorted(i.measurement_category for i in recipe.ingredients) == ['LIQUID', 'VOLUME', 'WEIGHT', 'WHOLE']
+
+        recipe = generate_recipe(seed=1, num_ingredients=50)
+        mixing = [step for step in recipe.steps if type(step).__name__ == 'MixingStep'][0]
+        mixed = [ingredient_id for substep in mixing.substeps for ingredient_id in substep.ingredient_ids]
+        assert sorted(mixed) == list(range(1, 51))
+        assert len({ingredient.ingredient_name for ingredient in recipe.ingredients}) == 50
+
+    def test_jsonl_workload_plans_in_the_batch_pipeline(self):
+        out = io.StringIO()
+        write_jsonl(records=generate_workload(seed=0, num_recipes=6, num_ingredients=[4, 25], scaling_factors=[1, 3]), out=out)
+        lines = out.getvalue().splitlines(keepends=True)
+        assert len(lines) == 6
+
+        results = list(run_pipeline(lines=lines, scaling_factors=[1], max_workers=0, run_planning=True))
+        assert [(r['success'], r['error']) for r in results] == [(True, None)] * 6
+
+
+# ── batch.pipeline ───────────────────────────────────────────────────
+
+class TestPipeline:
+    def test_records_are_read_lazily(self):
+        consumed = []
+
+        def lines():
+            for n in range(1, 1000):
+                consumed.append(n)
+                yield _line(scaling_factor=n)
+
+        jobs = iter_record_jobs(lines=lines(), scaling_factors=[2])
+        first = next(jobs)
+        assert first.job_id == '1'
+        assert consumed == [1]
+
+    def test_record_fields_override_defaults(self):
+        jobs = list(iter_record_jobs(
+            lines=[_line(num_ovens=1), "\n", _line(scaling_factor=5)],
+            scaling_factors=[1, 2],
+            run_planning=True,
+            num_ovens=4,
+        ))
+        assert [(j.job_id, j.scaling_factor, j.num_ovens) for j in jobs] == [
+            ('1:1', 1, 1), ('1:2', 2, 1), ('3', 5, 4),
+        ]
+        assert all(j.run_planning for j in jobs)
+
+    def test_bad_records_become_error_results(self):
+        lines = [_line(scaling_factor=2), '{"recipe": ', '{"scaling_factor": 2}', _line(scaling_factor=3)]
+        results = {r['job_id']: r for r in run_pipeline(lines=lines, scaling_factors=[1], max_workers=0)}
+        assert sorted(results) == ['1', '2', '3', '4']
+        assert results['1']['success'] and results['4']['success']
+        assert results['2']['error'].startswith("invalid record")
+        assert results['3']['error'] == "invalid record: record must be an object with a 'recipe'"
+
+    def test_bad_records_are_yielded_as_they_are_read(self):
+        consumed = []
+
+        def lines():
+            for n in range(1, 10001):
+                consumed.append(n)
+                yield '{"recipe": '
+
+        for max_workers in (0, 2):
+            consumed.clear()
+            results = run_pipeline(lines=lines(), scaling_factors=[1], max_workers=max_workers)
+            first = next(results)
+            assert first['job_id'] == '1'
+            assert consumed == [1]
+            assert sum(1 for _ in results) == 9999
+
+    def test_malformed_items_become_error_results(self):
+        recipe = recipe_to_dict(recipe=chocolate_chip_cookies_recipe)
+        lines = [
+            json.dumps({'recipe': {**recipe, 'ingredients': [1]}}),
+            json.dumps({'recipe': {**recipe, 'steps': ['bake']}}),
+            _line(scaling_factor=2),
+        ]
+        results = {r['job_id']: r for r in run_pipeline(lines=lines, scaling_factors=[2], max_workers=0)}
+        assert results['1']['error'] == "invalid record: ingredient must be an object, got 1"
+        assert results['2']['error'] == "invalid record: step must be an object, got 'bake'"
+        assert results['3']['success'] is True
+
+    def test_pool_matches_in_process(self):
+        lines = [_line(scaling_factor=n, num_ovens=2) for n in (1, 2, 4, 8)]
+        in_process = {r['job_id']: r for r in run_pipeline(lines=lines, scaling_factors=[1], max_workers=0, run_planning=True)}
+        pooled = {r['job_id']: r for r in run_pipeline(lines=iter(lines), scaling_factors=[1], max_workers=2,
+                                                          max_in_flight=2, run_planning=True)}
+        assert pooled == in_process
@@ -0,0 +1,100 @@
+import pytest
+
+from classes.Agenda import STRATEGIES
+from classes.Fact import Fact
+from classes.KnowledgeBase import KnowledgeBase
+from classes.WorkingMemory import WorkingMemory
+from batch.classes.BatchJob import BatchJob
+from batch.runner import build_knowledge_base, run_job, run_batch
+from recipes.chocolate_chip_cookies import chocolate_chip_cookies_recipe
+from utils.serialize_results import serialize_optimal_ingredients
+import scaling.main
+
+
+def _job(*, job_id, scaling_factor=2, run_planning=False, **kwargs):
+    return BatchJob(
+        job_id=job_id,
+        recipe=chocolate_chip_cookies_recipe,
+        scaling_factor=scaling_factor,
+        run_planning=run_planning,
+        **kwargs,
+    )
+
+
+# ── run_job ──────────────────────────────────────────────────────────
+
+class TestRunJob:
+    def test_scaling_matches_scaling_only_knowledge_base(self):
+        """Sharing one combined KB must not change scaling results."""
+        wm = WorkingMemory(verbose=False)
+        kb = KnowledgeBase()
+        wm.add_fact(fact=Fact(fact_title='target_recipe_scale_factor', target_recipe_scale_factor=3), silent=True)
+        scaling.main.configure_knowledge_base(kb=kb)
+        scaling.main.configure_working_memory(wm=wm, recipe=chocolate_chip_cookies_recipe)
+        scaling.main.run_engine(wm=wm, kb=kb, verbose=False)
+
+        result = run_job(job=_job(job_id=1, scaling_factor=3), kb=build_knowledge_base())
+        assert result['success'] is True
+        assert result['scaled_ingredients'] == serialize_optimal_ingredients(wm=wm)
+        assert result['plan'] is None
+
+    def test_planning_result_is_serialized(self):
+        result = run_job(job=_job(job_id=1, run_planning=True), kb=build_knowledge_base())
+        assert result['success'] is True
+        assert result['plan'][0]['step_class'] == 'PreheatStep'
+        cook_steps = [s for s in result['plan'] if s['step_class'] == 'CookStep']
+        assert len(cook_steps) == 3
+        assert all(s['substeps'] for s in cook_steps)
+
+    def test_planning_failure_reported(self):
+        result = run_job(job=_job(job_id=1, run_planning=True, num_ovens=0), kb=build_knowledge_base())
+        assert result['success'] is False
+        assert result['error'] == "OVEN could not be resolved"
+
+    def test_short_circuit_matching_gives_the_same_result(self):
+        kb = build_knowledge_base()
+        for scaling_factor in (0.5, 2, 20):
+            full = run_job(job=_job(job_id=1, scaling_factor=scaling_factor, run_planning=True), kb=kb)
+            short = run_job(
+                job=_job(job_id=1, scaling_factor=scaling_factor, run_planning=True, short_circuit_matching=True),
+                kb=kb,
+            )
+            assert short == full
+
+    @pytest.mark.parametrize('strategy', STRATEGIES)
+    def test_every_conflict_resolution_strategy_plans(self, strategy):
+        job = _job(
+            job_id=1,
+            run_planning=True,
+            scaling_conflict_resolution=strategy,
+            planning_conflict_resolution=strategy,
+        )
+        result = run_job(job=job, kb=build_knowledge_base())
+        assert result['success'] is True
+        assert len([s for s in result['plan'] if s['step_class'] == 'CookStep']) == 3
+
+    def test_knowledge_base_reusable_across_jobs(self):
+        kb = build_knowledge_base()
+        first = run_job(job=_job(job_id=1, run_planning=True), kb=kb)
+        second = run_job(job=_job(job_id=2, run_planning=True), kb=kb)
+        assert first['plan'] == second['plan']
+
+
+# ── run_batch ────────────────────────────────────────────────────────
+
+class TestRunBatch:
+    def test_in_process_and_pool_agree(self):
+        jobs = [_job(job_id=i, scaling_factor=i, run_planning=(i % 2 == 0)) for i in range(1, 7)]
+        in_process = {r['job_id']: r for r in run_batch(jobs=jobs, max_workers=0)}
+        pooled = {r['job_id']: r for r in run_batch(jobs=iter(jobs), max_workers=2, max_in_flight=2)}
+        assert sorted(pooled) == list(range(1, 7))
+        assert pooled == in_process
+
+    def test_failed_job_does_not_stop_batch(self):
+        jobs = [
+            _job(job_id=1, run_planning=True, num_ovens=0),
+            _job(job_id=2),
+        ]
+        results = {r['job_id']: r for r in run_batch(jobs=jobs, max_workers=1)}
+        assert results[1]['success'] is False
+        assert results[2]['success'] is True
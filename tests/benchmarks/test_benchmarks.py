@@ -0,0 +1,72 @@
+from batch.runner import build_knowledge_base
+from benchmarks.scenarios import build_scenarios
+from benchmarks.runner import run_suite
+from benchmarks.compare import compare_results
+
+
+def _measurement(*, wall_time=0.01, peak_memory_kb=100.0, rule_firings=114, wm_facts=183, success=True):
+    return {
+        'success': success,
+        'error': None,
+        'wall_time_s': {'min': wall_time, 'median': wall_time, 'max': wall_time},
+        'rule_firings': rule_firings,
+        'peak_memory_kb': peak_memory_kb,
+        'wm_facts': wm_facts,
+    }
+
+
+# ── scenarios ────────────────────────────────────────────────────────
+
+class TestScenarios:
+    def test_scenario_matrix(self):
+        scenarios = build_scenarios()
+        assert sorted(scenarios) == sorted([
+            'cookies_1x', 'cookies_10x', 'cookies_100x',
+            'ingredients_10', 'ingredients_100', 'ingredients_1000',
+            'kitchen_1_ovens', 'kitchen_10_ovens', 'kitchen_100_ovens',
+        ])
+        assert scenarios['kitchen_100_ovens'].num_baking_sheets == 500
+        assert len(scenarios['ingredients_1000'].recipe.ingredients) == 1000
+
+
+# ── run_suite ────────────────────────────────────────────────────────
+
+class TestRunSuite:
+    def test_records_every_metric(self):
+        scenarios = build_scenarios()
+        results = run_suite(scenarios={'cookies_1x': scenarios['cookies_1x']}, kb=build_knowledge_base(), repeat=2)
+        measurement = results['scenarios']['cookies_1x']
+
+        assert results['meta']['repeat'] == 2
+        assert measurement['success'] is True
+        assert 0 < measurement['wall_time_s']['min'] <= measurement['wall_time_s']['max']
+        assert measurement['rule_firings'] > 0
+        assert measurement['peak_memory_kb'] > 0
+        assert measurement['wm_facts'] == 183
+
+
+# ── compare_results ──────────────────────────────────────────────────
+
+class TestCompareResults:
+    def test_within_tolerance_passes(self):
+        baseline = {'scenarios': {'a': _measurement()}}
+        results = {'scenarios': {'a': _measurement(wall_time=0.012), 'b': _measurement()}}
+        rows, failed = compare_results(results=results, baseline=baseline, tolerance=0.25)
+        assert failed is False
+        assert [row['status'] for row in rows if row['scenario'] == 'b'] == ['new']
+
+    def test_slower_run_regresses(self):
+        baseline = {'scenarios': {'a': _measurement()}}
+        results = {'scenarios': {'a': _measurement(wall_time=0.02, peak_memory_kb=50.0)}}
+        rows, failed = compare_results(results=results, baseline=baseline, tolerance=0.25)
+        statuses = {row['metric']: row['status'] for row in rows}
+        assert failed is True
+        assert statuses['wall_time_s'] == 'REGRESSION'
+        assert statuses['peak_memory_kb'] == 'improved'
+
+    def test_changed_firings_fail(self):
+        baseline = {'scenarios': {'a': _measurement()}}
+        results = {'scenarios': {'a': _measurement(rule_firings=120)}}
+        rows, failed = compare_results(results=results, baseline=baseline)
+        assert failed is True
+        assert {row['metric']: row['status'] for row in rows}['rule_firings'] == 'CHANGED'
@@ -218,6 +218,106 @@ class TestEndToEndEquipmentStates:
         assert wm.query_equipment_state(equipment_name='COUNTERTOP', equipment_id=1) == 'AVAILABLE'
         assert wm.query_equipment_state(equipment_name='COOLING_RACK', equipment_id=1) == 'AVAILABLE'
 
+    def test_transient_request_facts_consumed(self):
+        """Request/pending facts are retracted once their rule fires, but stay explainable."""
+        ingredients = [
+            Ingredient(id=1, name='butter', amount=1, unit='cups', measurement_category='VOLUME'),
+            Ingredient(id=2, name='flour', amount=2, unit='cups', measurement_category='VOLUME'),
+        ]
+        substeps = [MixingSubstep(ingredient_ids=[1, 2], description='Mix')]
+
+        engine, wm, recipe = _make_full_pipeline_engine(
+            ingredients=ingredients, substeps=substeps,
+            num_baking_sheets=3, num_ovens=2,
+        )
+        success, plan = engine.run(recipe=recipe)
+        assert success is True
+
+        transient = {'available_rack_request', 'preheat_check_request', 'transfer_planning_request',
+                     'equipment_transfer_planning_request', 'pending_ingredient', 'pending_cook_placement'}
+        assert not [f for f in wm.facts if f.fact_title in transient]
+        consumed_titles = {f.fact_title for f in wm.consumed_facts.values()}
+        assert consumed_titles == transient
+
+        # Derived facts still point at the consumed facts they came from
+        transfer_plan = wm.query_facts(fact_title='transfer_plan', first=True)
+        assert transfer_plan.derivation['antecedent_facts'][0].fact_title == 'transfer_planning_request'
+
+
+# ---------------------------------------------------------------------------
+# Bulk sheet allocation
+# ---------------------------------------------------------------------------
+
+class TestSheetAllocation:
+    def _run(self, *, num_baking_sheets, dirty_ids=()):
+        ingredients = [
+            Ingredient(id=1, name='flour', amount=4, unit='cups', measurement_category='VOLUME'),
+        ]
+        substeps = [MixingSubstep(ingredient_ids=[1], description='Add flour')]
+        engine, wm, recipe = _make_full_pipeline_engine(
+            ingredients=ingredients, substeps=substeps,
+            num_baking_sheets=num_baking_sheets, num_ovens=3,
+        )
+        for sheet in wm.query_equipment(equipment_name='BAKING_SHEET'):
+            if sheet.attributes['equipment_id'] in dirty_ids:
+                sheet.attributes['state'] = 'DIRTY'
+        success, plan = engine.run(recipe=recipe)
+        return success, plan, wm
+
+    def test_all_sheets_allocated_in_one_firing(self):
+        success, plan, wm = self._run(num_baking_sheets=5)
+        assert success is True
+
+        allocated = wm.query_facts(fact_title='sheet_allocated')
+        assert [f.attributes['target_equipment_id'] for f in allocated] == [1, 2, 3, 4, 0]
+        # One firing: every sheet_allocated shares that firing's derivation
+        assert len({id(f.derivation) for f in allocated}) == 1
+        assert allocated[0].derivation['rule_name'] == 'allocate_next_sheet'
+
+        # Each sheet's facts are asserted in per-sheet order
+        titles = [f.fact_title for f in wm.facts
+                  if f.fact_title in ('transfer_request', 'transfer_completed', 'sheet_allocated')]
+        assert titles[:3] == ['transfer_request', 'transfer_completed', 'sheet_allocated']
+
+    def test_dirty_sheets_cleaned_after_available_pool(self):
+        success, plan, wm = self._run(num_baking_sheets=5, dirty_ids=(1, 3))
+        assert success is True
+
+        allocated = wm.query_facts(fact_title='sheet_allocated')
+        assert [f.attributes['target_equipment_id'] for f in allocated] == [2, 4, 5, 1, 0]
+        assert [s.description for s in plan if type(s).__name__ == 'CleaningStep'] == ['Clean BAKING_SHEET #1']
+
+    def test_error_releases_unused_reservations(self):
+        ingredients = [
+            Ingredient(id=1, name='flour', amount=4, unit='cups', measurement_category='VOLUME'),
+        ]
+        substeps = [MixingSubstep(ingredient_ids=[1], description='Add flour')]
+        engine, wm, recipe = _make_full_pipeline_engine(
+            ingredients=ingredients, substeps=substeps, num_baking_sheets=5, num_ovens=3,
+        )
+        forward_chain = engine._forward_chain
+        transfers = []
+        def failing_forward_chain(*, trigger_fact):
+            result = forward_chain(trigger_fact=trigger_fact)
+            if trigger_fact.fact_title == 'transfer_request':
+                transfers.append(trigger_fact)
+                if len(transfers) == 2:
+                    engine.last_error = "sheet 2 failed"
+            return result
+        engine._forward_chain = failing_forward_chain
+
+        success, result = engine.run(recipe=recipe)
+        assert success is False
+        assert result == "sheet 2 failed"
+        states = {s.attributes['equipment_id']: s.attributes['state']
+                  for s in wm.query_equipment(equipment_name='BAKING_SHEET')}
+        assert states == {1: 'IN_USE', 2: 'IN_USE', 3: 'AVAILABLE', 4: 'AVAILABLE', 5: 'AVAILABLE'}
+
+    def test_not_enough_sheets(self):
+        success, result, wm = self._run(num_baking_sheets=3)
+        assert success is False
+        assert result == "Could not resolve BAKING_SHEET for sheet 4"
+
 
 # ---------------------------------------------------------------------------
 # Step request type classification
@@ -3,6 +3,7 @@ import pytest
 from classes.Fact import Fact
 from classes.KnowledgeBase import KnowledgeBase
 from classes.Recipe import Recipe
+from classes.Rule import Rule
 from classes.WorkingMemory import WorkingMemory
 from planning.classes.CleaningStep import CleaningStep
 from planning.classes.Step import Step
@@ -198,3 +199,36 @@ class TestEquipmentCleanedFact:
         assert len(ec) == 2
         names = {f.attributes['equipment_name'] for f in ec}
         assert names == {'BOWL'}
+
+
+class TestBestMatch:
+    def test_same_pick_as_resolving_all_matches(self):
+        """_best_match agrees with _resolve_conflict over the full match list, ties included."""
+        wm = WorkingMemory(verbose=False)
+        trigger = Fact(fact_title='request', kind='CLEAN')
+        wm.add_fact(fact=trigger, silent=True)
+        for equipment_id in (1, 2):
+            wm.add_fact(fact=Fact(fact_title='EQUIPMENT', equipment_name='BOWL', equipment_id=equipment_id), silent=True)
+
+        kb = KnowledgeBase()
+        kb.add_rules(rules=[
+            Rule(rule_name=name, priority=priority, consequent=None, antecedents=[
+                Fact(fact_title='request', kind='CLEAN'),
+                Fact(fact_title='EQUIPMENT', equipment_name='BOWL', equipment_id='?id'),
+            ])
+            for name, priority in (('low', 10), ('first_high', 50), ('second_high', 50))
+        ])
+        engine = PlanningEngine(wm=wm, kb=kb, verbose=False)
+
+        best_rule, best_bindings = engine._best_match(trigger_fact=trigger)
+        expected_rule, expected_bindings = engine._resolve_conflict(
+            matches=engine._find_matching_rules(trigger_fact=trigger),
+        )
+        assert best_rule is expected_rule
+        assert best_rule.rule_name == 'first_high'
+        assert best_bindings == expected_bindings
+        assert best_bindings['?id'] == 1
+
+    def test_no_match_is_none(self):
+        engine, wm, recipe = _make_oven_engine(state='AVAILABLE')
+        assert engine._best_match(trigger_fact=Fact(fact_title='unknown_request')) is None
@@ -149,6 +149,25 @@ class TestFindMatchingRules:
         assert len(matches) == 1
         assert matches[0][1]['?v'] == 10
 
+    def test_activations_are_generated_lazily(self):
+        """The first activation is yielded before later rules are even attempted."""
+        trigger = Fact(fact_title='item', name='SALT')
+        rules = [
+            Rule(rule_name=f'r{i}', antecedents=[Fact(fact_title='item', name='?n')], consequent=None)
+            for i in range(3)
+        ]
+        engine = _make_engine(wm_facts=[trigger], kb_rules=rules)
+        attempted = []
+        activations = engine._iter_rule_activations
+        engine._iter_rule_activations = lambda *, rule, anchor_idx, trigger_fact: (
+            attempted.append(rule.rule_name) or activations(rule=rule, anchor_idx=anchor_idx, trigger_fact=trigger_fact)
+        )
+
+        first_rule, first_bindings = next(engine._iter_matching_rules(trigger_fact=trigger))
+        assert first_rule.rule_name == 'r0'
+        assert first_bindings['?n'] == 'SALT'
+        assert attempted == ['r0']
+
 
 # ── _apply_bindings ──────────────────────────────────────────────────
 
@@ -177,3 +196,96 @@ class TestResolveConflict:
         r2 = Rule(rule_name='many', priority=10, antecedents=[Fact(fact_title='a'), Fact(fact_title='b')], consequent=None)
         best = engine._resolve_conflict(matches=[(r1, {}, 'k1'), (r2, {}, 'k2')])
         assert best[0].rule_name == 'many'
+
+
+# ── _fire_rule_dfs ───────────────────────────────────────────────────
+
+def _count_up(*, bindings, wm, kb):
+    bindings['?next'] = bindings['?n'] + 1
+    bindings['?more'] = bindings['?next'] < bindings['?depth']
+    return bindings
+
+
+class TestFireRuleDfs:
+    def test_chained_firings_run_depth_first(self):
+        rules = [
+            Rule(rule_name='start', priority=100, antecedents=[Fact(fact_title='a')], consequent=Fact(fact_title='x')),
+            Rule(rule_name='high', priority=50, antecedents=[Fact(fact_title='x')], consequent=Fact(fact_title='y')),
+            Rule(rule_name='low', priority=10, antecedents=[Fact(fact_title='x')], consequent=Fact(fact_title='w')),
+            Rule(rule_name='deep', priority=100, antecedents=[Fact(fact_title='y')], consequent=Fact(fact_title='z')),
+        ]
+        engine = _make_engine(wm_facts=[Fact(fact_title='a')], kb_rules=rules)
+        engine.run()
+        assert [f.fact_title for f in engine.working_memory.facts] == ['a', 'x', 'y', 'z', 'w']
+
+    def test_facts_no_rule_anchors_on_are_not_chased(self):
+        rules = [
+            Rule(rule_name='start', priority=100, antecedents=[Fact(fact_title='a')], consequent=Fact(fact_title='x')),
+            Rule(rule_name='leaf', priority=100, antecedents=[Fact(fact_title='x')], consequent=Fact(fact_title='leaf')),
+        ]
+        engine = _make_engine(wm_facts=[Fact(fact_title='a')], kb_rules=rules)
+        chased = []
+        find_chain_matches = engine._find_chain_matches
+        engine._find_chain_matches = lambda *, trigger_fact: (
+            chased.append(trigger_fact.fact_title) or find_chain_matches(trigger_fact=trigger_fact)
+        )
+        engine.run()
+        assert [f.fact_title for f in engine.working_memory.facts] == ['a', 'x', 'leaf']
+        assert chased == ['x', 'x']
+
+    def test_chain_depth_is_not_bounded_by_recursion_limit(self):
+        depth = 1500
+        rule = Rule(
+            rule_name='count_up',
+            priority=100,
+            antecedents=[Fact(fact_title='step', n='?n', more=True), Fact(fact_title='limit', depth='?depth')],
+            consequent=Fact(fact_title='step', n='?next', more='?more'),
+            action_fn=_count_up,
+        )
+        engine = _make_engine(
+            wm_facts=[Fact(fact_title='step', n=0, more=True), Fact(fact_title='limit', depth=depth)],
+            kb_rules=[rule],
+        )
+        engine.run()
+        steps = [f.attributes['n'] for f in engine.working_memory.facts if f.fact_title == 'step']
+        assert steps == list(range(depth + 1))
+
+
+# ── short-circuit matching ───────────────────────────────────────────
+
+class TestShortCircuit:
+    def test_lower_priority_rules_are_not_attempted(self):
+        rules = [
+            Rule(rule_name='low', priority=10, antecedents=[Fact(fact_title='item', name='?n')], consequent=None),
+            Rule(rule_name='high', priority=100, antecedents=[Fact(fact_title='item', name='?n')], consequent=None),
+        ]
+        trigger = Fact(fact_title='item', name='SALT')
+        engine = _make_engine(wm_facts=[trigger], kb_rules=rules)
+        engine.short_circuit = True
+        attempted = []
+        activations = engine._iter_rule_activations
+        engine._iter_rule_activations = lambda *, rule, anchor_idx, trigger_fact: (
+            attempted.append(rule.rule_name) or activations(rule=rule, anchor_idx=anchor_idx, trigger_fact=trigger_fact)
+        )
+
+        selected = engine._next_activation(trigger_fact=trigger, matches=None, fired=set())
+        assert selected[0].rule_name == 'high'
+        assert attempted == ['high']
+
+    @pytest.mark.parametrize('strategy', ['priority', 'specificity'])
+    def test_fires_in_the_same_order_as_full_matching(self, strategy):
+        rules = [
+            Rule(rule_name='start', priority=100, antecedents=[Fact(fact_title='a')], consequent=Fact(fact_title='x')),
+            Rule(rule_name='low', priority=10, antecedents=[Fact(fact_title='x')], consequent=Fact(fact_title='w')),
+            Rule(rule_name='high', priority=50, antecedents=[Fact(fact_title='x')], consequent=Fact(fact_title='y')),
+            Rule(rule_name='specific', priority=1, antecedents=[Fact(fact_title='x'), Fact(fact_title='a')], consequent=Fact(fact_title='s')),
+            Rule(rule_name='deep', priority=100, antecedents=[Fact(fact_title='y')], consequent=Fact(fact_title='z')),
+        ]
+        titles = []
+        for short_circuit in (False, True):
+            engine = _make_engine(wm_facts=[Fact(fact_title='a')], kb_rules=rules)
+            engine.conflict_resolution_strategy = strategy
+            engine.short_circuit = short_circuit
+            engine.run()
+            titles.append([f.fact_title for f in engine.working_memory.facts])
+        assert titles[0] == titles[1]
@@ -0,0 +1,205 @@
+import json
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from batch.classes.BatchJob import BatchJob
+from batch.runner import run_job, build_knowledge_base
+from recipes.chocolate_chip_cookies import chocolate_chip_cookies_recipe
+from service.server import RecipeService, serve_socket
+from service.client import ServiceClient
+from service.loadgen import percentile, run_load
+
+
+def _run(coro_fn, **service_kwargs):
+    """Run coro_fn(service) on a fresh loop with an in-process thread executor."""
+    async def main():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            service = RecipeService(executor=executor, **service_kwargs)
+            return await coro_fn(service)
+    return asyncio.run(main())
+
+
+# ── RecipeService.handle_request ─────────────────────────────────────
+
+class TestHandleRequest:
+    def test_scale_request(self):
+        response = _run(lambda s: s.handle_request(request={'id': 7, 'op': 'scale', 'scaling_factor': 2}))
+        expected = run_job(
+            job=BatchJob(job_id=7, recipe=chocolate_chip_cookies_recipe, scaling_factor=2),
+            kb=build_knowledge_base(),
+        )
+        assert response['id'] == 7
+        assert response['ok'] is True
+        assert response['result'] == expected
+
+    def test_plan_request_uses_kitchen_fields(self):
+        response = _run(lambda s: s.handle_request(request={'id': 1, 'op': 'plan', 'scaling_factor': 2, 'num_ovens': 0}))
+        assert response['ok'] is True
+        assert response['result']['success'] is False
+        assert response['result']['error'] == "OVEN could not be resolved"
+
+    @pytest.mark.parametrize("request_, error", [
+        ({'id': 1, 'op': 'bake', 'scaling_factor': 2}, "unknown op: 'bake'"),
+        ({'id': 1, 'op': 'scale', 'recipe': 'bread', 'scaling_factor': 2}, "unknown recipe: 'bread'"),
+        ({'id': 1, 'op': 'scale', 'recipe': {'name': 'bread'}, 'scaling_factor': 2}, "recipe must be a recipe name"),
+        ({'id': 1, 'op': 'scale', 'scaling_factor': -1}, "scaling_factor must be a positive number"),
+        ({'id': 1, 'op': 'scale', 'scaling_factor': 2, 'deadline_ms': 'abc'}, "deadline_ms must be a positive number"),
+        ({'id': 1, 'op': 'scale', 'scaling_factor': 2, 'deadline_ms': 0}, "deadline_ms must be a positive number"),
+        ({'id': 1, 'op': 'scale', 'scaling_factor': 2, 'deadline_ms': True}, "deadline_ms must be a positive number"),
+        ({'id': 1, 'op': 'plan', 'scaling_factor': 2, 'planning_conflict_resolution': 'fifo'},
+         "unknown planning_conflict_resolution: 'fifo'"),
+        ([1, 2], "request must be a JSON object"),
+    ])
+    def test_bad_requests_rejected(self, request_, error):
+        response = _run(lambda s: s.handle_request(request=request_))
+        assert response['ok'] is False
+        assert response['error'] == error
+        assert response['result'] is None
+
+    def test_deadline_exceeded(self):
+        release = threading.Event()
+
+        async def scenario(service):
+            # occupy the only slot so the second request's deadline expires while queued
+            blocker = asyncio.get_running_loop().run_in_executor(service.executor, release.wait)
+            await service._slots.acquire()
+            try:
+                return await service.handle_request(request={'id': 2, 'op': 'scale', 'scaling_factor': 2, 'deadline_ms': 20})
+            finally:
+                service._slots.release()
+                release.set()
+                await blocker
+
+        response = _run(scenario, max_concurrency=1)
+        assert response['ok'] is False
+        assert response['error'] == 'deadline exceeded'
+
+    def test_overloaded_when_queue_full(self):
+        async def scenario(service):
+            await service._slots.acquire()
+            try:
+                return await service.handle_request(request={'id': 3, 'op': 'scale', 'scaling_factor': 2})
+            finally:
+                service._slots.release()
+
+        response = _run(scenario, max_concurrency=1, max_queue=0)
+        assert response['error'] == 'overloaded'
+
+    def test_abandoned_job_holds_its_slot(self, monkeypatch):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_job(job):
+            started.set()
+            release.wait()
+            return {'job_id': job.job_id}
+
+        monkeypatch.setattr('service.server.run_job_in_worker', slow_job)
+
+        async def scenario(service):
+            first = await service.handle_request(request={'id': 1, 'op': 'scale', 'scaling_factor': 2, 'deadline_ms': 20})
+            assert started.is_set()
+            # The abandoned job is still running on its worker, so there is no free slot for another
+            assert service._slots.locked()
+            overloaded = await service.handle_request(request={'id': 2, 'op': 'scale', 'scaling_factor': 2})
+
+            release.set()
+            while service._slots.locked():
+                await asyncio.sleep(0.01)
+            served = await service.handle_request(request={'id': 3, 'op': 'scale', 'scaling_factor': 2})
+            return first, overloaded, served
+
+        first, overloaded, served = _run(scenario, max_concurrency=1, max_queue=0)
+        assert first['error'] == 'deadline exceeded'
+        assert overloaded['error'] == 'overloaded'
+        assert served['ok'] is True and served['result'] == {'job_id': 3}
+
+    def test_null_deadline_falls_back_to_default(self, monkeypatch):
+        release = threading.Event()
+
+        def slow_job(job):
+            release.wait()
+            return {'job_id': job.job_id}
+
+        monkeypatch.setattr('service.server.run_job_in_worker', slow_job)
+
+        async def scenario(service):
+            try:
+                return await service.handle_request(request={'id': 1, 'op': 'scale', 'scaling_factor': 2, 'deadline_ms': None})
+            finally:
+                release.set()
+
+        response = _run(scenario, default_deadline_ms=20)
+        assert response['error'] == 'deadline exceeded'
+
+    def test_job_failure_becomes_error_response(self, monkeypatch):
+        def broken_job(job):
+            raise BrokenProcessPool("worker died")
+
+        monkeypatch.setattr('service.server.run_job_in_worker', broken_job)
+
+        async def scenario(service):
+            failed = await service.handle_request(request={'id': 1, 'op': 'scale', 'scaling_factor': 2})
+            # The slot was released, so the service keeps serving
+            return failed, service._slots.locked()
+
+        failed, locked = _run(scenario, max_concurrency=1)
+        assert failed['id'] == 1
+        assert failed['ok'] is False
+        assert failed['error'] == "job failed: BrokenProcessPool('worker died')"
+        assert locked is False
+
+    def test_bad_field_types_keep_the_connection(self):
+        async def scenario(service):
+            return [json.loads(await service.handle_line(line=line)) for line in (
+                b'{"id": 1, "op": "scale", "scaling_factor": 2, "deadline_ms": "abc"}',
+                b'{"id": 2, "op": "scale", "recipe": {"name": "x"}, "scaling_factor": 2}',
+            )]
+
+        responses = _run(scenario)
+        assert [(r['id'], r['ok']) for r in responses] == [(1, False), (2, False)]
+
+    def test_invalid_json_line(self):
+        line = _run(lambda s: s.handle_line(line=b'{"id": 1,'))
+        response = json.loads(line)
+        assert response['ok'] is False
+        assert response['error'].startswith("invalid JSON")
+
+
+# ── socket round trip ────────────────────────────────────────────────
+
+class TestSocket:
+    def test_pipelined_requests_over_unix_socket(self, tmp_path):
+        path = str(tmp_path / "service.sock")
+
+        async def scenario(service):
+            server = asyncio.create_task(serve_socket(service=service, path=path))
+            while not (tmp_path / "service.sock").exists():
+                await asyncio.sleep(0.01)
+            client = await ServiceClient.connect(path=path)
+            try:
+                summary = await run_load(
+                    client=client, num_requests=6, concurrency=3,
+                    payloads=[{'op': 'scale', 'scaling_factor': 2}, {'op': 'plan', 'scaling_factor': 1}],
+                )
+            finally:
+                await client.close()
+                server.cancel()
+            return summary
+
+        summary = _run(scenario)
+        assert summary['requests'] == 6
+        assert summary['errors'] == 0
+        assert summary['p50_ms'] <= summary['p99_ms']
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values=values, pct=50) == 50
+    assert percentile(values=values, pct=99) == 99
+    assert percentile(values=[5], pct=99) == 5
+    assert percentile(values=[], pct=50) is None
@@ -0,0 +1,79 @@
+import pytest
+
+from classes.Fact import Fact
+from classes.Rule import Rule
+from classes.Agenda import Agenda
+
+
+def _rule(*, name, priority=0, num_antecedents=1):
+    return Rule(
+        rule_name=name,
+        priority=priority,
+        antecedents=[Fact(fact_title=f'a{i}') for i in range(num_antecedents)],
+        consequent=None,
+    )
+
+
+def _matched(*fact_ids):
+    facts = []
+    for fact_id in fact_ids:
+        fact = Fact(fact_title='f')
+        fact.set_fact_id(fact_id=fact_id)
+        facts.append(fact)
+    return {'_matched_facts': facts}
+
+
+def _pop_order(agenda):
+    order = []
+    while agenda:
+        order.append(agenda.pop()[2])
+    return order
+
+
+class TestAgenda:
+    def test_priority_pops_highest_first_and_ties_in_insertion_order(self):
+        agenda = Agenda(strategy='priority')
+        agenda.push(rule=_rule(name='low', priority=10), bindings={}, fire_key='low')
+        agenda.push(rule=_rule(name='first_high', priority=50), bindings={}, fire_key='first_high')
+        agenda.push(rule=_rule(name='second_high', priority=50), bindings={}, fire_key='second_high')
+        assert _pop_order(agenda) == ['first_high', 'second_high', 'low']
+        assert agenda.pop() is None
+
+    def test_specificity_ignores_priority(self):
+        agenda = Agenda(strategy='specificity')
+        agenda.extend(activations=[
+            (_rule(name='few', priority=100, num_antecedents=1), {}, 'few'),
+            (_rule(name='many', priority=10, num_antecedents=3), {}, 'many'),
+        ])
+        assert _pop_order(agenda) == ['many', 'few']
+
+    def test_recency_prefers_the_newest_matched_fact(self):
+        agenda = Agenda(strategy='recency')
+        agenda.extend(activations=[
+            (_rule(name='old'), _matched(3, 1), 'old'),
+            (_rule(name='new'), _matched(2, 5), 'new'),
+            (_rule(name='reference_only'), _matched(None), 'reference_only'),
+        ])
+        assert _pop_order(agenda) == ['new', 'old', 'reference_only']
+
+    def test_lex_compares_time_tags_newest_first_then_specificity(self):
+        agenda = Agenda(strategy='lex')
+        agenda.extend(activations=[
+            (_rule(name='prefix'), _matched(7, 4), 'prefix'),
+            (_rule(name='longer'), _matched(4, 7, 2), 'longer'),
+            (_rule(name='older_second'), _matched(7, 3, 6), 'older_second'),
+            (_rule(name='specific', num_antecedents=2), _matched(7, 4), 'specific'),
+        ])
+        assert _pop_order(agenda) == ['older_second', 'longer', 'specific', 'prefix']
+
+    def test_mea_ranks_by_the_first_matched_fact_first(self):
+        agenda = Agenda(strategy='mea')
+        agenda.extend(activations=[
+            (_rule(name='newest_overall'), _matched(2, 9), 'newest_overall'),
+            (_rule(name='newest_first'), _matched(5, 1), 'newest_first'),
+        ])
+        assert _pop_order(agenda) == ['newest_first', 'newest_overall']
+
+    def test_unknown_strategy(self):
+        with pytest.raises(ValueError, match="unknown conflict resolution strategy: fifo"):
+            Agenda(strategy='fifo')
@@ -0,0 +1,44 @@
+from classes.Fact import Fact
+from classes.BindingEnvironment import BindingEnvironment
+
+
+class TestBindingEnvironment:
+    def test_unify_binds_and_undo_rolls_back_to_mark(self):
+        env = BindingEnvironment(bindings={'?a': 1})
+        mark = env.mark()
+        fact = Fact(fact_title='pair', x=1, y=2)
+
+        assert env.match_fact(pattern=Fact(fact_title='pair', x='?a', y='?b'), fact=fact) is True
+        assert env.snapshot() == {'?a': 1, '?b': 2, '_matched_facts': [fact]}
+
+        env.undo(mark=mark)
+        assert env.snapshot() == {'?a': 1}
+
+    def test_failed_unify_leaves_nothing_bound(self):
+        env = BindingEnvironment(bindings={})
+        pattern = Fact(fact_title='pair', x='?v', y='?w', z='?v')
+        assert env.unify(pattern=pattern, fact=Fact(fact_title='pair', x=1, y=2, z=3)) is False
+        assert env.values == {}
+        assert env.trail == []
+
+    def test_can_unify_binds_nothing(self):
+        env = BindingEnvironment(bindings={'?n': 'SALT'})
+        pattern = Fact(fact_title='classified', name='?n', cls='?c', other='?c')
+        assert env.can_unify(pattern=pattern, fact=Fact(fact_title='classified', name='SALT', cls=None, other=None))
+        assert not env.can_unify(pattern=pattern, fact=Fact(fact_title='classified', name='SALT', cls=1, other=2))
+        assert not env.can_unify(pattern=pattern, fact=Fact(fact_title='classified', name='SUGAR', cls=1, other=1))
+        assert env.values == {'?n': 'SALT'}
+
+    def test_snapshots_are_independent_of_later_backtracking(self):
+        trigger = Fact(fact_title='request')
+        env = BindingEnvironment(bindings={'_matched_facts': [trigger]})
+        mark = env.mark()
+        first = Fact(fact_title='item', name='A')
+
+        env.match_fact(pattern=Fact(fact_title='item', name='?n'), fact=first)
+        snapshot = env.snapshot()
+        env.undo(mark=mark)
+        env.match_fact(pattern=Fact(fact_title='item', name='?n'), fact=Fact(fact_title='item', name='B'))
+
+        assert snapshot == {'?n': 'A', '_matched_facts': [trigger, first]}
+        assert env.snapshot()['?n'] == 'B'
@@ -199,6 +199,51 @@ class TestExplanationFacility:
         assert "antecedents:" in captured.out
         assert "[INPUT]" in captured.out
 
+    def test_print_derivation_shares_subtrees(self, capsys):
+        """A derived fact reached along several paths is printed once, then referred back to."""
+        wm = WorkingMemory()
+        kb = KnowledgeBase()
+        fact = Fact(fact_title='level', n=0)
+        wm.add_fact(fact=fact, silent=True)
+        # Every level derives from the one below twice over: 2**30 paths to the bottom
+        for n in range(1, 31):
+            derived = Fact(fact_title='level', n=n)
+            derived.derivation = {'rule_name': 'double', 'antecedent_facts': [fact, fact]}
+            wm.add_fact(fact=derived, silent=True)
+            fact = derived
+
+        ef = ExplanationFacility(wm=wm, kb=kb, label="Test")
+        ef._print_derivation(fact=fact)
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 30 * 4 + 1
+        assert lines[-1] == "\t+-- Fact #30 ('level', n=29)  [derived by rule: 'double', see above]"
+        assert lines.count("\t" * 30 + "+-- Fact #1 ('level', n=0)  [INPUT]") == 2
+
+    def test_find_fact_sees_facts_added_after_a_lookup(self):
+        wm = WorkingMemory()
+        first = Fact(fact_title='input', value=1)
+        wm.add_fact(fact=first, silent=True)
+        ef = ExplanationFacility(wm=wm, kb=KnowledgeBase(), label="Test")
+        assert ef._find_fact(fact_id=first.fact_id) is first
+        assert ef._find_fact(fact_id=2) is None
+
+        second = Fact(fact_title='input', value=2)
+        wm.add_fact(fact=second, silent=True)
+        assert ef._find_fact(fact_id=2) is second
+        wm.remove_fact(fact=first, silent=True)
+        assert ef._find_fact(fact_id=first.fact_id) is None
+
+    def test_classify_leaf_unhashable_reference(self):
+        kb = KnowledgeBase()
+        kb.add_reference_facts(facts=[Fact(fact_title='units', names=['CUP', 'TBSP'])])
+        ef = ExplanationFacility(wm=WorkingMemory(), kb=kb, label="Test")
+        assert ef._classify_leaf(fact=Fact(fact_title='units', names=['CUP', 'TBSP'])) == "REFERENCE"
+        assert ef._classify_leaf(fact=Fact(fact_title='units', names=['CUP'])) == "INPUT"
+
+        # Reference facts added after the first lookup are picked up
+        kb.add_reference_facts(facts=[Fact(fact_title='units', names=['CUP'])])
+        assert ef._classify_leaf(fact=Fact(fact_title='units', names=['CUP'])) == "REFERENCE"
+
     def test_repl_continue(self, monkeypatch, capsys):
         """Typing 'c' should exit the REPL."""
         wm = WorkingMemory()
@@ -252,3 +297,39 @@ class TestExplanationFacility:
         ef.run_repl()
         captured = capsys.readouterr()
         assert "No fact with ID #999" in captured.out
+
+
+# ── Consumed (transient) facts ───────────────────────────────────────
+
+class TestConsumedFacts:
+    def _fire_consuming_rule(self):
+        request = Fact(fact_title='lookup_request', name='SALT')
+        rule = Rule(
+            rule_name='answer_lookup',
+            antecedents=[Fact(fact_title='lookup_request', name='?n')],
+            consequent=Fact(fact_title='lookup_answer', name='?n'),
+            consumes=['lookup_request'],
+        )
+        engine = _make_engine(wm_facts=[request], kb_rules=[rule])
+        engine._forward_chain(trigger_fact=request)
+        return engine, request
+
+    def test_consumed_fact_retracted_but_kept_in_derivation(self):
+        engine, request = self._fire_consuming_rule()
+        wm = engine.working_memory
+        assert [f.fact_title for f in wm.facts] == ['lookup_answer']
+        assert wm.consumed_facts == {request.fact_id: request}
+        assert wm.facts[0].derivation['antecedent_facts'] == [request]
+
+    def test_consumed_trigger_matches_nothing(self):
+        engine, request = self._fire_consuming_rule()
+        assert engine._find_matching_rules(trigger_fact=request) == []
+
+    def test_repl_explains_consumed_fact(self, monkeypatch, capsys):
+        engine, request = self._fire_consuming_rule()
+        inputs = iter([str(request.fact_id), 'c'])
+        monkeypatch.setattr('builtins.input', lambda prompt: next(inputs))
+        ef = ExplanationFacility(wm=engine.working_memory, kb=engine.knowledge_base, label="Test")
+        ef.run_repl()
+        captured = capsys.readouterr()
+        assert f"Fact #{request.fact_id} ('lookup_request', name=SALT)  [INPUT]" in captured.out
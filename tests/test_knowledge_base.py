@@ -0,0 +1,92 @@
+import threading
+
+from classes.Fact import Fact
+from classes.NegatedFact import NegatedFact
+from classes.Rule import Rule
+from classes.KnowledgeBase import KnowledgeBase
+from classes.WorkingMemory import WorkingMemory
+from scaling.engine import ScalingEngine
+
+
+def _rule(name, *antecedents):
+    return Rule(rule_name=name, antecedents=list(antecedents), consequent=None)
+
+
+class TestRuleIndex:
+    def test_rules_indexed_by_first_positive_antecedent_in_kb_order(self):
+        kb = KnowledgeBase()
+        kb.add_rules(rules=[
+            _rule('a', Fact(fact_title='request'), Fact(fact_title='EQUIPMENT')),
+            _rule('guarded', NegatedFact(fact_title='done'), Fact(fact_title='request')),
+        ])
+        kb.add_rules(rules=[_rule('b', Fact(fact_title='EQUIPMENT'), Fact(fact_title='request'))])
+
+        assert [(r.rule_name, idx) for r, idx in kb.rules_for_trigger(fact_title='request')] == [('a', 0), ('guarded', 1)]
+        assert [(r.rule_name, idx) for r, idx in kb.rules_for_trigger(fact_title='EQUIPMENT')] == [('b', 0)]
+        assert list(kb.rules_for_trigger(fact_title='done')) == []
+
+    def test_rules_without_positive_antecedents_are_never_indexed(self):
+        kb = KnowledgeBase()
+        kb.add_rules(rules=[_rule('only_negated', NegatedFact(fact_title='done')), _rule('empty')])
+        assert kb._rules_by_anchor_title == {}
+        assert len(kb.rules) == 2
+
+
+class TestFocusStack:
+    def _kb(self):
+        kb = KnowledgeBase()
+        kb.add_rules(rules=[_rule('main_rule', Fact(fact_title='request'))])
+        kb.add_rules(rules=[_rule('scaling_rule', Fact(fact_title='request'))], module='SCALING')
+        kb.add_rules(rules=[_rule('planning_rule', Fact(fact_title='request'))], module='PLANNING')
+        kb.add_reference_facts(facts=[Fact(fact_title='shared')])
+        kb.add_reference_facts(facts=[Fact(fact_title='conversion')], module='SCALING')
+        kb.add_reference_facts(facts=[Fact(fact_title='transfer')], module='PLANNING')
+        return kb
+
+    def _visible(self, kb):
+        return ([r.rule_name for r, _ in kb.rules_for_trigger(fact_title='request')],
+                [f.fact_title for f in kb.visible_reference_facts()])
+
+    def test_only_main_is_visible_without_focus(self):
+        kb = self._kb()
+        assert kb.modules == ['MAIN', 'SCALING', 'PLANNING']
+        assert self._visible(kb) == (['main_rule'], ['shared'])
+        assert len(kb.rules) == 3 and len(kb.reference_facts) == 3
+
+    def test_focus_shows_module_until_popped(self):
+        kb = self._kb()
+        kb.focus(module='PLANNING')
+        assert self._visible(kb) == (['main_rule', 'planning_rule'], ['shared', 'transfer'])
+        kb.focus(module='SCALING')
+        assert self._visible(kb) == (['main_rule', 'scaling_rule', 'planning_rule'], ['shared', 'conversion', 'transfer'])
+
+        assert kb.pop_focus() == 'SCALING'
+        assert self._visible(kb) == (['main_rule', 'planning_rule'], ['shared', 'transfer'])
+        kb.pop_focus()
+        assert self._visible(kb) == (['main_rule'], ['shared'])
+
+    def test_focus_stack_is_per_thread(self):
+        kb = self._kb()
+        kb.focus(module='SCALING')
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(self._visible(kb)))
+        thread.start()
+        thread.join()
+        assert seen == [(['main_rule'], ['shared'])]
+
+    def test_engine_focuses_its_module_while_running(self):
+        kb = KnowledgeBase()
+        seen = []
+
+        def record(*, bindings, wm, kb):
+            seen.append(list(kb.focus_stack))
+            return bindings
+
+        kb.add_rules(rules=[Rule(rule_name='scaling_rule', antecedents=[Fact(fact_title='request')],
+                                 consequent=None, action_fn=record)], module=ScalingEngine.MODULE)
+        wm = WorkingMemory(verbose=False)
+        wm.add_fact(fact=Fact(fact_title='request'))
+        ScalingEngine(wm=wm, kb=kb, verbose=False).run()
+
+        assert seen == [['SCALING']]
+        assert kb.focus_stack == []
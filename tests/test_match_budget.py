@@ -0,0 +1,103 @@
+import pytest
+
+from classes.Fact import Fact
+from classes.Rule import Rule
+from classes.KnowledgeBase import KnowledgeBase
+from classes.WorkingMemory import WorkingMemory
+from classes.MatchBudget import MatchBudget, BudgetExceeded, BudgetWarning, parse_limits
+from batch.classes.BatchJob import BatchJob
+from batch.runner import build_knowledge_base, run_job
+from recipes.chocolate_chip_cookies import chocolate_chip_cookies_recipe
+from scaling.engine import ScalingEngine
+import scaling.main
+import planning.main
+
+
+def _cartesian_engine(*, budget, size=20):
+    """A rule whose left and right antecedents share no variables: size x size activations."""
+    wm = WorkingMemory(verbose=False)
+    wm.add_fact(fact=Fact(fact_title='start'), silent=True)
+    for idx in range(size):
+        wm.add_fact(fact=Fact(fact_title='left', n=idx), silent=True)
+        wm.add_fact(fact=Fact(fact_title='right', m=idx), silent=True)
+    kb = KnowledgeBase()
+    kb.add_rules(rules=[
+        Rule(rule_name='pair_everything', priority=100, antecedents=[
+            Fact(fact_title='start'),
+            Fact(fact_title='left', n='?n'),
+            Fact(fact_title='right', m='?m'),
+        ], consequent=None),
+    ])
+    return ScalingEngine(wm=wm, kb=kb, verbose=False, budget=budget)
+
+
+class TestMatchBudget:
+    def test_hard_limit_names_the_rule_and_antecedent(self):
+        engine = _cartesian_engine(budget=MatchBudget(hard={'partial_matches_per_rule': 100}))
+        with pytest.raises(BudgetExceeded) as excinfo:
+            engine.run()
+        message = str(excinfo.value)
+        assert "rule 'pair_everything' bound 101 partial matches (limit 100)" in message
+        assert "trigger Fact #1 ('start')" in message
+        assert "antecedent 2 Fact ('right', m=?m)" in message
+
+    @pytest.mark.parametrize('limit, value', [
+        ('activations_per_rule', 50),
+        ('activations_per_cycle', 50),
+        ('partial_matches_per_cycle', 50),
+    ])
+    def test_every_match_limit_aborts(self, limit, value):
+        engine = _cartesian_engine(budget=MatchBudget(hard={limit: value}))
+        with pytest.raises(BudgetExceeded, match=f"limit {value}"):
+            engine.run()
+
+    def test_soft_limit_warns_once_and_finishes(self):
+        budget = MatchBudget(soft={'activations_per_rule': 10})
+        engine = _cartesian_engine(budget=budget)
+        with pytest.warns(BudgetWarning, match="produced 11 activations"):
+            engine.run()
+        assert len(budget.warnings) == 1
+        # Every activation still fired
+        assert engine.cycle == 41
+
+    def test_unbudgeted_engine_is_untouched(self):
+        engine = _cartesian_engine(budget=None)
+        assert '_fire_rule' not in vars(engine)
+
+    def test_planning_run_fails_instead_of_raising(self):
+        kb = build_knowledge_base()
+        wm = WorkingMemory(verbose=False)
+        wm.add_fact(fact=Fact(fact_title='target_recipe_scale_factor', target_recipe_scale_factor=2), silent=True)
+        scaling.main.configure_working_memory(wm=wm, recipe=chocolate_chip_cookies_recipe)
+        scaling.main.run_engine(wm=wm, kb=kb, verbose=False)
+        planning.main.configure_equipment(wm=wm, num_ovens=4, num_bowls=1, num_baking_sheets=5)
+        success, error = planning.main.run_engine(wm=wm, kb=kb, recipe=chocolate_chip_cookies_recipe, verbose=False,
+                                                  budget=MatchBudget(hard={'firings': 20, 'wall_time': 60}))
+        assert success is False
+        assert error.startswith("budget exceeded: 21 rule firings (limit 20)")
+        # The planning module's focus was popped on the way out
+        assert kb.visible_modules() == {'MAIN'}
+
+    def test_batch_jobs_report_budgets(self):
+        kb = build_knowledge_base()
+        failed = run_job(job=BatchJob(job_id=1, recipe=chocolate_chip_cookies_recipe, scaling_factor=2,
+                                      hard_budget={'firings': 5}), kb=kb)
+        assert failed['success'] is False
+        assert failed['error'].startswith("budget exceeded: 6 rule firings")
+
+        warned = run_job(job=BatchJob(job_id=2, recipe=chocolate_chip_cookies_recipe, scaling_factor=2, run_planning=True,
+                                      soft_budget={'partial_matches_per_rule': 5}), kb=kb)
+        assert warned['success'] is True
+        assert warned['budget_warnings'] and 'process_next_ingredient' in warned['budget_warnings'][0]
+
+    @pytest.mark.parametrize('specs, error', [
+        (['firings'], "budget must look like limit=number"),
+        (['firings=lots'], "budget must look like limit=number"),
+        (['explosions=1'], "unknown budget limit: explosions"),
+    ])
+    def test_parse_limits_rejects_bad_specs(self, specs, error):
+        with pytest.raises(ValueError, match=error):
+            parse_limits(specs=specs)
+
+    def test_parse_limits(self):
+        assert parse_limits(specs=['firings=500', 'wall_time=2.5']) == {'firings': 500, 'wall_time': 2.5}
@@ -0,0 +1,66 @@
+import json
+
+from classes.Fact import Fact
+from classes.WorkingMemory import WorkingMemory
+from classes.MemoryTracker import MemoryTracker
+from batch.classes.BatchJob import BatchJob
+from batch.runner import build_knowledge_base, run_job
+from recipes.chocolate_chip_cookies import chocolate_chip_cookies_recipe
+import scaling.main
+import planning.main
+
+
+def _run(*, memory_tracker):
+    kb = build_knowledge_base()
+    wm = WorkingMemory(verbose=False)
+    wm.add_fact(fact=Fact(fact_title='target_recipe_scale_factor', target_recipe_scale_factor=2), silent=True)
+    scaling.main.configure_working_memory(wm=wm, recipe=chocolate_chip_cookies_recipe)
+    scaling.main.run_engine(wm=wm, kb=kb, verbose=False, memory_tracker=memory_tracker)
+    planning.main.configure_equipment(wm=wm, num_ovens=4, num_bowls=1, num_baking_sheets=5)
+    success, _ = planning.main.run_engine(wm=wm, kb=kb, recipe=chocolate_chip_cookies_recipe, verbose=False,
+                                          memory_tracker=memory_tracker)
+    assert success is True
+    return wm
+
+
+class TestMemoryTracker:
+    def test_phases_and_per_cycle_growth(self):
+        memory_tracker = MemoryTracker()
+        wm = _run(memory_tracker=memory_tracker)
+
+        assert [phase['phase'] for phase in memory_tracker.phases] == [
+            'ScalingEngine start', 'ScalingEngine end', 'PlanningEngine start', 'PlanningEngine end',
+        ]
+        assert memory_tracker.phases[-1]['facts'] == len(wm.facts)
+        assert memory_tracker.phases[-1]['by_title'] == wm.memory_report()
+        assert 'traced_kb' not in memory_tracker.phases[-1]
+
+        growth = memory_tracker.growth()
+        # Each scaling cycle after the first derives one ingredient's four facts
+        assert growth[2] == {
+            'engine': 'ScalingEngine', 'cycle': 3, 'facts': 14, 'consumed': 0,
+            'growth': {'classified_ingredient': 1, 'ingredient_scaling_multiplier': 1,
+                       'optimally_scaled_ingredient': 1, 'scaled_ingredient': 1},
+        }
+        assert growth[-1]['engine'] == 'PlanningEngine' and growth[-1]['cycle'] == 'end'
+        assert sum(sum(row['growth'].values()) for row in growth) == len(wm.facts)
+        assert memory_tracker.report().splitlines()[0].startswith('fact_title')
+
+    def test_tracemalloc_snapshots(self):
+        memory_tracker = MemoryTracker(tracemalloc_snapshots=True, top_allocations=3)
+        _run(memory_tracker=memory_tracker)
+
+        end = memory_tracker.phases[-1]
+        assert end['peak_kb'] >= end['traced_kb'] > 0
+        assert len(end['top_allocations']) == 3
+        assert not any('MemoryTracker.py' in allocation['location'] for allocation in end['top_allocations'])
+
+    def test_batch_results_carry_the_summary(self):
+        job = BatchJob(job_id=1, recipe=chocolate_chip_cookies_recipe, scaling_factor=2, run_planning=True,
+                       memory_report=True)
+        result = run_job(job=job, kb=build_knowledge_base())
+        memory = json.loads(json.dumps(result['memory']))
+        assert memory['phases'][-1]['facts'] == result['num_facts']
+        assert memory['by_title']['EQUIPMENT']['count'] == 12
+        assert 'memory' not in run_job(job=BatchJob(job_id=1, recipe=chocolate_chip_cookies_recipe, scaling_factor=2),
+                                       kb=build_knowledge_base())
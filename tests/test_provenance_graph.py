@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+from classes.Fact import Fact
+from classes.Rule import Rule
+from classes.KnowledgeBase import KnowledgeBase
+from classes.WorkingMemory import WorkingMemory
+from classes.ProvenanceGraph import ProvenanceGraph, read_binary
+from batch.classes.BatchJob import BatchJob
+from batch.runner import build_knowledge_base, run_job
+from recipes.chocolate_chip_cookies import chocolate_chip_cookies_recipe
+from scaling.engine import ScalingEngine
+
+
+def _run():
+    """A request consumed by a rule that joins a reference fact, retracts an input in its
+    action and asserts a side-effect fact alongside its consequent."""
+    wm = WorkingMemory(verbose=False)
+    kb = KnowledgeBase()
+    kb.add_reference_facts(facts=[Fact(fact_title='classification', name='SALT', category='MINERAL')])
+    wm.add_fact(fact=Fact(fact_title='stale', name='SALT'), silent=True)
+    wm.add_fact(fact=Fact(fact_title='request', name='SALT', units=['CUP', 'TBSP']), silent=True)
+
+    def action(*, bindings, wm, kb):
+        for fact in [f for f in wm.facts if f.fact_title == 'stale']:
+            wm.remove_fact(fact=fact, silent=True)
+        wm.add_fact(fact=Fact(fact_title='audit', name=bindings['?n']), silent=True)
+        return bindings
+
+    kb.add_rules(rules=[
+        Rule(rule_name='classify', antecedents=[
+            Fact(fact_title='request', name='?n'),
+            Fact(fact_title='classification', name='?n', category='?c'),
+        ], consequent=Fact(fact_title='classified', name='?n', category='?c'), action_fn=action,
+            consumes=['request']),
+    ])
+    ScalingEngine(wm=wm, kb=kb, verbose=False).run()
+    return wm, kb
+
+
+class TestProvenanceGraph:
+    def test_nodes_and_edges(self):
+        wm, kb = _run()
+        graph = ProvenanceGraph(wm=wm, kb=kb)
+
+        nodes = {node['id']: node for node in graph.nodes}
+        assert [(node['id'], node['title'], node['kind'], node['status']) for node in graph.nodes] == [
+            (2, 'request', 'INPUT', 'consumed'),
+            (3, 'audit', 'DERIVED', 'live'),
+            (4, 'classified', 'DERIVED', 'live'),
+            (-1, 'classification', 'REFERENCE', 'reference'),
+        ]
+        # The retracted input is never an antecedent, so it isn't reachable from any fact
+        assert 1 not in nodes
+        assert nodes[2]['attributes'] == {'name': 'SALT', 'units': ['CUP', 'TBSP']}
+        assert nodes[4]['derived_by'] == 'classify'
+
+        # One firing: both derived facts share it
+        assert graph.edges == [
+            {'source': 2, 'target': 3, 'rule': 'classify', 'firing': 0},
+            {'source': -1, 'target': 3, 'rule': 'classify', 'firing': 0},
+            {'source': 2, 'target': 4, 'rule': 'classify', 'firing': 0},
+            {'source': -1, 'target': 4, 'rule': 'classify', 'firing': 0},
+        ]
+
+    def test_shared_subtrees_are_visited_once(self):
+        wm = WorkingMemory(verbose=False)
+        fact = Fact(fact_title='level', n=0)
+        wm.add_fact(fact=fact, silent=True)
+        retracted = fact
+        for n in range(1, 31):
+            derived = Fact(fact_title='level', n=n)
+            derived.derivation = {'rule_name': 'double', 'antecedent_facts': [fact, fact]}
+            wm.add_fact(fact=derived, silent=True)
+            fact = derived
+        wm.remove_fact(fact=retracted, silent=True)
+
+        graph = ProvenanceGraph(wm=wm, kb=KnowledgeBase())
+        assert len(graph.nodes) == 31
+        assert len(graph.edges) == 60
+        assert graph.nodes[-1] == {'id': 1, 'title': 'level', 'kind': 'INPUT', 'status': 'retracted',
+                                   'attributes': {'n': 0}, 'derived_by': None}
+
+    def test_formats(self, tmp_path):
+        wm, kb = _run()
+        graph = ProvenanceGraph(wm=wm, kb=kb)
+
+        graph.write(path=str(tmp_path / 'run.json'))
+        assert json.loads((tmp_path / 'run.json').read_text()) == graph.to_dict()
+
+        graph.write(path=str(tmp_path / 'run.prov'))
+        assert read_binary(path=str(tmp_path / 'run.prov')) == graph.to_dict()
+
+        graph.write(path=str(tmp_path / 'run.gv'))
+        dot = (tmp_path / 'run.gv').read_text()
+        assert dot.startswith('digraph provenance {')
+        assert 'f2 [label="#2 request\\nname=\\"SALT\\"\\nunits=[\\"CUP\\", \\"TBSP\\"]", shape=ellipse, style=dashed];' in dot
+        assert 'r1 -> f4 [label="classify"];' in dot
+
+        graph.write(path=str(tmp_path / 'run.txt'), format='dot')
+        assert (tmp_path / 'run.txt').read_text() == dot
+        with pytest.raises(ValueError, match="unknown provenance format: svg"):
+            graph.write(path=str(tmp_path / 'run.svg'), format='svg')
+
+    def test_read_binary_rejects_other_files(self, tmp_path):
+        path = tmp_path / 'run.json'
+        path.write_text('{"nodes": [], "edges": []}')
+        with pytest.raises(ValueError, match="not a provenance file"):
+            read_binary(path=str(path))
+
+    def test_batch_results_carry_the_graph(self):
+        result = run_job(job=BatchJob(job_id=1, recipe=chocolate_chip_cookies_recipe, scaling_factor=2,
+                                      run_planning=True, provenance=True), kb=build_knowledge_base())
+        provenance = result['provenance']
+        json.dumps(provenance)
+
+        node_ids = {node['id'] for node in provenance['nodes']}
+        assert len(node_ids) == len(provenance['nodes'])
+        assert all(edge['source'] in node_ids and edge['target'] in node_ids for edge in provenance['edges'])
+        titles = {node['title'] for node in provenance['nodes'] if node['kind'] == 'REFERENCE'}
+        assert 'unit_conversion' in titles
@@ -0,0 +1,70 @@
+from classes.Fact import Fact
+from classes.NegatedFact import NegatedFact
+from classes.Rule import Rule
+from classes.KnowledgeBase import KnowledgeBase
+from classes.WorkingMemory import WorkingMemory
+from classes.RuleFlameGraph import RuleFlameGraph
+from batch.runner import build_knowledge_base
+from recipes.chocolate_chip_cookies import chocolate_chip_cookies_recipe
+from scaling.engine import ScalingEngine
+import scaling.main
+import planning.main
+
+
+def _run(*, flamegraph):
+    wm = WorkingMemory(verbose=False)
+    wm.add_fact(fact=Fact(fact_title='item', name='SALT'), silent=True)
+    kb = KnowledgeBase()
+    kb.add_rules(rules=[
+        Rule(rule_name='tag', priority=100, antecedents=[
+            Fact(fact_title='item', name='?n'),
+            NegatedFact(fact_title='tagged', name='?n'),
+        ], consequent=Fact(fact_title='tagged', name='?n')),
+        Rule(rule_name='label', priority=100, antecedents=[
+            Fact(fact_title='tagged', name='?n'),
+            NegatedFact(fact_title='labelled', name='?n'),
+        ], consequent=Fact(fact_title='labelled', name='?n')),
+    ])
+    engine = ScalingEngine(wm=wm, kb=kb, verbose=False, flamegraph=flamegraph)
+    engine.run()
+    return engine
+
+
+class TestRuleFlameGraph:
+    def test_chained_rules_stack_on_the_rule_that_derived_their_trigger(self):
+        flamegraph = RuleFlameGraph()
+        _run(flamegraph=flamegraph)
+
+        assert set(flamegraph.stacks) >= {
+            ('ScalingEngine',),
+            ('ScalingEngine', 'match:tag'),
+            ('ScalingEngine', 'tag'),
+            ('ScalingEngine', 'tag', 'match:label'),
+            ('ScalingEngine', 'tag', 'label'),
+        }
+        for line in flamegraph.folded():
+            stack, count = line.rsplit(' ', 1)
+            assert stack.startswith('ScalingEngine') and int(count) > 0
+
+    def test_engine_without_one_is_untouched(self):
+        engine = _run(flamegraph=None)
+        assert 'run' not in vars(engine)
+
+    def test_dispatch_rules_stack_the_rules_their_action_fires(self, tmp_path):
+        kb = build_knowledge_base()
+        wm = WorkingMemory(verbose=False)
+        wm.add_fact(fact=Fact(fact_title='target_recipe_scale_factor', target_recipe_scale_factor=2), silent=True)
+        flamegraph = RuleFlameGraph()
+        scaling.main.configure_working_memory(wm=wm, recipe=chocolate_chip_cookies_recipe)
+        scaling.main.run_engine(wm=wm, kb=kb, verbose=False, flamegraph=flamegraph)
+        planning.main.configure_equipment(wm=wm, num_ovens=4, num_bowls=1, num_baking_sheets=5)
+        success, _ = planning.main.run_engine(wm=wm, kb=kb, recipe=chocolate_chip_cookies_recipe, verbose=False,
+                                              flamegraph=flamegraph)
+        assert success is True
+
+        assert ('PlanningEngine', 'initialize_cook', 'place_sheet_for_cooking') in flamegraph.stacks
+        assert ('ScalingEngine', 'classify_known_ingredient', 'calculate_ingredient_scaling_multiplier') in flamegraph.stacks
+
+        path = tmp_path / 'rules.folded'
+        flamegraph.write(path=str(path))
+        assert path.read_text().splitlines() == flamegraph.folded()
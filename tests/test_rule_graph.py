@@ -0,0 +1,99 @@
+import pytest
+
+from classes.Fact import Fact
+from classes.NegatedFact import NegatedFact
+from classes.Rule import Rule
+from classes.KnowledgeBase import KnowledgeBase
+from classes.RuleGraph import RuleGraph
+from classes.WorkingMemory import WorkingMemory
+from scaling.engine import ScalingEngine
+import scaling.main
+import planning.main
+
+
+def _rule(name, consequent_title, *antecedents):
+    consequent = Fact(fact_title=consequent_title) if consequent_title else None
+    return Rule(rule_name=name, antecedents=list(antecedents), consequent=consequent)
+
+
+class TestRuleGraph:
+    def test_producers_consumers_and_triggers(self):
+        derive = _rule('derive', 'b', Fact(fact_title='a'), NegatedFact(fact_title='c'))
+        finish = _rule('finish', 'done', NegatedFact(fact_title='x'), Fact(fact_title='b'))
+        graph = RuleGraph(rules=[derive, finish])
+
+        assert graph.producers == {'b': [derive], 'done': [finish]}
+        assert graph.consumers == {'a': [derive], 'c': [derive], 'x': [finish], 'b': [finish]}
+        assert graph.can_trigger(fact_title='b')
+        assert not graph.can_trigger(fact_title='x')
+        assert not graph.can_trigger(fact_title='done')
+        assert graph.edges() == [(derive, finish, 'b')]
+
+    def test_strata_ignore_derive_once_guards(self):
+        first = _rule('first', 'b', Fact(fact_title='a'), NegatedFact(fact_title='b'))
+        fallback = _rule('fallback', 'b', Fact(fact_title='a'), NegatedFact(fact_title='b'))
+        second = _rule('second', 'c', Fact(fact_title='b'), NegatedFact(fact_title='c'))
+        graph = RuleGraph(rules=[second, first, fallback])
+        assert [[r.rule_name for r in stratum] for stratum in graph.strata()] == [['first', 'fallback'], ['second']]
+
+    def test_cyclic_rules_are_not_stratified(self):
+        graph = RuleGraph(rules=[
+            _rule('ping', 'pong', Fact(fact_title='ping')),
+            _rule('pong', 'ping', Fact(fact_title='pong')),
+            _rule('other', 'x', Fact(fact_title='y')),
+        ])
+        with pytest.raises(ValueError, match="rules are cyclic: ping, pong"):
+            graph.strata()
+
+    def test_scaling_rules_form_a_linear_chain(self):
+        kb = KnowledgeBase()
+        scaling.main.configure_knowledge_base(kb=kb)
+        kb.focus(module=ScalingEngine.MODULE)
+        strata = kb.rule_graph().strata()
+        kb.pop_focus()
+
+        assert [[r.rule_name for r in stratum] for stratum in strata] == [
+            ['classify_known_ingredient', 'classify_default_ingredient'],
+            ['calculate_ingredient_scaling_multiplier'],
+            ['scale_ingredient_amount'],
+            ['convert_scaled_ingredient_to_optimal_measurement_unit'],
+        ]
+        assert kb.rule_graph().rules == []
+
+    def test_scaling_strata_are_precomputed_and_survive_planning_rules(self):
+        kb = KnowledgeBase()
+        scaling.main.configure_knowledge_base(kb=kb)
+        kb.focus(module=ScalingEngine.MODULE)
+        graph = kb.rule_graph()
+        kb.pop_focus()
+        assert graph._strata is not None
+
+        planning.main.configure_knowledge_base(kb=kb)
+        kb.focus(module=ScalingEngine.MODULE)
+        assert kb.rule_graph() is graph
+        kb.pop_focus()
+
+        kb.add_rules(rules=[_rule('everywhere', 'x', Fact(fact_title='y'))])
+        kb.focus(module=ScalingEngine.MODULE)
+        assert kb.rule_graph() is not graph
+        kb.pop_focus()
+
+    def test_scaling_engine_reads_the_cached_strata(self):
+        kb = KnowledgeBase()
+        scaling.main.configure_knowledge_base(kb=kb)
+        engine = ScalingEngine(wm=WorkingMemory(verbose=False), kb=kb, verbose=False)
+        engine.run()
+        kb.focus(module=ScalingEngine.MODULE)
+        assert engine.strata is kb.rule_graph().strata()
+        kb.pop_focus()
+        assert len(engine.strata) == 4
+
+    def test_cyclic_scaling_rules_fail_at_configuration(self, monkeypatch):
+        monkeypatch.setattr(scaling.main, 'get_optimal_unit_conversion_rules', lambda: [
+            _rule('ping', 'pong', Fact(fact_title='ping')),
+            _rule('pong', 'ping', Fact(fact_title='pong')),
+        ])
+        kb = KnowledgeBase()
+        with pytest.raises(ValueError, match="rules are cyclic: ping, pong"):
+            scaling.main.configure_knowledge_base(kb=kb)
+        assert kb.focus_stack == []
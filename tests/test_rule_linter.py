@@ -0,0 +1,108 @@
+import pytest
+
+from classes.Fact import Fact
+from classes.NegatedFact import NegatedFact
+from classes.Rule import Rule
+from classes.RuleLinter import RuleLinter
+from classes.WorkingMemory import WorkingMemory
+from batch.runner import build_knowledge_base
+from recipes.chocolate_chip_cookies import chocolate_chip_cookies_recipe
+import scaling.main
+import planning.main
+
+# Known hazards in the shipped rules. The cross joins are against single facts (the scale
+# factor, one transfer plan and one mixed bowl per run) and the action-bound consequents sit
+# behind consumed or one-off request facts, so none is slow today; a new finding is.
+KNOWN_FINDINGS = {
+    ('calculate_ingredient_scaling_multiplier', 'cross_join'),
+    ('initialize_transfer', 'cross_join'),
+    ('allocate_next_sheet', 'cross_join'),
+    ('add_volume_ingredient', 'undeduplicable'),
+    ('summarize_mixed_contents', 'undeduplicable'),
+    ('start_cooking', 'undeduplicable'),
+    ('remove_equipment_from_equipment', 'undeduplicable'),
+    ('transfer_items_between_equipment', 'undeduplicable'),
+    ('chain_removal_to_item_transfer', 'undeduplicable'),
+    ('allocate_next_sheet', 'undeduplicable'),
+    ('initialize_removal', 'undeduplicable'),
+    ('initialize_equipment_transfer', 'undeduplicable'),
+    ('initialize_cook', 'undeduplicable'),
+}
+
+
+def _checks(findings):
+    return [(finding['rule'], finding['check']) for finding in findings]
+
+
+class TestRuleLinter:
+    def test_cross_join(self):
+        rule = Rule(rule_name='pair', antecedents=[
+            Fact(fact_title='left', n='?n'),
+            Fact(fact_title='right', m='?m'),
+            Fact(fact_title='both', n='?n', m='?m'),
+        ], consequent=None)
+        findings = RuleLinter(rules=[rule]).findings()
+        assert _checks(findings) == [('pair', 'cross_join')]
+        assert findings[0]['message'].startswith("antecedent 1 ('right') shares no variable")
+
+    def test_unbound_negation(self):
+        rule = Rule(rule_name='guess', antecedents=[
+            NegatedFact(fact_title='seen', name='?n'),  # matched after the anchor, which binds ?n
+            Fact(fact_title='item', name='?n'),
+            NegatedFact(fact_title='tagged', name='?n', tag='?tag'),
+            Fact(fact_title='tag', tag='?tag', name='?n'),
+        ], consequent=None)
+        findings = RuleLinter(rules=[rule]).findings()
+        assert _checks(findings) == [('guess', 'unbound_negation')]
+        assert findings[0]['message'] == ("antecedent 2 (NOT 'tagged') leaves ?tag unbound: they match any value "
+                                          "(?tag only bound by a later antecedent)")
+
+    def test_general_anchor_needs_a_sample(self):
+        rule = Rule(rule_name='every_item', antecedents=[Fact(fact_title='item', name='?n')], consequent=None)
+        specific = Rule(rule_name='salt', antecedents=[Fact(fact_title='item', name='SALT')], consequent=None)
+        facts = [Fact(fact_title='item', name=name) for name in ('SALT', 'SUGAR', 'FLOUR')] + [Fact(fact_title='other')]
+
+        assert RuleLinter(rules=[rule, specific]).findings() == []
+        findings = RuleLinter(rules=[rule, specific], facts=facts).findings()
+        assert findings == [{'rule': 'every_item', 'check': 'general_anchor',
+                             'message': "anchor ('item') matches 3 of 4 sample facts (75%)"}]
+
+    def test_undeduplicable_consequents(self):
+        def action(*, bindings, wm, kb):
+            bindings['?id'] = len(wm.facts)
+            return bindings
+
+        item = Fact(fact_title='item', name='?n')
+        rules = [
+            Rule(rule_name='fresh_id', antecedents=[item], consequent=Fact(fact_title='entry', id='?id'), action_fn=action),
+            Rule(rule_name='literal', antecedents=[item], consequent=Fact(fact_title='entry', id='?id')),
+            Rule(rule_name='guarded', antecedents=[item, NegatedFact(fact_title='entry', name='?n')],
+                 consequent=Fact(fact_title='entry', id='?id'), action_fn=action),
+            Rule(rule_name='consumed', antecedents=[item], consequent=Fact(fact_title='entry', id='?id'),
+                 action_fn=action, consumes=['item']),
+            Rule(rule_name='bound', antecedents=[item], consequent=Fact(fact_title='entry', name='?n')),
+        ]
+        findings = RuleLinter(rules=rules).findings()
+        assert _checks(findings) == [('fresh_id', 'undeduplicable'), ('literal', 'undeduplicable')]
+        assert 'asserts ?id literally' in findings[1]['message']
+
+    def test_unknown_check(self):
+        with pytest.raises(ValueError, match="unknown lint check: speed"):
+            RuleLinter(rules=[]).findings(checks=['speed'])
+
+    def test_combined_knowledge_base_has_no_new_hazards(self):
+        kb = build_knowledge_base()
+        assert set(_checks(RuleLinter(rules=kb.rules).findings())) == KNOWN_FINDINGS
+
+        # Every fact of a full run, retracted ones included, as the trigger sample
+        wm = WorkingMemory(verbose=False)
+        wm.add_fact(fact=Fact(fact_title='target_recipe_scale_factor', target_recipe_scale_factor=20), silent=True)
+        scaling.main.configure_working_memory(wm=wm, recipe=chocolate_chip_cookies_recipe)
+        scaling.main.run_engine(wm=wm, kb=kb, verbose=False)
+        planning.main.configure_equipment(wm=wm, num_ovens=4, num_bowls=1, num_baking_sheets=5)
+        success, _ = planning.main.run_engine(wm=wm, kb=kb, recipe=chocolate_chip_cookies_recipe, verbose=False)
+        assert success is True
+
+        facts = wm.facts + list(wm.consumed_facts.values())
+        linter = RuleLinter(rules=kb.rules, facts=facts, general_anchor_share=0.05)
+        assert linter.findings(checks=['general_anchor']) == []
@@ -0,0 +1,79 @@
+from classes.Fact import Fact
+from classes.NegatedFact import NegatedFact
+from classes.Rule import Rule
+from classes.KnowledgeBase import KnowledgeBase
+from classes.WorkingMemory import WorkingMemory
+from classes.RuleProfiler import RuleProfiler
+from batch.classes.BatchJob import BatchJob
+from batch.runner import build_knowledge_base, run_job
+from recipes.chocolate_chip_cookies import chocolate_chip_cookies_recipe
+from scaling.engine import ScalingEngine
+import scaling.main
+import planning.main
+
+
+def _tag(*, bindings, wm, kb):
+    bindings['?tag'] = bindings['?n'].lower()
+    return bindings
+
+
+def _run(*, profiler):
+    wm = WorkingMemory(verbose=False)
+    for name in ('SALT', 'SUGAR'):
+        wm.add_fact(fact=Fact(fact_title='item', name=name), silent=True)
+    kb = KnowledgeBase()
+    kb.add_reference_facts(facts=[Fact(fact_title='known', name='SALT')])
+    kb.add_rules(rules=[
+        Rule(rule_name='tag_known', priority=100, antecedents=[
+            Fact(fact_title='item', name='?n'),
+            Fact(fact_title='known', name='?n'),
+            NegatedFact(fact_title='tagged', name='?n'),
+        ], consequent=Fact(fact_title='tagged', name='?n', tag='?tag'), action_fn=_tag),
+        Rule(rule_name='never', priority=10, antecedents=[Fact(fact_title='missing')], consequent=None),
+    ])
+    engine = ScalingEngine(wm=wm, kb=kb, verbose=False, profiler=profiler)
+    engine.run()
+    return engine
+
+
+class TestRuleProfiler:
+    def test_counts_match_and_fire_work_per_rule(self):
+        profiler = RuleProfiler()
+        engine = _run(profiler=profiler)
+        assert [f.attributes.get('tag') for f in engine.working_memory.facts] == [None, None, 'salt']
+
+        stats = profiler.stats['tag_known']
+        # SALT, SALT again after firing, then SUGAR
+        assert stats['match_attempts'] == 3
+        assert stats['activations'] == 1
+        assert stats['firings'] == 1
+        # Per attempt: the anchor and the 'known' fact; the retry also checks its new 'tagged' fact
+        assert stats['unify_calls'] == 7
+        assert stats['partial_bindings'] == 2
+        assert stats['match_time'] > 0 and stats['action_time'] > 0
+        assert 'never' not in profiler.stats
+        assert [row['rule_name'] for row in profiler.rows()] == ['tag_known']
+        assert profiler.report().splitlines()[2].startswith('tag_known')
+
+    def test_unprofiled_engine_is_untouched(self):
+        engine = _run(profiler=None)
+        assert '_iter_rule_activations' not in vars(engine)
+        assert engine._binding_environment is ScalingEngine._binding_environment
+
+    def test_profiling_does_not_change_the_plan(self):
+        kb = build_knowledge_base()
+        expected = run_job(job=BatchJob(job_id=1, recipe=chocolate_chip_cookies_recipe, scaling_factor=2, run_planning=True), kb=kb)
+
+        wm = WorkingMemory(verbose=False)
+        wm.add_fact(fact=Fact(fact_title='target_recipe_scale_factor', target_recipe_scale_factor=2), silent=True)
+        profiler = RuleProfiler()
+        scaling.main.configure_working_memory(wm=wm, recipe=chocolate_chip_cookies_recipe)
+        scaling.main.run_engine(wm=wm, kb=kb, verbose=False, profiler=profiler)
+        planning.main.configure_equipment(wm=wm, num_ovens=4, num_bowls=1, num_baking_sheets=5)
+        success, plan = planning.main.run_engine(wm=wm, kb=kb, recipe=chocolate_chip_cookies_recipe, verbose=False, profiler=profiler)
+
+        assert success is True
+        assert len(plan) == len(expected['plan'])
+        assert len(wm.facts) == expected['num_facts']
+        assert profiler.stats['classify_known_ingredient']['firings'] == 3
+        assert profiler.stats['place_sheet_for_cooking']['action_time'] > 0
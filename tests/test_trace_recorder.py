@@ -0,0 +1,87 @@
+import json
+
+from classes.Fact import Fact
+from classes.NegatedFact import NegatedFact
+from classes.Rule import Rule
+from classes.KnowledgeBase import KnowledgeBase
+from classes.WorkingMemory import WorkingMemory
+from classes.TraceRecorder import TraceRecorder
+from batch.runner import build_knowledge_base
+from recipes.chocolate_chip_cookies import chocolate_chip_cookies_recipe
+from scaling.engine import ScalingEngine
+import scaling.main
+import planning.main
+
+
+def _run(*, tracer):
+    wm = WorkingMemory(verbose=False)
+    wm.add_fact(fact=Fact(fact_title='item', name='SALT'), silent=True)
+    kb = KnowledgeBase()
+    kb.add_rules(rules=[
+        Rule(rule_name='tag', priority=100, antecedents=[
+            Fact(fact_title='item', name='?n'),
+            NegatedFact(fact_title='tagged', name='?n'),
+        ], consequent=Fact(fact_title='tagged', name='?n')),
+        Rule(rule_name='label', priority=100, antecedents=[
+            Fact(fact_title='tagged', name='?n'),
+            NegatedFact(fact_title='labelled', name='?n'),
+        ], consequent=Fact(fact_title='labelled', name='?n'), action_fn=lambda *, bindings, wm, kb: bindings),
+    ])
+    engine = ScalingEngine(wm=wm, kb=kb, verbose=False, tracer=tracer)
+    engine.run()
+    return engine
+
+
+def _spans(tracer, name):
+    return [e for e in tracer.events if e['ph'] == 'X' and e['name'] == name]
+
+
+def _contains(outer, inner):
+    return outer['ts'] <= inner['ts'] and inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur']
+
+
+class TestTraceRecorder:
+    def test_spans_nest_and_carry_rule_and_trigger(self, tmp_path):
+        tracer = TraceRecorder()
+        _run(tracer=tracer)
+
+        [cycle] = _spans(tracer, 'forward_chain')
+        [dfs] = _spans(tracer, 'fire_rule_dfs')
+        [tag] = _spans(tracer, 'fire:tag')
+        [label] = _spans(tracer, 'fire:label')
+        [action] = _spans(tracer, 'action:label')
+        assert cycle['args'] == {'trigger_fact_id': 1, 'trigger': 'item', 'cycle': 1}
+        assert dfs['args'] == {'rule': 'tag', 'trigger_fact_id': 1, 'depth': 0}
+        # label fires one step down the chain, from the tagged fact tag derived
+        assert tag['args']['chain_depth'] == 0
+        assert label['args'] == {'rule': 'label', 'trigger_fact_id': 2, 'chain_depth': 1}
+        assert _contains(cycle, dfs) and _contains(dfs, tag) and _contains(dfs, label) and _contains(label, action)
+        assert {e['args']['rule'] for e in tracer.events if e['name'].startswith('match:')} == {'tag', 'label'}
+
+        path = tmp_path / 'trace.json'
+        tracer.write(path=str(path))
+        trace = json.loads(path.read_text())
+        assert trace['traceEvents'][0] == {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': 1, 'args': {'name': 'ScalingEngine'}}
+
+    def test_untraced_engine_is_untouched(self):
+        engine = _run(tracer=None)
+        assert '_forward_chain' not in vars(engine)
+
+    def test_dispatch_rules_reenter_the_engine_inside_their_action(self):
+        kb = build_knowledge_base()
+        wm = WorkingMemory(verbose=False)
+        wm.add_fact(fact=Fact(fact_title='target_recipe_scale_factor', target_recipe_scale_factor=2), silent=True)
+        tracer = TraceRecorder()
+        scaling.main.configure_working_memory(wm=wm, recipe=chocolate_chip_cookies_recipe)
+        scaling.main.run_engine(wm=wm, kb=kb, verbose=False, tracer=tracer)
+        planning.main.configure_equipment(wm=wm, num_ovens=4, num_bowls=1, num_baking_sheets=5)
+        success, _ = planning.main.run_engine(wm=wm, kb=kb, recipe=chocolate_chip_cookies_recipe, verbose=False, tracer=tracer)
+        assert success is True
+
+        # One track per engine
+        assert sorted(e['args']['name'] for e in tracer.events if e['ph'] == 'M') == ['PlanningEngine', 'ScalingEngine']
+        planning_tid = [e['tid'] for e in tracer.events if e['ph'] == 'M' and e['args']['name'] == 'PlanningEngine'][0]
+        actions = [e for e in tracer.events if e.get('cat') == 'action' and e['tid'] == planning_tid]
+        cycles = [e for e in _spans(tracer, 'forward_chain') if e['tid'] == planning_tid]
+        assert any(_contains(action, cycle) for action in actions for cycle in cycles)
+        assert max(e['args']['depth'] for e in _spans(tracer, 'fire_rule_dfs')) >= 1
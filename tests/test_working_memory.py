@@ -0,0 +1,207 @@
+import math
+
+import pytest
+
+from classes.Fact import Fact
+from classes.WorkingMemory import WorkingMemory
+
+
+def _contents(*, equipment_name='OVEN', equipment_id=1, **attributes):
+    return Fact(fact_title='equipment_contents', equipment_name=equipment_name,
+                equipment_id=equipment_id, **attributes)
+
+
+# ── equipment_contents occupancy index ───────────────────────────────
+
+class TestContentsIndex:
+    def test_query_contents_matches_query_facts(self):
+        wm = WorkingMemory(verbose=False)
+        wm.add_fact(fact=_contents(slot_number=1, content_type='BAKING_SHEET'))
+        wm.add_fact(fact=Fact(fact_title='other', equipment_name='OVEN', equipment_id=1))
+        wm.add_fact(fact=_contents(equipment_id=2, slot_number=1, content_type='BAKING_SHEET'))
+        wm.add_fact(fact=_contents(slot_number=2, content_type='BAKING_SHEET'))
+
+        expected = wm.query_facts(fact_title='equipment_contents', equipment_name='OVEN', equipment_id=1)
+        assert wm.query_contents(equipment_name='OVEN', equipment_id=1) == expected
+        assert wm.count_contents(equipment_name='OVEN', equipment_id=1) == 2
+        assert wm.count_contents(equipment_name='OVEN', equipment_id=3) == 0
+        assert wm.query_contents(equipment_name='OVEN', equipment_id=1, slot_number=2, first=True) is expected[1]
+
+    def test_slots_follow_assert_and_retract(self):
+        wm = WorkingMemory(verbose=False)
+        rack_1 = _contents(slot_number=1)
+        rack_2 = _contents(slot_number=2)
+        wm.add_fact(fact=rack_1)
+        wm.add_fact(fact=rack_2)
+
+        assert wm.query_slot(equipment_name='OVEN', equipment_id=1, slot_number=2) is rack_2
+        assert wm.occupied_slots(equipment_name='OVEN', equipment_id=1) == [1, 2]
+        assert wm.next_free_slot(equipment_name='OVEN', equipment_id=1, num_slots=2) is None
+
+        wm.remove_fact(fact=rack_1)
+        assert wm.query_slot(equipment_name='OVEN', equipment_id=1, slot_number=1) is None
+        assert wm.next_free_slot(equipment_name='OVEN', equipment_id=1, num_slots=2) == 1
+        assert wm.count_contents(equipment_name='OVEN', equipment_id=1) == 1
+
+        wm.remove_fact(fact=rack_2)
+        assert wm.occupied_slots(equipment_name='OVEN', equipment_id=1) == []
+        assert wm.query_contents(equipment_name='OVEN', equipment_id=1) == []
+
+    @pytest.mark.parametrize("occupied, num_slots, expected", [
+        ([], 2, 1),
+        ([1], 2, 2),
+        ([2], 2, 1),
+        ([1, 2], 2, None),
+        ([1, 3], 4, 2),
+    ])
+    def test_next_free_slot_is_lowest_unoccupied(self, occupied, num_slots, expected):
+        wm = WorkingMemory(verbose=False)
+        for slot_number in occupied:
+            wm.add_fact(fact=_contents(slot_number=slot_number))
+        assert wm.next_free_slot(equipment_name='OVEN', equipment_id=1, num_slots=num_slots) == expected
+
+
+# ── incrementally maintained aggregates ──────────────────────────────
+
+class TestAggregates:
+    def _wm(self, *, function, attribute='volume_in_equipment_unit'):
+        wm = WorkingMemory(verbose=False)
+        wm.register_aggregate(name='view', fact_title='equipment_contents',
+                              group_by=['equipment_name', 'equipment_id'], function=function, attribute=attribute)
+        return wm
+
+    def test_sum_through_retract(self):
+        wm = self._wm(function='sum')
+        volumes = [0.25, 0.1875, 0.1875, 0, 0.010416666666666666, 0.5625, 0.005208333333333333]
+        facts = [_contents(volume_in_equipment_unit=v) for v in volumes]
+        for fact in facts:
+            wm.add_fact(fact=fact)
+        wm.add_fact(fact=_contents(equipment_id=2, volume_in_equipment_unit=10))
+
+        assert wm.aggregate(name='view', equipment_name='OVEN', equipment_id=1) == math.fsum(volumes)
+        assert wm.aggregate(name='view', equipment_name='OVEN', equipment_id=2) == 10
+
+        for fact in facts:
+            wm.remove_fact(fact=fact)
+        assert wm.aggregate(name='view', equipment_name='OVEN', equipment_id=1) == 0
+
+    def test_sum_is_exact_and_kept_incrementally(self):
+        wm = self._wm(function='sum')
+        facts = [_contents(volume_in_equipment_unit=v) for v in [0.1] * 5000 + [1e16, 1.0, -1e16]]
+        for fact in facts:
+            wm.add_fact(fact=fact)
+        wm.remove_fact(fact=facts[0])
+
+        volumes = [fact.attributes['volume_in_equipment_unit'] for fact in facts[1:]]
+        assert wm.aggregate(name='view', equipment_name='OVEN', equipment_id=1) == math.fsum(volumes)
+        state = wm._aggregates['view']['groups'][('OVEN', 1)]
+        assert len(state['partials']) <= 3
+
+    def test_count_includes_every_fact_and_sum_skips_missing_attribute(self):
+        counted = self._wm(function='count', attribute=None)
+        summed = self._wm(function='sum')
+        for wm in (counted, summed):
+            wm.add_fact(fact=_contents(volume_in_equipment_unit=2))
+            wm.add_fact(fact=_contents(slot_number=1))
+        assert counted.aggregate(name='view', equipment_name='OVEN', equipment_id=1) == 2
+        assert summed.aggregate(name='view', equipment_name='OVEN', equipment_id=1) == 2
+
+    @pytest.mark.parametrize("function, expected, after_retract", [
+        ('min', 1, 3),
+        ('max', 5, 3),
+    ])
+    def test_min_max_survive_retracting_the_extreme(self, function, expected, after_retract):
+        wm = self._wm(function=function)
+        facts = {v: _contents(volume_in_equipment_unit=v) for v in (3, 1, 5)}
+        for fact in facts.values():
+            wm.add_fact(fact=fact)
+        assert wm.aggregate(name='view', equipment_name='OVEN', equipment_id=1) == expected
+
+        wm.remove_fact(fact=facts[expected])
+        assert wm.aggregate(name='view', equipment_name='OVEN', equipment_id=1) == after_retract
+
+        for fact in list(wm.facts):
+            wm.remove_fact(fact=fact)
+        assert wm.aggregate(name='view', equipment_name='OVEN', equipment_id=1) is None
+
+    def test_modify_fact_moves_contribution(self):
+        wm = self._wm(function='max')
+        fact = _contents(volume_in_equipment_unit=9)
+        wm.add_fact(fact=fact)
+        wm.add_fact(fact=_contents(volume_in_equipment_unit=4))
+
+        wm.modify_fact(fact=fact, equipment_id=2, volume_in_equipment_unit=1)
+        assert wm.aggregate(name='view', equipment_name='OVEN', equipment_id=1) == 4
+        assert wm.aggregate(name='view', equipment_name='OVEN', equipment_id=2) == 1
+        assert wm.count_contents(equipment_name='OVEN', equipment_id=2) == 1
+
+    def test_modify_fact_ignores_facts_not_in_wm(self):
+        wm = self._wm(function='sum')
+        retracted = _contents(volume_in_equipment_unit=3)
+        wm.add_fact(fact=retracted)
+        wm.add_fact(fact=_contents(volume_in_equipment_unit=4))
+        wm.remove_fact(fact=retracted)
+
+        wm.modify_fact(fact=retracted, volume_in_equipment_unit=10)
+        wm.modify_fact(fact=_contents(equipment_id=2, volume_in_equipment_unit=5), slot_number=1)
+        assert retracted.attributes['volume_in_equipment_unit'] == 3
+        assert wm.aggregate(name='view', equipment_name='OVEN', equipment_id=1) == 4
+        assert wm.aggregate(name='view', equipment_name='OVEN', equipment_id=2) == 0
+        assert wm.count_contents(equipment_name='OVEN', equipment_id=1) == 1
+
+    def test_registration_builds_from_existing_facts_and_is_idempotent(self):
+        wm = WorkingMemory(verbose=False)
+        wm.add_fact(fact=_contents(volume_in_equipment_unit=2))
+        definition = dict(name='view', fact_title='equipment_contents', group_by=['equipment_name', 'equipment_id'],
+                          function='sum', attribute='volume_in_equipment_unit')
+        wm.register_aggregate(**definition)
+        wm.register_aggregate(**definition)
+        wm.add_fact(fact=_contents(volume_in_equipment_unit=3))
+        assert wm.aggregate(name='view', equipment_name='OVEN', equipment_id=1) == 5
+
+        with pytest.raises(ValueError, match="different definition"):
+            wm.register_aggregate(**{**definition, 'function': 'max'})
+
+    @pytest.mark.parametrize("function, attribute, error", [
+        ('avg', 'volume_in_equipment_unit', "unknown aggregate function"),
+        ('sum', None, "needs an attribute"),
+    ])
+    def test_invalid_definitions_raise_value_error(self, function, attribute, error):
+        wm = WorkingMemory(verbose=False)
+        with pytest.raises(ValueError, match=error):
+            wm.register_aggregate(name='view', fact_title='equipment_contents', group_by=['equipment_name'],
+                                  function=function, attribute=attribute)
+
+
+class TestMemoryReport:
+    def test_counts_live_and_consumed_facts_per_title(self):
+        wm = WorkingMemory(verbose=False)
+        wm.add_fact(fact=_contents(volume_in_equipment_unit=2))
+        wm.add_fact(fact=_contents(volume_in_equipment_unit=3))
+        pending = Fact(fact_title='pending_ingredient', ingredient_id=1)
+        wm.add_fact(fact=pending)
+        wm.consume_fact(fact=pending)
+
+        report = wm.memory_report()
+        assert list(report) == ['equipment_contents', 'pending_ingredient']
+        assert report['equipment_contents']['count'] == 2
+        assert report['pending_ingredient'] == {'count': 0, 'consumed': 1, 'bytes': report['pending_ingredient']['bytes']}
+        assert report['equipment_contents']['bytes'] > report['pending_ingredient']['bytes'] > 0
+
+    def test_shared_derivation_counts_once(self):
+        wm = WorkingMemory(verbose=False)
+        source = Fact(fact_title='source')
+        wm.add_fact(fact=source)
+        single = wm.memory_report()['source']['bytes']
+
+        derivation = {'rule_name': 'split', 'antecedent_facts': [source]}
+        for idx in range(2):
+            fact = Fact(fact_title='part', idx=idx)
+            fact.derivation = derivation
+            wm.add_fact(fact=fact)
+        report = wm.memory_report()
+        assert report['source']['bytes'] == single
+        first_part = report['part']['bytes']
+
+        wm.facts[-1].derivation = {'rule_name': 'split', 'antecedent_facts': [source]}
+        assert wm.memory_report()['part']['bytes'] > first_part
@@ -0,0 +1,65 @@
+# classes
+from planning.classes.MixingSubstep import MixingSubstep
+from planning.classes.WaitStep import WaitStep
+from planning.classes.PreheatStep import PreheatStep
+from planning.classes.TransferStep import TransferStep
+from planning.classes.TransferItem import TransferItem
+from planning.classes.CleaningStep import CleaningStep
+
+
+def serialize_optimal_ingredients(*, wm):
+    """JSON-friendly view of every optimally_scaled_ingredient fact in working memory."""
+    results = []
+    for fact in wm.facts:
+        if fact.fact_title != 'optimally_scaled_ingredient':
+            continue
+        results.append({
+            'ingredient_name': fact.get(key='ingredient_name'),
+            'original_amount': fact.get(key='original_amount'),
+            'original_unit': fact.get(key='original_unit'),
+            'components': [dict(c) for c in (fact.get(key='components') or [])],
+        })
+    return results
+
+
+def serialize_plan(*, plan):
+    """JSON-friendly view of a plan (list of Step objects), substeps nested."""
+    return [_serialize_step(step=step) for step in plan]
+
+
+def _serialize_step(*, step):
+    if isinstance(step, MixingSubstep):
+        return {
+            'step_class': 'MixingSubstep',
+            'description': step.description,
+            'ingredient_ids': list(step.ingredient_ids),
+        }
+
+    data = {
+        'step_class': type(step).__name__,
+        'description': step.description,
+        'is_passive': step.is_passive,
+    }
+
+    if isinstance(step, WaitStep):
+        data['equipment_name'] = step.equipment_name
+        data['equipment_id'] = step.equipment_id
+        data['duration'] = step.duration
+        data['duration_unit'] = step.duration_unit
+        if isinstance(step, PreheatStep):
+            data['temperature'] = step.temperature
+            data['temperature_unit'] = step.temperature_unit
+    elif isinstance(step, TransferStep):
+        data['source_equipment_name'] = step.source_equipment_name
+        data['target_equipment_name'] = step.target_equipment_name
+        if isinstance(step, TransferItem):
+            data['scoop_size_amount'] = step.scoop_size_amount
+            data['scoop_size_unit'] = step.scoop_size_unit
+    elif isinstance(step, CleaningStep):
+        data['equipment_name'] = step.equipment_name
+        data['equipment_id'] = step.equipment_id
+
+    if step.substeps:
+        data['substeps'] = [_serialize_step(step=substep) for substep in step.substeps]
+
+    return data